@@ -6,3 +6,7 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
+
+    def ready(self):
+        from api import authentication, middleware  # noqa: F401
+        from api_yamdb import db  # noqa: F401
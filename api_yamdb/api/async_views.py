@@ -0,0 +1,54 @@
+"""
+Асинхронные вьюхи чтения для запуска под ASGI.
+
+Под ASGI Django 3.2 выполняет синхронные вьюхи в одном общем потоке,
+поэтому воркер обрабатывает их по одной. Асинхронная вьюха отправляет
+безопасные запросы в пул потоков (`thread_sensitive=False`): чтения
+одного воркера идут параллельно, каждое со своим соединением с базой.
+Асинхронного ORM в Django 3.2 нет, поэтому запрос обрабатывает тот же
+вьюсет DRF, что и под WSGI, с теми же правами доступа и ответами.
+Изменяющие запросы по-прежнему выполняются в общем потоке.
+
+Включается настройкой `ASYNC_READ_VIEWS`: под WSGI асинхронная вьюха
+запускала бы отдельный цикл событий на каждый запрос.
+"""
+import copy
+import functools
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from rest_framework.permissions import SAFE_METHODS
+
+
+def async_read_view(view):
+    """Асинхронная версия вьюхи DRF с чтением в пуле потоков."""
+
+    def read(request, *args, **kwargs):
+        # Пул не получает сигналов начала и конца запроса, поэтому
+        # устаревшие соединения его потоков закрываются здесь.
+        close_old_connections()
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            close_old_connections()
+
+    @functools.wraps(view)
+    async def async_view(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return await sync_to_async(read, thread_sensitive=False)(
+                request, *args, **kwargs
+            )
+        return await sync_to_async(view)(request, *args, **kwargs)
+
+    return async_view
+
+
+def with_async_reads(patterns, viewsets):
+    """Копии маршрутов роутера с асинхронными вьюхами `viewsets`."""
+    result = []
+    for pattern in patterns:
+        if getattr(pattern.callback, "cls", None) in viewsets:
+            pattern = copy.copy(pattern)
+            pattern.callback = async_read_view(pattern.callback)
+        result.append(pattern)
+    return result
@@ -0,0 +1,199 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from api.tokens import ROLE_CLAIMS
+
+User = get_user_model()
+
+REVALIDATE_KEY = "auth:revalidate:{}"
+
+USER_CACHE_FIELDS = frozenset(
+    ("username", "role", "is_active", "is_staff", "is_superuser")
+)
+
+
+class UserCache:
+    """Ограниченный по размеру и времени жизни кеш пользователей процесса."""
+
+    def __init__(self, timeout, max_size):
+        self.timeout = timeout
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.users = OrderedDict()
+
+    def get(self, user_id):
+        with self.lock:
+            cached = self.users.get(user_id)
+            if cached is None:
+                return None
+            expires, user = cached
+            if expires < time.monotonic():
+                del self.users[user_id]
+                return None
+            self.users.move_to_end(user_id)
+        # Копия не даёт запросам менять общий экземпляр.
+        return copy.copy(user)
+
+    def set(self, user_id, user):
+        # Кеш хранит свою копию: экземпляр остаётся у запроса, который
+        # его загрузил.
+        user = copy.copy(user)
+        with self.lock:
+            self.users[user_id] = (time.monotonic() + self.timeout, user)
+            self.users.move_to_end(user_id)
+            while len(self.users) > self.max_size:
+                self.users.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.users.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.users.clear()
+
+
+user_cache = UserCache(
+    timeout=settings.JWT_USER_CACHE_TIMEOUT,
+    max_size=settings.JWT_USER_CACHE_SIZE,
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация с кешем пользователей в памяти процесса.
+
+    Пользователь сбрасывается из кеша при сохранении или удалении, в
+    остальных процессах устаревшая запись живёт не дольше
+    JWT_USER_CACHE_TIMEOUT секунд.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                "Token contained no recognizable user identification"
+            )
+        user = user_cache.get(user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return user
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    Пользователь, роль которого берётся из подписанных claims токена.
+
+    Проверки прав используют только claims; экземпляр модели загружается
+    при обращении к любому другому атрибуту.
+    """
+
+    def __init__(self, token, load_user):
+        super().__init__(load_user)
+        self.__dict__["token"] = token
+
+    def __bool__(self):
+        return True
+
+    @property
+    def id(self):
+        return self.token[api_settings.USER_ID_CLAIM]
+
+    pk = id
+
+    @property
+    def role(self):
+        return self.token["role"]
+
+    @property
+    def is_active(self):
+        return self.token["is_active"]
+
+    @property
+    def is_staff(self):
+        return self.token["is_staff"]
+
+    @property
+    def is_superuser(self):
+        return self.token["is_superuser"]
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN or self.is_superuser or self.is_staff
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+    is_authenticated = True
+    is_anonymous = False
+
+
+def revalidate_user_tokens(user_id):
+    """
+    Заставляет проверить по базе токены, выпущенные до этого момента.
+
+    Отметка хранится в отдельном кеше `tokens` без вытеснения: в общем
+    кеше её мог бы удалить `_cull`, и токен со старой ролью снова
+    прошёл бы проверку по claims.
+    """
+    caches["tokens"].set(
+        REVALIDATE_KEY.format(user_id),
+        int(time.time()),
+        timeout=int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()),
+    )
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT-аутентификация без обращения к базе для проверки прав.
+
+    Токены с claims роли дают `ClaimsUser`. Токены без claims, токены
+    неактивных пользователей и токены, выпущенные до смены роли
+    пользователя, проверяются как раньше - через кеш пользователей и базу
+    данных.
+    """
+
+    def get_user(self, validated_token):
+        has_claims = all(claim in validated_token for claim in ROLE_CLAIMS)
+        if not has_claims or not validated_token["is_active"]:
+            return super().get_user(validated_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        revalidated_at = caches["tokens"].get(
+            REVALIDATE_KEY.format(user_id)
+        )
+        if revalidated_at is not None and (
+            validated_token.get("iat", 0) <= revalidated_at
+        ):
+            return super().get_user(validated_token)
+        return ClaimsUser(
+            validated_token, partial(super().get_user, validated_token)
+        )
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or USER_CACHE_FIELDS & set(update_fields):
+        user_cache.invalidate(instance.pk)
+        revalidate_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleted_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+    revalidate_user_tokens(instance.pk)
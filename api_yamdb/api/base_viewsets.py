@@ -1,7 +1,51 @@
 from rest_framework import mixins, viewsets
 
+from api.fieldsets import FieldsetViewMixin
+from api.replicas import ReplicaReadMixin
+from api_yamdb.db import retry_locked
+from reviews.models import Review
+from reviews.ratings import forget_reviews
+
+
+class RetryLockedMixin:
+    """
+    Повторяет изменяющий запрос, если SQLite ответил "database is locked".
+
+    Изменения во вьюсетах выполняются в одной транзакции или одним
+    запросом, поэтому после ошибки блокировки в базе ничего не остаётся,
+    и запрос можно повторить целиком вместе с валидацией.
+    """
+
+    def create(self, request, *args, **kwargs):
+        return retry_locked(super().create, request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        return retry_locked(super().update, request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        return retry_locked(super().destroy, request, *args, **kwargs)
+
+
+class ForgetReviewsMixin:
+    """
+    Вычитает отзывы удаляемого объекта из рейтингов одним UPDATE на
+    произведение, а не по два на каждый каскадно удаляемый отзыв.
+
+    `reviews_lookup` - поле отзыва, которое ссылается на объект.
+    """
+
+    reviews_lookup = None
+
+    def perform_destroy(self, instance):
+        reviews = Review.objects.filter(**{self.reviews_lookup: instance})
+        with forget_reviews(reviews):
+            super().perform_destroy(instance)
+
 
 class GroupBaseViewSet(
+    ReplicaReadMixin,
+    RetryLockedMixin,
+    FieldsetViewMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
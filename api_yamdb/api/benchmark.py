@@ -0,0 +1,272 @@
+"""
+Нагрузочный прогон API в процессе через тестовые клиенты Django.
+
+Запросы проходят через весь стек: middleware, URLconf из `api.urls`,
+аутентификацию, вьюсеты и рендеринг. WSGI-прогон запускает клиентов в
+потоках, ASGI-прогон - в одном цикле событий, как один воркер
+ASGI-сервера. Используется командой `benchmark`.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, connections
+from django.test import AsyncClient, Client
+from django.urls import resolve
+
+from api.tokens import RoleAccessToken
+from reviews.dataset import DatasetGenerator
+from reviews.management.commands.import_csv import CHUNK_SIZE
+from reviews.models import Review, Title
+
+User = get_user_model()
+
+SCENARIOS = (
+    ("title-list", 30),
+    ("title-detail", 20),
+    ("title-reviews-list", 15),
+    ("review-comments-list", 10),
+    ("category-list", 5),
+    ("genre-list", 5),
+    ("title-reviews-create", 8),
+    ("review-comments-create", 7),
+)
+PERCENTILES = (50, 95, 99)
+
+
+def seed_dataset(titles=1000, users=200, reviews_per_title=5,
+                 comments_per_review=1, seed=0):
+    """Наполняет базу синтетическим каталогом заданного масштаба."""
+    DatasetGenerator.appending(
+        titles=titles,
+        users=users,
+        categories=5,
+        genres=15,
+        reviews_per_title=reviews_per_title,
+        comments_per_review=comments_per_review,
+        seed=seed,
+    ).write_database(CHUNK_SIZE)
+
+
+class Workload:
+    """Детерминированная последовательность запросов к API."""
+
+    def __init__(self, seed=0, clients=50):
+        self.rng = random.Random(seed)
+        self.title_ids = list(Title.objects.values_list("id", flat=True))
+        self.reviews = list(Review.objects.values_list("title_id", "id"))
+        self.tokens = [
+            str(RoleAccessToken.for_user(user))
+            for user in User.objects.order_by("id")[:clients]
+        ]
+        names, weights = zip(*SCENARIOS)
+        self.names = names
+        self.weights = weights
+
+    def build(self, name):
+        rng = self.rng
+        title_id = rng.choice(self.title_ids)
+        review_title_id, review_id = rng.choice(self.reviews)
+        token = rng.choice(self.tokens)
+        pages = max(1, len(self.title_ids) // 10)
+        requests = {
+            "title-list": (
+                "get",
+                f"/api/v1/titles/?page={rng.randint(1, min(pages, 20))}",
+                None,
+            ),
+            "title-detail": ("get", f"/api/v1/titles/{title_id}/", None),
+            "title-reviews-list": (
+                "get", f"/api/v1/titles/{title_id}/reviews/", None
+            ),
+            "review-comments-list": (
+                "get",
+                f"/api/v1/titles/{review_title_id}/reviews/{review_id}/"
+                "comments/",
+                None,
+            ),
+            "category-list": ("get", "/api/v1/categories/", None),
+            "genre-list": ("get", "/api/v1/genres/", None),
+            "title-reviews-create": (
+                "post",
+                f"/api/v1/titles/{title_id}/reviews/",
+                {"text": "Отзыв из бенчмарка", "score": rng.randint(1, 10)},
+            ),
+            "review-comments-create": (
+                "post",
+                f"/api/v1/titles/{review_title_id}/reviews/{review_id}/"
+                "comments/",
+                {"text": "Комментарий из бенчмарка"},
+            ),
+        }
+        method, path, data = requests[name]
+        return name, method, path, data, token if data else None
+
+    def plan(self, count):
+        return [
+            self.build(name)
+            for name in self.rng.choices(
+                self.names, weights=self.weights, k=count
+            )
+        ]
+
+
+def run_requests(plan, concurrency=8):
+    """
+    Выполняет запросы в `concurrency` потоках.
+
+    Возвращает список (маршрут, статус, задержка в секундах) и общее
+    время прогона.
+    """
+    results = []
+    lock = threading.Lock()
+    position = iter(plan)
+
+    def worker():
+        client = Client(raise_request_exception=False)
+        local = []
+        try:
+            while True:
+                with lock:
+                    item = next(position, None)
+                if item is None:
+                    break
+                _, method, path, data, token = item
+                headers = (
+                    {"HTTP_AUTHORIZATION": f"Bearer {token}"} if token else {}
+                )
+                started = time.perf_counter()
+                response = getattr(client, method)(path, data, **headers)
+                # Как после ответа сервера: соединение закрывается, если
+                # CONN_MAX_AGE не разрешает его переиспользовать.
+                close_old_connections()
+                elapsed = time.perf_counter() - started
+                route = "{} {}".format(
+                    method.upper(), resolve(path.split("?")[0]).url_name
+                )
+                local.append((route, response.status_code, elapsed))
+        finally:
+            connections.close_all()
+        with lock:
+            results.extend(local)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return results, time.perf_counter() - started
+
+
+def run_requests_asgi(plan, concurrency=8):
+    """
+    Выполняет запросы через ASGI-обработчик: `concurrency` клиентов
+    в одном цикле событий.
+
+    Кроме результатов и времени прогона возвращает наибольшее число
+    запросов, одновременно работавших с базой: от первого до последнего
+    SQL-запроса по отметкам `ServerTimingMiddleware` (None, если она
+    отключена).
+    """
+    results = []
+    intervals = []
+    position = iter(plan)
+
+    async def worker():
+        client = AsyncClient(raise_request_exception=False)
+        for _, method, path, data, token in position:
+            # AsyncClient принимает заголовки по их именам, а не META.
+            headers = {"authorization": f"Bearer {token}"} if token else {}
+            if data is not None:
+                # Multipart-тело AsyncClient в Django 3.2 читает с ошибкой.
+                headers.update(
+                    data=json.dumps(data), content_type="application/json"
+                )
+            started = time.perf_counter()
+            response = await getattr(client, method)(path, **headers)
+            elapsed = time.perf_counter() - started
+            route = "{} {}".format(
+                method.upper(), resolve(path.split("?")[0]).url_name
+            )
+            results.append((route, response.status_code, elapsed))
+            timing = getattr(response.asgi_request, "timing", None)
+            if timing is not None and timing.db_started is not None:
+                intervals.append((timing.db_started, timing.db_finished))
+
+    async def main():
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - started
+
+    duration = asyncio.run(main())
+    return results, duration, peak_overlap(intervals) if intervals else None
+
+
+def peak_overlap(intervals):
+    """Наибольшее число одновременно открытых интервалов (начало, конец)."""
+    events = sorted(
+        [(start, 1) for start, _ in intervals]
+        + [(end, -1) for _, end in intervals]
+    )
+    current = peak = 0
+    for _, change in events:
+        current += change
+        peak = max(peak, current)
+    return peak
+
+
+def percentile(values, rank):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1,
+                       int(round(rank / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(results, duration):
+    """Задержки в миллисекундах и пропускная способность по маршрутам."""
+    by_route = defaultdict(list)
+    for route, status, elapsed in results:
+        by_route[route].append((status, elapsed))
+    by_route["total"] = [(status, elapsed) for _, status, elapsed in results]
+    summary = {}
+    for route, samples in sorted(by_route.items()):
+        latencies = [elapsed * 1000 for _, elapsed in samples]
+        summary[route] = {
+            "requests": len(samples),
+            "errors": sum(status >= 500 for status, _ in samples),
+            "rps": round(len(samples) / duration, 2) if duration else 0,
+            **{
+                f"p{rank}": round(percentile(latencies, rank), 3)
+                for rank in PERCENTILES
+            },
+        }
+    return summary
+
+
+def compare(summary, baseline, max_regression=None):
+    """
+    Сравнивает прогон с сохранённым: изменение p95 и rps в процентах.
+
+    Возвращает строки отчёта и маршруты, где p95 вырос больше
+    `max_regression` процентов.
+    """
+    lines = []
+    regressions = []
+    for route, current in summary.items():
+        previous = baseline.get(route)
+        if not previous:
+            continue
+        p95 = (current["p95"] / previous["p95"] - 1) * 100 if (
+            previous["p95"]
+        ) else 0
+        rps = (current["rps"] / previous["rps"] - 1) * 100 if (
+            previous["rps"]
+        ) else 0
+        lines.append(f"{route}: p95 {p95:+.1f}%, rps {rps:+.1f}%")
+        if max_regression is not None and p95 > max_regression:
+            regressions.append(route)
+    return lines, regressions
@@ -0,0 +1,116 @@
+import uuid
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from api.replicas import primary
+
+VERSION_KEY = "version:{}"
+RESPONSE_KEY = "response:{view}:{action}:{url}:{versions}"
+
+
+def new_version():
+    """
+    Уникальная версия модели.
+
+    Версии только сравниваются на равенство, поэтому вместо счётчика
+    используется случайное значение: оно не повторяет версию, которая
+    была до вытеснения ключа из кеша.
+    """
+    return uuid.uuid4().hex
+
+
+def get_versions(names):
+    """Возвращает текущие версии моделей из общего кеша."""
+    keys = [VERSION_KEY.format(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, new_version(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_versions(names):
+    """
+    Записывает новые версии моделей.
+
+    `cache.incr` в FileBasedCache - неатомарные чтение и запись: два
+    параллельных изменения могли получить одну и ту же версию v+1, и
+    ответ, прочитанный между ними, оставался в кеше под итоговой
+    версией. Новая уникальная версия на каждое изменение этого не
+    допускает.
+    """
+    cache.set_many(
+        {VERSION_KEY.format(name): new_version() for name in names},
+        timeout=None,
+    )
+
+
+class VersionedCacheMixin:
+    """
+    Кеширование ответов анонимным пользователям с версиями моделей.
+
+    `cache_dependencies` - модели, от которых зависит ответ вьюсета,
+    `cache_invalidates` - модели, версии которых повышаются после
+    успешного изменяющего запроса к вьюсету. Ответ для кеша читается
+    из основной базы: реплика может отставать от уже повышенной версии.
+    """
+
+    cache_dependencies = ()
+    cache_invalidates = ()
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if (
+            not settings.RESPONSE_CACHE_ENABLED
+            or not self.cache_dependencies
+            or request.user.is_authenticated
+        ):
+            return handler(request, *args, **kwargs)
+        key = RESPONSE_KEY.format(
+            view=self.basename,
+            action=self.action,
+            url=md5(request.build_absolute_uri().encode()).hexdigest(),
+            versions=".".join(
+                str(version)
+                for version in get_versions(self.cache_dependencies)
+            ),
+        )
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        with primary():
+            response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            self.cache_invalidates
+            and request.method not in SAFE_METHODS
+            and status.is_success(response.status_code)
+        ):
+            transaction.on_commit(
+                lambda: bump_versions(self.cache_invalidates)
+            )
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class CachedListMixin(VersionedCacheMixin):
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class CachedRetrieveMixin(VersionedCacheMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,118 @@
+"""
+Выборочные поля ответа: `?fields=id,name` и `?exclude=description`.
+
+Сериализатор убирает лишние поля, а вьюсет сужает запрос к базе:
+загружает только нужные колонки и не присоединяет и не предвыбирает
+связи, которые не попадут в ответ.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = "fields"
+EXCLUDE_PARAM = "exclude"
+
+
+def split_names(value):
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def is_requested(params):
+    return bool(
+        split_names(params.get(FIELDS_PARAM, ""))
+        or split_names(params.get(EXCLUDE_PARAM, ""))
+    )
+
+
+def parse_fieldset(params, available):
+    """
+    Имена полей ответа или None, если выбор полей не запрошен.
+
+    Неизвестные имена полей приводят к ответу 400.
+    """
+    if not is_requested(params):
+        return None
+    fields = split_names(params.get(FIELDS_PARAM, ""))
+    exclude = split_names(params.get(EXCLUDE_PARAM, ""))
+    unknown = (fields | exclude) - set(available)
+    if unknown:
+        raise ValidationError({
+            FIELDS_PARAM: [
+                "Неизвестные поля: " + ", ".join(sorted(unknown)) + "."
+            ]
+        })
+    return (fields or set(available)) - exclude
+
+
+def is_read(request):
+    return request is not None and request.method in SAFE_METHODS
+
+
+class FieldsetSerializerMixin:
+    """Убирает поля, не выбранные параметрами запроса на чтение."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if not is_read(request):
+            return
+        keep = parse_fieldset(request.query_params, self.fields)
+        if keep is None:
+            return
+        for name in set(self.fields) - keep:
+            self.fields.pop(name)
+
+
+class FieldsetViewMixin:
+    """
+    Сужает запрос к базе до полей сериализатора после выбора полей.
+
+    Связи «многие ко многим» предвыбираются, внешние ключи
+    присоединяются, только если поле попадает в ответ. Если у поля нет
+    колонки в модели (например, это свойство), загружаются все колонки.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not is_read(self.request) or not is_requested(
+            self.request.query_params
+        ):
+            return queryset
+        return self.narrow_queryset(queryset, self.get_serializer().fields)
+
+    def fieldset_columns(self):
+        """Колонки, нужные вьюсету независимо от полей ответа."""
+        return {
+            field.lstrip("-")
+            for field in getattr(self, "cursor_ordering", ())
+        }
+
+    def narrow_queryset(self, queryset, fields):
+        meta = queryset.model._meta
+        columns = {meta.pk.name} | self.fieldset_columns()
+        select = []
+        prefetch = []
+        all_columns = False
+        for field in fields.values():
+            try:
+                model_field = meta.get_field(field.source)
+            except FieldDoesNotExist:
+                all_columns = True
+                continue
+            if model_field.many_to_many or model_field.one_to_many:
+                prefetch.append(field.source)
+                continue
+            columns.add(field.source)
+            if model_field.is_relation:
+                select.append(field.source)
+        queryset = (
+            queryset.select_related(None)
+            .prefetch_related(None)
+            .prefetch_related(*prefetch)
+        )
+        if select:
+            # select_related() без аргументов присоединяет все связи.
+            queryset = queryset.select_related(*select)
+        if all_columns:
+            return queryset
+        return queryset.only(*columns)
@@ -1,14 +1,24 @@
 import django_filters
 
 from reviews.models import Title
+from reviews.search import search_titles
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
 
 
 class TitleFilter(django_filters.FilterSet):
+    ids = NumberInFilter("id")
     category = django_filters.CharFilter("category__slug")
     genre = django_filters.CharFilter("genre__slug")
     name = django_filters.CharFilter("name")
     year = django_filters.NumberFilter("year")
+    search = django_filters.CharFilter(method="filter_search")
 
     class Meta:
         model = Title
-        fields = "__all__"
+        fields = ("name", "year", "description", "genre", "category")
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
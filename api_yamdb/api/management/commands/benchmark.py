@@ -0,0 +1,192 @@
+import importlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import (
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import clear_url_caches
+
+from api.benchmark import (
+    PERCENTILES,
+    Workload,
+    compare,
+    run_requests,
+    run_requests_asgi,
+    seed_dataset,
+    summarize,
+)
+
+LOCMEM_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+# Настройки SQLite по умолчанию: без PRAGMA, постоянных соединений и
+# повторов при блокировке, для сравнения с профилем из settings.
+PLAIN_SQLITE = {"SQLITE_PRAGMAS": {}, "SQLITE_LOCK_RETRIES": 0}
+
+
+def benchmark_caches():
+    """Все кеши из settings в памяти процесса, на время прогона."""
+    return {
+        alias: {**config, "BACKEND": LOCMEM_BACKEND, "LOCATION": alias}
+        for alias, config in settings.CACHES.items()
+    }
+
+
+def reload_urlconf():
+    clear_url_caches()
+    importlib.reload(importlib.import_module("api.urls"))
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+
+
+@contextmanager
+def async_read_views(enabled):
+    """Маршруты с ASYNC_READ_VIEWS=enabled на время прогона."""
+    if enabled == settings.ASYNC_READ_VIEWS:
+        yield
+        return
+    try:
+        with override_settings(ASYNC_READ_VIEWS=enabled):
+            reload_urlconf()
+            yield
+    finally:
+        reload_urlconf()
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный прогон API на временной базе с заданным объёмом "
+        "данных: задержки p50/p95/p99 и запросы в секунду по маршрутам."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--titles", type=int, default=1000)
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--reviews-per-title", type=int, default=5)
+        parser.add_argument("--comments-per-review", type=int, default=1)
+        parser.add_argument(
+            "--requests", type=int, default=2000,
+            help="Общее количество запросов.",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=8,
+            help="Количество одновременных клиентов.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--no-cache", action="store_true",
+            help="Отключить кеш ответов анонимным пользователям.",
+        )
+        parser.add_argument(
+            "--sqlite-profile", choices=("tuned", "plain"), default="tuned",
+            help="Профиль SQLite из settings или настройки по умолчанию.",
+        )
+        parser.add_argument(
+            "--asgi", action="store_true",
+            help="Запросы через ASGI-обработчик в одном цикле событий.",
+        )
+        parser.add_argument(
+            "--async-reads", action="store_true",
+            help="Асинхронные вьюхи чтения (ASYNC_READ_VIEWS), с --asgi.",
+        )
+        parser.add_argument("--output", help="Файл для результатов в JSON.")
+        parser.add_argument(
+            "--baseline", help="JSON предыдущего прогона для сравнения."
+        )
+        parser.add_argument(
+            "--max-regression", type=float,
+            help="Допустимый рост p95 в процентах относительно baseline.",
+        )
+
+    def handle(self, *args, **options):
+        connection = connections["default"]
+        directory = tempfile.mkdtemp()
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(
+            directory, "benchmark.sqlite3"
+        )
+        plain = options["sqlite_profile"] == "plain"
+        if plain:
+            connection.settings_dict["CONN_MAX_AGE"] = 0
+        setup_test_environment()
+        # PRAGMA применяются к соединениям, поэтому профиль включается
+        # до создания базы.
+        with override_settings(**(PLAIN_SQLITE if plain else {})):
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            try:
+                with override_settings(
+                    CACHES=benchmark_caches(),
+                    METRICS_DIR=os.path.join(directory, "metrics"),
+                    RESPONSE_CACHE_ENABLED=not options["no_cache"],
+                ), async_read_views(options["async_reads"]):
+                    summary = self.run(options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+                shutil.rmtree(directory)
+        self.report(summary, options)
+
+    def run(self, options):
+        # Ошибки 5xx учитываются в отчёте, трассировки и строки
+        # журнала на каждый запрос только мешают.
+        logging.getLogger("django.request").setLevel(logging.CRITICAL)
+        logging.getLogger("api.timing").setLevel(logging.WARNING)
+        seed_dataset(
+            titles=options["titles"],
+            users=options["users"],
+            reviews_per_title=options["reviews_per_title"],
+            comments_per_review=options["comments_per_review"],
+            seed=options["seed"],
+        )
+        plan = Workload(seed=options["seed"]).plan(options["requests"])
+        if not options["asgi"]:
+            results, duration = run_requests(plan, options["concurrency"])
+            return summarize(results, duration)
+        results, duration, peak = run_requests_asgi(
+            plan, options["concurrency"]
+        )
+        summary = summarize(results, duration)
+        summary["total"]["db_peak"] = peak
+        return summary
+
+    def report(self, summary, options):
+        columns = ["requests", "errors", "rps"] + [
+            f"p{rank}" for rank in PERCENTILES
+        ]
+        self.stdout.write("маршрут: " + ", ".join(columns) + " (мс)")
+        for route, stats in summary.items():
+            self.stdout.write(
+                f"{route}: "
+                + ", ".join(str(stats[column]) for column in columns)
+            )
+        if "db_peak" in summary["total"]:
+            self.stdout.write(
+                "Наибольшее число запросов, одновременно работавших "
+                "с базой: "
+                f"{summary['total']['db_peak']}"
+            )
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                json.dump(summary, file, ensure_ascii=False, indent=2)
+        if not options["baseline"]:
+            return
+        with open(options["baseline"], encoding="utf-8") as file:
+            baseline = json.load(file)
+        lines, regressions = compare(
+            summary, baseline, options["max_regression"]
+        )
+        self.stdout.write("Сравнение с baseline:")
+        for line in lines:
+            self.stdout.write(line)
+        if regressions:
+            raise CommandError(
+                "Рост p95 больше допустимого: " + ", ".join(regressions)
+            )
@@ -0,0 +1,64 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def copy_database(name):
+    """
+    Копирует основную базу SQLite в файл `name` через backup API.
+
+    Копия записывается в файл реплики под её блокировкой записи, поэтому
+    открытые соединения реплики видят либо старую, либо новую копию
+    целиком.
+    """
+    source = connections[DEFAULT_DB_ALIAS]
+    source.ensure_connection()
+    target = sqlite3.connect(name)
+    try:
+        source.connection.backup(target)
+    finally:
+        target.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Копирует основную базу SQLite в реплики для чтения: один раз "
+        "или периодически с --interval."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database", action="append", dest="databases",
+            help="Реплика для копирования, по умолчанию все "
+                 "из REPLICA_DATABASES.",
+        )
+        parser.add_argument(
+            "--interval", type=float,
+            help="Повторять копирование каждые N секунд.",
+        )
+
+    def handle(self, *args, **options):
+        aliases = options["databases"] or settings.REPLICA_DATABASES
+        if not aliases:
+            raise CommandError("Реплики не указаны в REPLICA_DATABASES.")
+        for alias in (DEFAULT_DB_ALIAS, *aliases):
+            if alias not in connections.databases:
+                raise CommandError(f"Неизвестная база данных: {alias}.")
+            if connections[alias].vendor != "sqlite":
+                raise CommandError(
+                    f"Копирование поддерживается только для SQLite: {alias}."
+                )
+        while True:
+            for alias in aliases:
+                started = time.perf_counter()
+                copy_database(connections[alias].settings_dict["NAME"])
+                self.stdout.write(
+                    f"{alias}: скопировано за "
+                    f"{(time.perf_counter() - started) * 1000:.0f} мс"
+                )
+            if options["interval"] is None:
+                return
+            time.sleep(options["interval"])
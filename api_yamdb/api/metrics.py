@@ -0,0 +1,395 @@
+"""
+Метрики в текстовом формате Prometheus с агрегацией по процессам.
+
+Каждый процесс пишет значения в собственный файл `<pid>.db` в каталоге
+`METRICS_DIR`, отображённый в память через mmap, поэтому запись не
+требует блокировок между процессами. `/metrics` суммирует файлы всех
+процессов хоста. Значения завершившихся процессов при сборе
+переносятся в общий файл `merged.db`, а их файлы удаляются, поэтому
+счётчики не уменьшаются при перезапуске воркеров и каталог не растёт.
+
+Доступ к `/metrics` открыт только по токену `METRICS_TOKEN` в заголовке
+`Authorization: Bearer` или с адресов из `METRICS_ALLOWED_IPS`.
+"""
+import fcntl
+import hmac
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from math import inf
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+INITIAL_SIZE = 64 * 1024
+HEADER = struct.Struct("q")
+LENGTH = struct.Struct("i")
+VALUE = struct.Struct("d")
+MERGED_FILENAME = "merged.db"
+
+REGISTRY = []
+
+
+def read_entries(buffer):
+    """Записи файла: ключ, значение и смещение значения."""
+    used = HEADER.unpack_from(buffer, 0)[0]
+    position = HEADER.size
+    while position < used:
+        length = LENGTH.unpack_from(buffer, position)[0]
+        start = position + LENGTH.size
+        key = bytes(buffer[start:start + length]).decode()
+        offset = start + length + (-(LENGTH.size + length) % VALUE.size)
+        yield key, VALUE.unpack_from(buffer, offset)[0], offset
+        position = offset + VALUE.size
+
+
+def pack_entries(values):
+    """Содержимое файла в формате `MmapStore` с заданными значениями."""
+    parts = []
+    for key, value in values.items():
+        encoded = key.encode()
+        padding = -(LENGTH.size + len(encoded)) % VALUE.size
+        parts.append(
+            LENGTH.pack(len(encoded)) + encoded + bytes(padding)
+            + VALUE.pack(value)
+        )
+    body = b"".join(parts)
+    return HEADER.pack(HEADER.size + len(body)) + body
+
+
+@contextmanager
+def lock_directory(directory):
+    """
+    Блокировка каталога метрик между процессами.
+
+    Удерживается при открытии файла процесса и при сборе, чтобы файл
+    процесса с повторно выданным pid не удалялся после открытия.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, ".lock"), "a") as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+def file_pid(filename):
+    """Pid процесса по имени его файла или None для прочих файлов."""
+    name, extension = os.path.splitext(filename)
+    if extension != ".db" or not name.isdigit():
+        return None
+    return int(name)
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge_dead_processes(directory):
+    """
+    Переносит значения завершившихся процессов в `merged.db`.
+
+    Вызывается под `lock_directory`. Новый файл записывается целиком и
+    подменяет старый атомарно, после чего файлы процессов удаляются.
+    """
+    dead = [
+        os.path.join(directory, filename)
+        for filename in os.listdir(directory)
+        if file_pid(filename) not in (None, os.getpid())
+        and not is_alive(file_pid(filename))
+    ]
+    if not dead:
+        return
+    merged = os.path.join(directory, MERGED_FILENAME)
+    values = defaultdict(float)
+    for path in [merged, *dead]:
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as file:
+            buffer = file.read()
+        if len(buffer) < HEADER.size:
+            continue
+        for key, value, _ in read_entries(buffer):
+            values[key] += value
+    temporary = f"{merged}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(pack_entries(values))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, merged)
+    for path in dead:
+        os.remove(path)
+
+
+class MmapStore:
+    """
+    Значения метрик одного процесса в файле, отображённом в память.
+
+    Новая запись сначала заполняется, а затем учитывается в заголовке с
+    размером занятой части, поэтому читатели из других процессов видят
+    только целые записи.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        with lock_directory(directory):
+            self.file = open(
+                os.path.join(directory, f"{self.pid}.db"), "a+b"
+            )
+            size = os.fstat(self.file.fileno()).st_size
+            if size < INITIAL_SIZE:
+                self.file.truncate(INITIAL_SIZE)
+                size = INITIAL_SIZE
+            self.map = mmap.mmap(self.file.fileno(), size)
+        if HEADER.unpack_from(self.map, 0)[0] == 0:
+            HEADER.pack_into(self.map, 0, HEADER.size)
+        self.positions = {
+            key: offset for key, _, offset in read_entries(self.map)
+        }
+
+    def inc(self, key, amount=1):
+        with self.lock:
+            offset = self.positions.get(key)
+            if offset is None:
+                offset = self.allocate(key)
+            value = VALUE.unpack_from(self.map, offset)[0]
+            VALUE.pack_into(self.map, offset, value + amount)
+
+    def allocate(self, key):
+        encoded = key.encode()
+        padding = -(LENGTH.size + len(encoded)) % VALUE.size
+        size = LENGTH.size + len(encoded) + padding + VALUE.size
+        used = HEADER.unpack_from(self.map, 0)[0]
+        if used + size > len(self.map):
+            self.resize(max(len(self.map) * 2, used + size))
+        LENGTH.pack_into(self.map, used, len(encoded))
+        start = used + LENGTH.size
+        self.map[start:start + len(encoded)] = encoded
+        offset = start + len(encoded) + padding
+        VALUE.pack_into(self.map, offset, 0.0)
+        HEADER.pack_into(self.map, 0, used + size)
+        self.positions[key] = offset
+        return offset
+
+    def resize(self, size):
+        self.map.close()
+        self.file.truncate(size)
+        self.map = mmap.mmap(self.file.fileno(), size)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Хранилище текущего процесса; после fork создаётся заново.
+
+    При выключенных метриках возвращает None.
+    """
+    global _store
+    if not settings.METRICS_ENABLED:
+        return None
+    directory = str(settings.METRICS_DIR)
+    store = _store
+    if (
+        store is None
+        or store.pid != os.getpid()
+        or store.directory != directory
+    ):
+        with _store_lock:
+            store = _store
+            if (
+                store is None
+                or store.pid != os.getpid()
+                or store.directory != directory
+            ):
+                store = _store = MmapStore(directory)
+    return store
+
+
+def collect(directory):
+    """
+    Суммирует значения из файлов всех процессов.
+
+    Файл читается целиком: заголовок с размером занятой части
+    прочитан раньше записей, поэтому все учтённые в нём записи целые.
+    """
+    values = defaultdict(float)
+    with lock_directory(directory):
+        merge_dead_processes(directory)
+        for filename in os.listdir(directory):
+            if not filename.endswith(".db"):
+                continue
+            with open(os.path.join(directory, filename), "rb") as file:
+                buffer = file.read()
+            if len(buffer) < HEADER.size:
+                continue
+            for key, value, _ in read_entries(buffer):
+                values[key] += value
+    return values
+
+
+def format_value(value):
+    if value == inf:
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (name, str(value).replace("\\", r"\\").replace('"', r"\"")
+         .replace("\n", r"\n"))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def key(self, sample, labels, extra=()):
+        values = [[name, str(labels[name])] for name in self.labelnames]
+        return json.dumps([sample, values + [list(pair) for pair in extra]])
+
+    def render(self, samples):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for sample, labels, value in self.samples(samples):
+            lines.append(
+                f"{sample}{format_labels(labels)} {format_value(value)}"
+            )
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        store = get_store()
+        if store is not None:
+            store.inc(self.key(self.name, labels), amount)
+
+    def samples(self, samples):
+        for labels, value in sorted(samples.get(self.name, {}).items()):
+            yield self.name, labels, value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (inf,)
+
+    def observe(self, value, **labels):
+        store = get_store()
+        if store is None:
+            return
+        bucket = next(bound for bound in self.buckets if value <= bound)
+        store.inc(self.key(
+            f"{self.name}_bucket", labels, [("le", format_value(bucket))]
+        ))
+        store.inc(self.key(f"{self.name}_sum", labels), value)
+        store.inc(self.key(f"{self.name}_count", labels))
+
+    def samples(self, samples):
+        """Бакеты хранятся без накопления и суммируются при выводе."""
+        buckets = samples.get(f"{self.name}_bucket", {})
+        sums = samples.get(f"{self.name}_sum", {})
+        for labels, count in sorted(
+            samples.get(f"{self.name}_count", {}).items()
+        ):
+            total = 0
+            for bound in self.buckets:
+                le = format_value(bound)
+                total += buckets.get(labels + (("le", le),), 0)
+                yield f"{self.name}_bucket", labels + (("le", le),), total
+            yield f"{self.name}_sum", labels, sums.get(labels, 0)
+            yield f"{self.name}_count", labels, count
+
+
+def render_metrics(directory):
+    samples = defaultdict(dict)
+    for key, value in collect(directory).items():
+        sample, labels = json.loads(key)
+        samples[sample][tuple(tuple(pair) for pair in labels)] = value
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render(samples))
+    return "\n".join(lines) + "\n"
+
+
+def is_metrics_allowed(request):
+    token = settings.METRICS_TOKEN
+    if token and hmac.compare_digest(
+        request.headers.get("Authorization", "").encode(),
+        f"Bearer {token}".encode(),
+    ):
+        return True
+    return request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    if not is_metrics_allowed(request):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_metrics(str(settings.METRICS_DIR)), content_type=CONTENT_TYPE
+    )
+
+
+REQUEST_LABELS = ("route", "method", "status")
+
+requests_total = Counter(
+    "yamdb_http_requests_total",
+    "Количество обработанных HTTP-запросов.",
+    REQUEST_LABELS,
+)
+request_duration = Histogram(
+    "yamdb_http_request_duration_seconds",
+    "Время обработки HTTP-запроса в секундах.",
+    REQUEST_LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+response_size = Histogram(
+    "yamdb_http_response_size_bytes",
+    "Размер тела ответа в байтах.",
+    REQUEST_LABELS,
+    buckets=(100, 1000, 10000, 100000, 1000000),
+)
+db_queries = Histogram(
+    "yamdb_http_db_queries",
+    "Количество SQL-запросов на один HTTP-запрос.",
+    REQUEST_LABELS,
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+auth_events = Counter(
+    "yamdb_auth_events_total",
+    "Результаты регистрации и получения токена.",
+    ("action", "outcome"),
+)
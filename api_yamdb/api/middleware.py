@@ -0,0 +1,250 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from types import MethodType
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from api import metrics
+
+logger = logging.getLogger("api.timing")
+
+current_timing = ContextVar("current_timing", default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    timing = current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    return timing(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs):
+    """
+    Подключает к соединению счётчик запросов текущего `RequestTiming`.
+
+    Запрос находится через contextvar, поэтому учитываются и запросы из
+    потоков `sync_to_async`, в которых выполняются вьюхи под ASGI.
+    """
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, count_query)
+
+
+def route_name(request):
+    match = request.resolver_match
+    return match.view_name if match else "unmatched"
+
+
+class RequestTiming:
+    """
+    Счётчики одного запроса: SQL, время вьюхи и рендеринга.
+
+    `db_started` и `db_finished` - начало первого и конец последнего
+    SQL-запроса.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.db_started = None
+        self.db_finished = None
+        self.view_started = None
+        self.view_finished = None
+        self.rendered = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        if self.db_started is None:
+            self.db_started = started
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_finished = time.perf_counter()
+            self.db += self.db_finished - started
+            self.queries += 1
+
+    @contextmanager
+    def track(self):
+        """Считает SQL-запросы, выполненные внутри блока."""
+        token = current_timing.set(self)
+        try:
+            yield
+        finally:
+            current_timing.reset(token)
+
+    def durations(self, finished):
+        """Длительности этапов в миллисекундах."""
+        view_started = self.view_started or self.started
+        view_finished = self.view_finished or finished
+        return {
+            "db": self.db * 1000,
+            "view": (view_finished - view_started) * 1000,
+            "render": (
+                (self.rendered - view_finished) * 1000 if self.rendered else 0
+            ),
+            "total": (finished - self.started) * 1000,
+        }
+
+
+def run_inline(hook):
+    """
+    Асинхронная обёртка для хука middleware без ввода-вывода.
+
+    Остаётся методом экземпляра: Django берёт из `__self__` имя класса
+    для сообщений об ошибках.
+    """
+
+    async def wrapper(self, *args):
+        return hook(*args)
+
+    return MethodType(wrapper, hook.__self__)
+
+
+class HybridMiddleware:
+    """
+    Middleware для WSGI и ASGI.
+
+    Под ASGI цепочка остаётся асинхронной и не занимает поток на время
+    всего запроса. Хуки `process_view` и `process_template_response`
+    ничего не ждут, поэтому вызываются в цикле событий, а не в общем
+    потоке для синхронного кода.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Так же, как MiddlewareMixin отмечает асинхронный режим.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            for name in ("process_view", "process_template_response"):
+                if hasattr(self, name):
+                    setattr(self, name, run_inline(getattr(self, name)))
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        with self.track(request):
+            response = self.get_response(request)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        with self.track(request):
+            response = await self.get_response(request)
+        return self.finish(request, response)
+
+    def track(self, request):
+        return nullcontext()
+
+    def finish(self, request, response):
+        return response
+
+
+class ServerTimingMiddleware(HybridMiddleware):
+    """
+    Количество SQL-запросов и время этапов обработки запроса.
+
+    Включается настройкой `SERVER_TIMING_ENABLED`. Результат пишется в
+    лог `api.timing` строкой `ключ=значение` и отдаётся в заголовке
+    `Server-Timing` только сотрудникам: число запросов и время работы с
+    базой не должны быть видны остальным клиентам. SQL-запросы
+    считаются обёрткой `execute_wrapper` без сохранения их текста,
+    поэтому накладные расходы не зависят от DEBUG.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def track(self, request):
+        request.timing = RequestTiming()
+        return request.timing.track()
+
+    def finish(self, request, response):
+        timing = request.timing
+        durations = timing.durations(time.perf_counter())
+        # Пользователя JWT-аутентификации DRF записывает в request.user.
+        if getattr(getattr(request, "user", None), "is_staff", False):
+            response["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={durations["db"]:.2f};'
+                    f'desc="{timing.queries} queries"'
+                ]
+                + [
+                    f"{name};dur={durations[name]:.2f}"
+                    for name in ("view", "render", "total")
+                ]
+            )
+        logger.info(
+            "method=%s path=%s route=%s status=%s queries=%s db_ms=%.2f "
+            "view_ms=%.2f render_ms=%.2f total_ms=%.2f",
+            request.method,
+            request.path,
+            route_name(request),
+            response.status_code,
+            timing.queries,
+            durations["db"],
+            durations["view"],
+            durations["render"],
+            durations["total"],
+            extra={"timing": dict(durations, queries=timing.queries)},
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timing.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        timing = request.timing
+        timing.view_finished = time.perf_counter()
+
+        def rendered(response):
+            timing.rendered = time.perf_counter()
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class MetricsMiddleware(HybridMiddleware):
+    """
+    Метрики запросов по маршруту, методу и статусу ответа.
+
+    Включается настройкой `METRICS_ENABLED`. Использует счётчик
+    запросов `ServerTimingMiddleware`, если тот подключён раньше.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def track(self, request):
+        if getattr(request, "timing", None) is not None:
+            return nullcontext()
+        request.timing = RequestTiming()
+        return request.timing.track()
+
+    def finish(self, request, response):
+        timing = request.timing
+        labels = {
+            "route": route_name(request),
+            "method": request.method,
+            "status": response.status_code,
+        }
+        metrics.requests_total.inc(**labels)
+        metrics.request_duration.observe(
+            time.perf_counter() - timing.started, **labels
+        )
+        metrics.db_queries.observe(timing.queries, **labels)
+        if not response.streaming:
+            metrics.response_size.observe(len(response.content), **labels)
+        return response
@@ -0,0 +1,198 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def order_expressions(model, ordering, nulls_first=False):
+    """
+    Выражения ORDER BY для полей порядка.
+
+    Значения NULL в полях, которые их допускают, идут после остальных
+    при любом направлении сортировки, а при обходе в обратную сторону -
+    перед остальными, чтобы порядок не зависел от СУБД.
+    """
+    expressions = []
+    for field in ordering:
+        name = field.lstrip("-")
+        if not model._meta.get_field(name).null:
+            expressions.append(field)
+            continue
+        nulls = {"nulls_first": True} if nulls_first else {"nulls_last": True}
+        if field.startswith("-"):
+            expressions.append(F(name).desc(**nulls))
+        else:
+            expressions.append(F(name).asc(**nulls))
+    return expressions
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод по ключу (keyset) без COUNT и OFFSET.
+
+    Порядок задаётся атрибутом вьюсета `cursor_ordering` и должен
+    заканчиваться уникальным полем. Курсор хранит значения полей
+    порядка крайнего объекта страницы, поэтому вставка новых записей
+    не сдвигает уже выданные страницы. Поля, допускающие NULL,
+    сортируются с NULL в конце.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = PageNumberPagination.page_size
+    invalid_cursor_message = "Неверный курсор."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = tuple(view.cursor_ordering)
+        self.model = queryset.model
+        position, reverse = self.decode_cursor(request)
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(self.invert(field) for field in ordering)
+        queryset = queryset.order_by(
+            *order_expressions(self.model, ordering, nulls_first=reverse)
+        )
+        if position is not None:
+            queryset = queryset.filter(
+                self.after(ordering, position, nulls_first=reverse)
+            )
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+            ("results", data),
+        ]))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            url = self.request.build_absolute_uri()
+            return remove_query_param(url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith("-") else f"-{field}"
+
+    def after(self, ordering, position, nulls_first=False):
+        """Условие «строго после позиции» для лексикографического порядка."""
+        conditions = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip("-")
+            value = position[name]
+            if value is None:
+                # После NULL идут только значения, если NULL в начале.
+                if not nulls_first:
+                    continue
+                greater = Q(**{f"{name}__isnull": False})
+            else:
+                lookup = "lt" if field.startswith("-") else "gt"
+                greater = Q(**{f"{name}__{lookup}": value})
+                if self.model._meta.get_field(name).null and not nulls_first:
+                    greater |= Q(**{f"{name}__isnull": True})
+            equal = [
+                self.equal(previous.lstrip("-"), position)
+                for previous in ordering[:index]
+            ]
+            conditions.append(reduce(and_, equal, greater))
+        return reduce(or_, conditions)
+
+    @staticmethod
+    def equal(name, position):
+        if position[name] is None:
+            return Q(**{f"{name}__isnull": True})
+        return Q(**{name: position[name]})
+
+    def get_position(self, item):
+        names = (field.lstrip("-") for field in self.ordering)
+        if isinstance(item, dict):
+            values = (item[name] for name in names)
+        else:
+            values = (getattr(item, name) for name in names)
+        # Даты сериализуются с микросекундами, иначе курсор потеряет
+        # точность и начнёт пропускать или повторять записи.
+        return [
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in values
+        ]
+
+    def encode_cursor(self, item, reverse):
+        payload = {"p": self.get_position(item), "r": int(reverse)}
+        cursor = urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor.encode()))
+            names = [field.lstrip("-") for field in self.ordering]
+            values = payload["p"]
+            if len(values) != len(names):
+                raise ValueError(cursor)
+            position = {
+                name: self.model._meta.get_field(name).to_python(value)
+                for name, value in zip(names, values)
+            }
+            return position, bool(payload.get("r"))
+        except (KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """
+    Постраничный вывод по номеру страницы с опциональным режимом курсора.
+
+    Режим курсора включается параметром `?pagination=cursor` или
+    наличием параметра `cursor`; без них ответ не меняется.
+    """
+
+    mode_query_param = "pagination"
+    keyset_class = KeysetPagination
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
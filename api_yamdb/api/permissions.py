@@ -29,7 +29,7 @@ class IsAuthorOrModeratorOrAdminOrReadOnly(BasePermission):
             return True
         user = request.user
         return (
-            obj.author == user
+            obj.author_id == user.id
             or user.is_moderator
             or user.is_admin
         )
@@ -0,0 +1,91 @@
+"""
+Чтение из реплик базы данных с учётом собственных изменений.
+
+Безопасные запросы к вьюсетам с `ReplicaReadMixin` читают из одной из
+реплик `REPLICA_DATABASES`, остальные запросы и весь код вне этих
+вьюсетов работают с основной базой. После успешного изменяющего запроса
+пользователь `REPLICA_STICKY_SECONDS` секунд читает из основной базы и
+видит свои изменения; окно должно быть не меньше задержки копирования
+реплики.
+
+Выбранная база хранится в contextvar, поэтому не протекает между
+запросами в потоках и корутинах.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework import status
+from rest_framework.permissions import SAFE_METHODS
+
+STICKY_KEY = "replica:sticky:{}"
+
+read_database = ContextVar("read_database", default=None)
+
+
+class ReplicaRouter:
+    """Чтение из базы, выбранной для запроса, запись - в основную."""
+
+    def db_for_read(self, model, **hints):
+        return read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
+
+
+@contextmanager
+def primary():
+    """Чтение из основной базы внутри блока."""
+    token = read_database.set(None)
+    try:
+        yield
+    finally:
+        read_database.reset(token)
+
+
+def stick_to_primary(user):
+    cache.set(
+        STICKY_KEY.format(user.pk), True, settings.REPLICA_STICKY_SECONDS
+    )
+
+
+def choose_database(request):
+    """Реплика для запроса или None, если нужна основная база."""
+    if not settings.REPLICA_DATABASES or request.method not in SAFE_METHODS:
+        return None
+    user = request.user
+    if user.is_authenticated and cache.get(STICKY_KEY.format(user.pk)):
+        return None
+    return random.choice(settings.REPLICA_DATABASES)
+
+
+class ReplicaReadMixin:
+    """Направляет чтение безопасных запросов вьюсета в реплику."""
+
+    replica_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.replica_token = read_database.set(choose_database(request))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self.replica_token is not None:
+            read_database.reset(self.replica_token)
+            self.replica_token = None
+        if (
+            settings.REPLICA_DATABASES
+            and request.method not in SAFE_METHODS
+            and status.is_success(response.status_code)
+            and request.user.is_authenticated
+        ):
+            stick_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
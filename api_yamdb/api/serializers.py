@@ -1,39 +1,94 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from rest_framework import serializers
+from django.db import transaction
+from rest_framework import serializers, status
 from rest_framework.exceptions import NotFound, ValidationError
 
+from api.fieldsets import FieldsetSerializerMixin
 from api_yamdb.settings import DEFAULT_FROM_EMAIL
-from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.batch import bulk_create_titles
+from reviews.leaderboards import TOP_LIMIT
+from reviews.models import (AGGREGATE_FIELDS, Category, Comment, Genre,
+                            Review, Title)
 from users.constants import EMAIL_MAX_LENGTH, USERNAME_MAX_LENGTH
+from users.outbox import enqueue_email
 from users.validators import validate_username
 
 User = get_user_model()
 
+HISTOGRAM_BATCH_LIMIT = 100
+# Наибольшее значение первичного ключа (64-битного целого в базе).
+MAX_ID = 2 ** 63 - 1
+TITLE_BATCH_LIMIT = 5000
 
-class GenreSerializer(serializers.ModelSerializer):
+
+class GenreSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Genre
         fields = ("name", "slug")
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ("name", "slug")
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     category = CategorySerializer(many=False, read_only=True)
     genre = GenreSerializer(many=True, required=True)
     rating = serializers.IntegerField(read_only=True, default=None)
 
     class Meta:
-        fields = "__all__"
+        exclude = AGGREGATE_FIELDS
         model = Title
 
 
+class TitleHistogramSerializer(TitleSerializer):
+    """Произведение вместе с распределением оценок от 1 до 10."""
+
+    score_histogram = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+
+class ScoreHistogramSerializer(
+    FieldsetSerializerMixin, serializers.ModelSerializer
+):
+    score_histogram = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
+
+    class Meta:
+        model = Title
+        fields = ("id", "score_histogram")
+
+
+class HistogramIdsSerializer(serializers.Serializer):
+    """Параметры запроса гистограмм: `ids=1,2,3`."""
+
+    ids = serializers.CharField()
+
+    def validate_ids(self, value):
+        id_field = serializers.IntegerField(min_value=1, max_value=MAX_ID)
+        try:
+            ids = [
+                id_field.run_validation(item)
+                for item in value.split(",")
+            ]
+        except ValidationError:
+            raise ValidationError(
+                "Укажите id произведений через запятую: целые числа от 1 "
+                f"до {MAX_ID}."
+            )
+        if not 0 < len(ids) <= HISTOGRAM_BATCH_LIMIT:
+            raise ValidationError(
+                f"Можно запросить от 1 до {HISTOGRAM_BATCH_LIMIT} "
+                "произведений."
+            )
+        return list(dict.fromkeys(ids))
+
+
 class TitleCreateSerializer(serializers.ModelSerializer):
     category = serializers.SlugRelatedField(
         slug_field="slug", queryset=Category.objects.all()
@@ -48,14 +103,131 @@ class TitleCreateSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(default=None, read_only=True)
 
     class Meta:
-        fields = "__all__"
+        exclude = AGGREGATE_FIELDS
         model = Title
 
     def to_representation(self, instance):
         return TitleSerializer(instance).data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleBatchItemSerializer(serializers.ModelSerializer):
+    """
+    Произведение из пакетного создания.
+
+    Слаги ищутся в словарях `categories` и `genres` из контекста, которые
+    `TitleBatchSerializer` загружает одним запросом на модель для всей
+    пачки.
+    """
+
+    category = serializers.SlugField()
+    genre = serializers.ListField(
+        child=serializers.SlugField(), allow_empty=False
+    )
+
+    class Meta:
+        model = Title
+        fields = ("name", "year", "description", "category", "genre")
+
+    def lookup(self, name, slug):
+        try:
+            return self.context[name][slug]
+        except KeyError:
+            raise ValidationError(
+                serializers.SlugRelatedField.default_error_messages[
+                    "does_not_exist"
+                ].format(slug_name="slug", value=slug)
+            )
+
+    def validate_category(self, value):
+        return self.lookup("categories", value)
+
+    def validate_genre(self, value):
+        return [self.lookup("genres", slug) for slug in dict.fromkeys(value)]
+
+
+class TitleBatchSerializer(serializers.Serializer):
+    """
+    Пакетное создание произведений.
+
+    Каждое произведение проверяется отдельно: корректные создаются, для
+    остальных в результате возвращаются ошибки.
+    """
+
+    titles = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=TITLE_BATCH_LIMIT,
+    )
+
+    @staticmethod
+    def slugs(items, name):
+        values = set()
+        for item in items:
+            value = item.get(name)
+            for slug in value if isinstance(value, list) else [value]:
+                if isinstance(slug, str):
+                    values.add(slug)
+        return values
+
+    def create(self, validated_data):
+        items = validated_data["titles"]
+        context = {
+            "categories": Category.objects.in_bulk(
+                self.slugs(items, "category"), field_name="slug"
+            ),
+            "genres": Genre.objects.in_bulk(
+                self.slugs(items, "genre"), field_name="slug"
+            ),
+        }
+        results = []
+        valid = []
+        for item in items:
+            serializer = TitleBatchItemSerializer(data=item, context=context)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+                results.append(None)
+            else:
+                results.append({
+                    "status": status.HTTP_400_BAD_REQUEST,
+                    "errors": serializer.errors,
+                })
+        titles = iter(bulk_create_titles(valid))
+        for index, result in enumerate(results):
+            if result is None:
+                results[index] = {
+                    "status": status.HTTP_201_CREATED,
+                    "id": next(titles).id,
+                }
+        return results
+
+
+class TopTitlesSerializer(serializers.Serializer):
+    """Параметры запроса лучших произведений."""
+
+    category = serializers.SlugField(required=False)
+    genre = serializers.SlugField(required=False)
+    # Границы SmallIntegerField года произведения.
+    year = serializers.IntegerField(
+        required=False, min_value=-2 ** 15, max_value=2 ** 15 - 1
+    )
+    min_reviews = serializers.IntegerField(
+        min_value=1, max_value=MAX_ID, default=1
+    )
+    limit = serializers.IntegerField(
+        min_value=1, max_value=TOP_LIMIT, default=10
+    )
+
+
+class ReviewSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
+    """
+    Повторный отзыв автора на произведение отклоняет ограничение
+    `unique_review` в базе данных: проверка перед вставкой не защищает от
+    одновременных запросов и стоит лишнего запроса.
+    """
+
+    default_error_messages = {
+        "duplicate": "Вы уже оставили отзыв на это произведение.",
+    }
     author = serializers.SlugRelatedField(
         slug_field="username", read_only=True
     )
@@ -65,25 +237,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ["id", "text", "author", "score", "pub_date"]
         read_only_fields = ("title", "pub_date")
 
-    def validate(self, data):
-        request = self.context["request"]
-        title_id = self.context["view"].kwargs.get("title_id")
-        author = request.user
-
-        if (
-            request.method == "POST"
-            and Review.objects.filter(
-                title_id=title_id, author=author
-            ).exists()
-        ):
-            raise serializers.ValidationError(
-                "Вы уже оставили отзыв на это произведение."
-            )
-
-        return data
-
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field="username", read_only=True
     )
@@ -123,6 +278,7 @@ class SignupSerializer(serializers.Serializer):
 
         return data
 
+    @transaction.atomic
     def create(self, validated_data):
         user, _ = User.objects.get_or_create(
             username=validated_data['username'],
@@ -131,12 +287,11 @@ class SignupSerializer(serializers.Serializer):
 
         confirmation_code = default_token_generator.make_token(user)
 
-        send_mail(
+        enqueue_email(
             subject='Код подтверждения YaMDb',
-            message=f'Ваш код подтверждения: {confirmation_code}',
+            body=f'Ваш код подтверждения: {confirmation_code}',
             from_email=DEFAULT_FROM_EMAIL,
-            recipient_list=[validated_data['email']],
-            fail_silently=False,
+            recipient=validated_data['email'],
         )
 
         return user
@@ -162,7 +317,7 @@ class TokenSerializer(serializers.Serializer):
         return data
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(FieldsetSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = User
@@ -0,0 +1,21 @@
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.utils import aware_utcnow, datetime_to_epoch
+
+ROLE_CLAIMS = ("role", "is_active", "is_staff", "is_superuser")
+
+
+class RoleAccessToken(AccessToken):
+    """
+    Access-токен с ролью и флагами пользователя в подписанных claims.
+
+    Время выпуска `iat` позволяет отличить токены, выпущенные до смены
+    роли, и проверить их по базе данных.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in ROLE_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token["iat"] = datetime_to_epoch(aware_utcnow())
+        return token
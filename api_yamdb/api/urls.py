@@ -1,9 +1,12 @@
+from django.conf import settings
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_nested.routers import NestedDefaultRouter
 
+from api.async_views import with_async_reads
 from api.views import (AuthViewSet, CategoryViewSet, CommentViewSet,
-                       GenreViewSet, ReviewViewSet, TitleViewSet, UserViewSet)
+                       ExportViewSet, GenreViewSet, ReviewViewSet,
+                       TitleViewSet, UserViewSet)
 
 router = DefaultRouter()
 router.register("titles", TitleViewSet)
@@ -11,6 +14,7 @@ router.register("categories", CategoryViewSet)
 router.register("genres", GenreViewSet)
 router.register("users", UserViewSet, basename="users")
 router.register("auth", AuthViewSet, basename="auth")
+router.register("export", ExportViewSet, basename="export")
 
 titles_router = NestedDefaultRouter(router, "titles", lookup="title")
 titles_router.register("reviews", ReviewViewSet, basename="title-reviews")
@@ -18,8 +22,12 @@ titles_router.register("reviews", ReviewViewSet, basename="title-reviews")
 reviews_router = NestedDefaultRouter(titles_router, "reviews", lookup="review")
 reviews_router.register("comments", CommentViewSet, basename="review-comments")
 
+v1_urls = router.urls + titles_router.urls + reviews_router.urls
+if settings.ASYNC_READ_VIEWS:
+    v1_urls = with_async_reads(
+        v1_urls, (TitleViewSet, ReviewViewSet, CommentViewSet)
+    )
+
 urlpatterns = [
-    path("v1/", include(router.urls)),
-    path("v1/", include(titles_router.urls)),
-    path("v1/", include(reviews_router.urls)),
+    path("v1/", include(v1_urls)),
 ]
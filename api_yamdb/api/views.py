@@ -1,30 +1,56 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, viewsets
+from rest_framework import filters, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework.settings import api_settings
 
+from api.cache import (CachedListMixin, CachedRetrieveMixin,
+                       VersionedCacheMixin)
+from api.export import CONTENT_TYPES, encode, export_lines
+from api.fieldsets import FieldsetViewMixin
 from api.filters import TitleFilter
+from api.metrics import auth_events
+from api.pagination import PageNumberOrKeysetPagination, order_expressions
 from api.permissions import (IsAdmin, IsAdminOrReadOnly,
                              IsAuthorOrModeratorOrAdminOrReadOnly)
+from api.replicas import ReplicaReadMixin
+from api.rows import (COMMENT_COLUMNS, REVIEW_COLUMNS, TITLE_COLUMNS,
+                      FastListMixin, comment_records, review_records,
+                      title_records)
 from api.serializers import (CategorySerializer, CommentSerializer,
-                             GenreSerializer, ReviewSerializer,
-                             SignupSerializer, TitleCreateSerializer,
-                             TitleSerializer, TokenSerializer, UserSerializer)
-from reviews.models import Category, Genre, Review, Title
-
-from .base_viewsets import GroupBaseViewSet
+                             GenreSerializer, HistogramIdsSerializer,
+                             ReviewSerializer, ScoreHistogramSerializer,
+                             SignupSerializer, TitleBatchSerializer,
+                             TitleCreateSerializer,
+                             TitleHistogramSerializer, TitleSerializer,
+                             TokenSerializer, TopTitlesSerializer,
+                             UserSerializer)
+from api.tokens import RoleAccessToken
+from api_yamdb.db import retry_locked
+from reviews.leaderboards import sync_title_leaderboards, top_titles
+from reviews.models import SCORE_FIELDS, Category, Genre, Review, Title
+from reviews.ratings import apply_review_change
+
+from .base_viewsets import (ForgetReviewsMixin, GroupBaseViewSet,
+                            RetryLockedMixin)
 
 User = get_user_model()
 
 
-class CategoryViewSet(GroupBaseViewSet):
+class CategoryViewSet(CachedListMixin, GroupBaseViewSet):
     queryset = Category.objects.all()
+    query_budget = {"list": 2}
+    cache_dependencies = ("category",)
+    cache_invalidates = ("category",)
     serializer_class = CategorySerializer
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
@@ -32,8 +58,11 @@ class CategoryViewSet(GroupBaseViewSet):
     lookup_field = "slug"
 
 
-class GenreViewSet(GroupBaseViewSet):
+class GenreViewSet(CachedListMixin, GroupBaseViewSet):
     queryset = Genre.objects.all()
+    query_budget = {"list": 2}
+    cache_dependencies = ("genre",)
+    cache_invalidates = ("genre",)
     serializer_class = GenreSerializer
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
@@ -41,26 +70,172 @@ class GenreViewSet(GroupBaseViewSet):
     lookup_field = "slug"
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(
+    ReplicaReadMixin,
+    RetryLockedMixin,
+    ForgetReviewsMixin,
+    FieldsetViewMixin,
+    CachedListMixin,
+    CachedRetrieveMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
+    """
+    Вьюсет для работы с произведениями.
+
+    Бюджет запросов не зависит от размера страницы: список - COUNT,
+    выборка произведений вместе с категорией и одна предвыборка жанров;
+    детальная страница - выборка произведения и предвыборка жанров.
+    Гистограмма оценок хранится в самом произведении и отдаётся на
+    детальной странице с `?histogram=true` без дополнительных запросов.
+    Порядок списка задаётся параметром `ordering` по полям с индексами
+    (поле, id), рейтинги без отзывов идут в конце. Список собирается
+    из строк values() без экземпляров моделей, см. `api.rows`.
+    """
+
     queryset = (
-        Title.objects.all()
-        .annotate(rating=Avg("reviews__score"))
+        Title.objects.select_related("category")
+        .prefetch_related("genre")
         .order_by("name")
     )
+    query_budget = {
+        "list": 3, "retrieve": 2, "top": 4, "histograms": 1, "batch": 10
+    }
+    pagination_class = PageNumberOrKeysetPagination
+    row_columns = TITLE_COLUMNS
+    row_records = staticmethod(title_records)
+    ordering_fields = ("weighted_rating", "rating", "year", "name")
+    cache_dependencies = ("title", "category", "genre", "review")
+    cache_invalidates = ("title",)
     serializer_class = TitleSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    reviews_lookup = "title"
     permission_classes = (IsAdminOrReadOnly,)
     http_method_names = ["get", "post", "delete", "patch"]
     lookup_field = "id"
 
+    @property
+    def cursor_ordering(self):
+        return self.get_ordering()
+
+    def get_ordering(self):
+        value = self.request.query_params.get("ordering", "name")
+        descending = value.startswith("-")
+        if value[descending:] not in self.ordering_fields:
+            raise ValidationError({"ordering": [
+                "Допустимые значения: "
+                + ", ".join(self.ordering_fields)
+                + " с необязательным минусом для обратного порядка."
+            ]})
+        return value, "-id" if descending else "id"
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if "ordering" in self.request.query_params:
+            queryset = queryset.order_by(
+                *order_expressions(Title, self.get_ordering())
+            )
+        return queryset
+
     def get_serializer_class(self):
-        if self.action in ("list", "retrieve"):
+        if self.action == "retrieve" and self.request.query_params.get(
+            "histogram"
+        ) in ("true", "1"):
+            return TitleHistogramSerializer
+        if self.action in ("list", "retrieve", "top"):
             return TitleSerializer
+        if self.action == "histograms":
+            return ScoreHistogramSerializer
+        if self.action == "batch":
+            return TitleBatchSerializer
         return TitleCreateSerializer
 
+    @transaction.atomic
+    def perform_create(self, serializer):
+        sync_title_leaderboards(serializer.save())
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        sync_title_leaderboards(serializer.save())
+
+    @action(detail=False, url_path="top")
+    def top(self, request):
+        """
+        Лучшие произведения из рейтингов, поддерживаемых при изменении
+        отзывов: не больше четырёх запросов при любом размере каталога.
+        """
+        return self.get_cached_response(self.get_top, request)
+
+    def get_top(self, request):
+        params = TopTitlesSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        scope_filters = dict(params.validated_data)
+        for name, model in (("category", Category), ("genre", Genre)):
+            slug = scope_filters.pop(name, None)
+            if slug is None:
+                continue
+            scope_filters[f"{name}_id"] = (
+                model.objects.filter(slug=slug)
+                .values_list("id", flat=True).first()
+            )
+            if scope_filters[f"{name}_id"] is None:
+                return Response([])
+        entries = top_titles(**scope_filters).select_related(
+            "title__category"
+        ).prefetch_related("title__genre")
+        serializer = self.get_serializer(
+            [entry.title for entry in entries], many=True
+        )
+        return Response(serializer.data)
+
+    @action(detail=False, methods=["post"], url_path="batch")
+    def batch(self, request):
+        """
+        Пакетное создание произведений с результатом для каждого из них:
+        201, если созданы все произведения, иначе 207.
+
+        Слаги разрешаются одним запросом на модель, произведения и связи
+        с жанрами вставляются пачками; бюджет запросов превышается только
+        на INSERT сверх лимита параметров одного запроса.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = retry_locked(serializer.save)
+        created = all(
+            result["status"] == status.HTTP_201_CREATED for result in results
+        )
+        return Response(
+            results,
+            status=(
+                status.HTTP_201_CREATED if created
+                else status.HTTP_207_MULTI_STATUS
+            ),
+        )
+
+    @action(detail=False, url_path="histograms")
+    def histograms(self, request):
+        """Гистограммы оценок нескольких произведений одним запросом."""
+        return self.get_cached_response(self.get_histograms, request)
+
+    def get_histograms(self, request):
+        params = HistogramIdsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        titles = Title.objects.filter(
+            id__in=params.validated_data["ids"]
+        ).order_by("id").only("id", *SCORE_FIELDS)
+        serializer = self.get_serializer(titles, many=True)
+        return Response(serializer.data)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+
+class ReviewViewSet(
+    ReplicaReadMixin,
+    RetryLockedMixin,
+    FieldsetViewMixin,
+    VersionedCacheMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
     """
     Вьюсет для работы с отзывами.
     Позволяет создавать, читать, обновлять и удалять отзывы.
@@ -73,20 +248,64 @@ class ReviewViewSet(viewsets.ModelViewSet):
     ]
     http_method_names = ["get", "post", "patch", "delete"]
     lookup_field = "id"
+    query_budget = {"list": 3, "retrieve": 2, "create": 5}
+    pagination_class = PageNumberOrKeysetPagination
+    cursor_ordering = ("-pub_date", "-id")
+    row_columns = REVIEW_COLUMNS
+    row_records = staticmethod(review_records)
+    cache_invalidates = ("review",)
 
     def get_title(self):
         return get_object_or_404(Title, id=self.kwargs.get("title_id"))
 
     def get_queryset(self):
         title = self.get_title()
-        return title.reviews.all()
+        return title.reviews.select_related("author")
 
     def perform_create(self, serializer):
-        title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
+        """
+        Создаёт отзыв без предварительных запросов на чтение.
+
+        Обновление агрегатов заодно проверяет существование произведения
+        и первым захватывает блокировку записи. Нарушение `unique_review`
+        откатывает транзакцию и превращается в ответ 400.
+        """
+        title_id = self.kwargs.get("title_id")
+        author = self.request.user
+        try:
+            with transaction.atomic():
+                if not apply_review_change(
+                    title_id, new_score=serializer.validated_data["score"]
+                ):
+                    raise NotFound()
+                serializer.save(author=author, title_id=title_id)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title_id=title_id, author=author
+            ).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    serializer.error_messages["duplicate"]
+                ]
+            })
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        old_score = serializer.instance.score
+        review = serializer.save()
+        apply_review_change(
+            review.title_id, old_score=old_score, new_score=review.score
+        )
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ReplicaReadMixin,
+    RetryLockedMixin,
+    FieldsetViewMixin,
+    FastListMixin,
+    viewsets.ModelViewSet,
+):
     """
     Вьюсет для работы с комментариями к отзывам.
     Позволяет создавать, читать, обновлять и удалять комментарии.
@@ -99,6 +318,11 @@ class CommentViewSet(viewsets.ModelViewSet):
     ]
     http_method_names = ["get", "post", "patch", "delete"]
     lookup_field = "id"
+    query_budget = {"list": 3, "retrieve": 2}
+    pagination_class = PageNumberOrKeysetPagination
+    cursor_ordering = ("-pub_date", "-id")
+    row_columns = COMMENT_COLUMNS
+    row_records = staticmethod(comment_records)
 
     def get_review(self):
         return get_object_or_404(
@@ -109,21 +333,31 @@ class CommentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         review = self.get_review()
-        return review.comments.all()
+        return review.comments.select_related("author")
 
     def perform_create(self, serializer):
         review = self.get_review()
         serializer.save(author=self.request.user, review=review)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(
+    RetryLockedMixin,
+    ForgetReviewsMixin,
+    FieldsetViewMixin,
+    VersionedCacheMixin,
+    viewsets.ModelViewSet,
+):
     queryset = User.objects.all().order_by("username")
     serializer_class = UserSerializer
+    query_budget = {"list": 2, "retrieve": 1, "me": 0}
     permission_classes = (IsAdmin,)
     lookup_field = "username"
     filter_backends = (filters.SearchFilter,)
     search_fields = ("username",)
     http_method_names = ['get', 'post', 'patch', 'delete']
+    # Отзывы удаляются вместе с автором и меняют рейтинги произведений.
+    cache_invalidates = ("review",)
+    reviews_lookup = "author"
 
     @action(
         detail=False,
@@ -143,8 +377,58 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+class ExportViewSet(viewsets.ViewSet):
+    """
+    Потоковая выгрузка каталога: `?as=ndjson` (по умолчанию) или
+    `?as=csv`. При `Accept-Encoding: gzip` ответ сжимается на лету.
+    """
+
+    permission_classes = (IsAdmin,)
+
+    @action(detail=False, url_path="titles")
+    def titles(self, request):
+        return self.stream(request, "titles")
+
+    @action(detail=False, url_path="reviews")
+    def reviews(self, request):
+        return self.stream(request, "reviews")
+
+    def stream(self, request, name):
+        output = request.query_params.get("as", "ndjson")
+        if output not in CONTENT_TYPES:
+            raise ValidationError({"as": [
+                "Допустимые значения: " + ", ".join(CONTENT_TYPES) + "."
+            ]})
+        content = encode(export_lines(name, output))
+        gzip = "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if gzip:
+            content = compress_sequence(content)
+        response = StreamingHttpResponse(
+            content, content_type=CONTENT_TYPES[output]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{name}.{output}"'
+        )
+        if gzip:
+            response["Content-Encoding"] = "gzip"
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+
 class AuthViewSet(viewsets.GenericViewSet):
     permission_classes = [AllowAny]
+    auth_outcomes = {
+        status.HTTP_200_OK: "success",
+        status.HTTP_400_BAD_REQUEST: "invalid",
+        status.HTTP_404_NOT_FOUND: "unknown_user",
+    }
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        auth_events.inc(
+            action=self.action,
+            outcome=self.auth_outcomes.get(response.status_code, "error"),
+        )
+        return super().finalize_response(request, response, *args, **kwargs)
 
     @action(methods=["post"], detail=False, url_path="signup")
     def signup(self, request):
@@ -163,5 +447,5 @@ class AuthViewSet(viewsets.GenericViewSet):
 
         user = serializer.validated_data["user"]
 
-        token = AccessToken.for_user(user)
+        token = RoleAccessToken.for_user(user)
         return Response({"token": str(token)})
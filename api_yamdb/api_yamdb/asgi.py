@@ -9,8 +9,13 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+import django
+
+from api_yamdb.handlers import StreamingASGIHandler
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "api_yamdb.settings")
 
-application = get_asgi_application()
+# То же, что get_asgi_application(), но потоковые ответы читаются вне
+# цикла событий, см. api_yamdb.handlers.
+django.setup(set_prefix=False)
+application = StreamingASGIHandler()
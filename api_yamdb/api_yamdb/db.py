@@ -0,0 +1,57 @@
+"""
+Профиль SQLite для нескольких процессов воркеров.
+
+Каждое новое соединение получает PRAGMA из `SQLITE_PRAGMAS`: WAL
+позволяет читать во время записи, `busy_timeout` ждёт блокировку вместо
+немедленной ошибки, `mmap_size` и `cache_size` уменьшают число чтений
+файла. Соединения переиспользуются между запросами (`CONN_MAX_AGE`),
+поэтому PRAGMA выполняются один раз на соединение.
+
+Ожидание `busy_timeout` не помогает, когда транзакция сначала читает,
+а потом пишет: SQLite сразу отвечает "database is locked", и
+транзакцию нужно повторить целиком. Это делает `retry_locked`.
+"""
+import random
+import time
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    # Напрямую через sqlite3: PRAGMA не попадают в счётчики запросов.
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
+
+
+def is_locked(error):
+    return isinstance(error, OperationalError) and "locked" in str(error)
+
+
+def retry_locked(func, *args, retries=None, delay=None, **kwargs):
+    """
+    Повторяет операцию, пока SQLite занят записью другого соединения.
+
+    Задержка растёт экспоненциально со случайным разбросом, чтобы
+    повторы конкурирующих воркеров не совпадали. Внутри открытой
+    транзакции операция не повторяется: откатить её может только
+    внешний код.
+    """
+    if retries is None:
+        retries = settings.SQLITE_LOCK_RETRIES
+    if delay is None:
+        delay = settings.SQLITE_LOCK_RETRY_DELAY
+    if transaction.get_connection().in_atomic_block:
+        retries = 0
+    for attempt in range(retries + 1):
+        try:
+            return func(*args, **kwargs)
+        except OperationalError as error:
+            if not is_locked(error) or attempt == retries:
+                raise
+            time.sleep(delay * 2 ** attempt * random.uniform(0.5, 1.5))
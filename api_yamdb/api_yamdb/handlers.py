@@ -0,0 +1,66 @@
+"""
+ASGI-обработчик, который читает потоковые ответы вне цикла событий.
+
+Django 3.2 перебирает `StreamingHttpResponse` синхронно прямо в цикле
+событий: каждый шаг итератора, например запрос очередной пачки
+выгрузки, блокирует все остальные запросы воркера, а ORM в нём запрещён
+(SynchronousOnlyOperation). Здесь каждый шаг выполняется в отдельном
+потоке ответа, а цикл событий ждёт его, не блокируясь. Соединения этого
+потока с базой закрываются в конце ответа.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
+
+
+def response_headers(response):
+    """Заголовки и cookies ответа в виде ASGI."""
+    headers = []
+    for header, value in response.items():
+        if isinstance(header, str):
+            header = header.encode("ascii")
+        if isinstance(value, str):
+            value = value.encode("latin1")
+        headers.append((bytes(header), bytes(value)))
+    for cookie in response.cookies.values():
+        headers.append(
+            (b"Set-Cookie", cookie.output(header="").encode("ascii").strip())
+        )
+    return headers
+
+
+class StreamingASGIHandler(ASGIHandler):
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": response_headers(response),
+        })
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1)
+        iterator = iter(response)
+        done = object()
+        try:
+            while True:
+                part = await loop.run_in_executor(
+                    executor, next, iterator, done
+                )
+                if part is done:
+                    break
+                for chunk, _ in self.chunk_bytes(part):
+                    await send({
+                        "type": "http.response.body",
+                        "body": chunk,
+                        "more_body": True,
+                    })
+            await send({"type": "http.response.body"})
+        finally:
+            await loop.run_in_executor(executor, connections.close_all)
+            executor.shutdown()
+        await sync_to_async(response.close, thread_sensitive=True)()
@@ -28,6 +28,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.middleware.ServerTimingMiddleware",
+    "api.middleware.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -65,8 +67,77 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 60,
+    },
+}
+
+# Реплики для чтения, см. api.replicas. Например, ("replica",): копия
+# основной базы в replica.sqlite3, которую обновляет
+# `manage.py sync_replica`.
+REPLICA_DATABASES = ()
+REPLICA_STICKY_SECONDS = 10
+
+for alias in REPLICA_DATABASES:
+    DATABASES[alias] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / f"{alias}.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "TEST": {"MIRROR": "default"},
     }
+
+# PRAGMA для каждого нового соединения SQLite, см. api_yamdb.db.
+SQLITE_PRAGMAS = {
+    "busy_timeout": 5000,
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
 }
+SQLITE_LOCK_RETRIES = 5
+SQLITE_LOCK_RETRY_DELAY = 0.02
+
+DATABASE_ROUTERS = ["api.replicas.ReplicaRouter"]
+
+# Файловый кеш общий для всех процессов воркеров на одном хосте.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / ".cache",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+    # Отметки о смене роли пользователя, см. api.authentication. Отдельный
+    # кеш без вытеснения: потерянная отметка вернула бы силу старым
+    # claims. Записей не больше, чем пользователей, и каждая живёт не
+    # дольше access-токена.
+    "tokens": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / ".tokens",
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 2 ** 63},
+    },
+}
+
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+
+# Счётчики запросов и времени этапов, см. api.middleware. Заголовок
+# `Server-Timing` получают только сотрудники.
+SERVER_TIMING_ENABLED = DEBUG
+
+FAST_LIST_ENABLED = True
+
+# Асинхронное чтение произведений, отзывов и комментариев, см.
+# api.async_views. Включать при запуске через ASGI.
+ASYNC_READ_VIEWS = False
+
+METRICS_ENABLED = True
+METRICS_DIR = BASE_DIR / ".metrics"
+# Доступ к `/metrics`: по токену в заголовке `Authorization: Bearer` или с
+# перечисленных адресов. За обратным прокси REMOTE_ADDR — адрес прокси,
+# поэтому в таком случае используйте токен.
+METRICS_TOKEN = ""
+METRICS_ALLOWED_IPS = ()
 
 AUTH_USER_MODEL = "users.User"
 
@@ -89,7 +160,7 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.ClaimsJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
@@ -102,6 +173,20 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
 }
 
+JWT_USER_CACHE_TIMEOUT = 60
+JWT_USER_CACHE_SIZE = 10000
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "api.timing": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "admin_yamdb@mail.ru"
 
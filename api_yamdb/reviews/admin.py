@@ -1,9 +1,35 @@
 from django.contrib import admin
+from django.db import transaction
 
+from .leaderboards import sync_title_leaderboards
 from .models import Category, Comment, Genre, Review, Title
+from .ratings import apply_review_change, forget_reviews
 
 
-class TitleAdmin(admin.ModelAdmin):
+class ForgetReviewsAdminMixin:
+    """
+    Вычитает отзывы удаляемых объектов из рейтингов одним UPDATE на
+    произведение, см. `reviews.ratings.forget_reviews`.
+
+    `reviews_lookup` - поле отзыва, которое ссылается на объект.
+    """
+
+    reviews_lookup = None
+
+    def delete_model(self, request, obj):
+        reviews = Review.objects.filter(**{self.reviews_lookup: obj.pk})
+        with forget_reviews(reviews):
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        reviews = Review.objects.filter(
+            **{f"{self.reviews_lookup}__in": queryset}
+        )
+        with forget_reviews(reviews):
+            super().delete_queryset(request, queryset)
+
+
+class TitleAdmin(ForgetReviewsAdminMixin, admin.ModelAdmin):
     list_display = (
         "name",
         "year",
@@ -21,6 +47,12 @@ class TitleAdmin(admin.ModelAdmin):
     )
     list_filter = ("name",)
     list_display_links = ("name",)
+    reviews_lookup = "title"
+
+    @transaction.atomic
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        sync_title_leaderboards(form.instance)
 
 
 class GenreAdmin(admin.ModelAdmin):
@@ -43,7 +75,7 @@ class CategoryAdmin(admin.ModelAdmin):
     list_filter = ("name",)
 
 
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(ForgetReviewsAdminMixin, admin.ModelAdmin):
     list_display = (
         "title",
         "text",
@@ -61,6 +93,15 @@ class ReviewAdmin(admin.ModelAdmin):
     )
     list_filter = ("author",)
     list_display_links = ("author",)
+    reviews_lookup = "pk"
+
+    @transaction.atomic
+    def save_model(self, request, obj, form, change):
+        if change:
+            old = Review.objects.only("title_id", "score").get(pk=obj.pk)
+            apply_review_change(old.title_id, old_score=old.score)
+        super().save_model(request, obj, form, change)
+        apply_review_change(obj.title_id, new_score=obj.score)
 
 
 class CommentAdmin(admin.ModelAdmin):
@@ -0,0 +1,59 @@
+"""
+Пакетное создание произведений.
+
+Произведения и их связи с жанрами вставляются через bulk_create в одной
+транзакции, после чего одним проходом пересоздаются их строки
+рейтингов лучших.
+"""
+from django.db import connections, transaction
+
+from .leaderboards import rebuild_leaderboards
+from .models import GenreTitle, Title
+
+
+def insert_titles(titles):
+    """
+    Вставляет произведения и заполняет их id.
+
+    SQLite в Django 3.2 не возвращает id из bulk_create. Первое
+    произведение сохраняется отдельным INSERT, который захватывает
+    блокировку записи всей базы до конца транзакции, поэтому остальные
+    получают следующие за ним id без гонки с другими запросами.
+    """
+    connection = connections[Title.objects.db]
+    if connection.features.can_return_rows_from_bulk_insert:
+        Title.objects.bulk_create(titles)
+        return
+    first, *rest = titles
+    first.save()
+    for offset, title in enumerate(rest, 1):
+        title.id = first.id + offset
+    Title.objects.bulk_create(rest)
+
+
+def bulk_create_titles(items):
+    """
+    Создаёт произведения по словарям с полями произведения, объектом
+    категории в `category` и списком объектов жанров в `genre`.
+    """
+    titles = [
+        Title(
+            name=item["name"],
+            year=item["year"],
+            description=item.get("description", ""),
+            category=item["category"],
+        )
+        for item in items
+    ]
+    if not titles:
+        return titles
+    with transaction.atomic():
+        insert_titles(titles)
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title, item in zip(titles, items)
+            for genre in item["genre"]
+        )
+        ids = [title.id for title in titles]
+        rebuild_leaderboards(min(ids), max(ids))
+    return titles
@@ -0,0 +1,277 @@
+"""
+Генерация синтетического каталога с реалистичными распределениями.
+
+Количество отзывов на произведение подчиняется закону Ципфа, активность
+пользователей - степенному закону, оценки смещены к высоким с длинным
+хвостом низких. Каждая таблица генерируется собственным генератором
+случайных чисел, производным от общего seed, поэтому результат
+воспроизводим и не зависит от порядка обхода таблиц.
+"""
+import random
+from bisect import bisect
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate, islice
+
+from reviews.management.commands.import_csv import BulkLoader, csv_to_func
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.ratings import reconcile_ratings
+from users.models import User
+
+HEADERS = {
+    "category.csv": ("id", "name", "slug"),
+    "genre.csv": ("id", "name", "slug"),
+    "users.csv": (
+        "id", "username", "email", "role", "bio", "first_name", "last_name"
+    ),
+    "titles.csv": ("id", "name", "year", "category"),
+    "genre_title.csv": ("id", "title_id", "genre_id"),
+    "review.csv": ("id", "title_id", "text", "author", "score", "pub_date"),
+    "comments.csv": ("id", "review_id", "text", "author", "pub_date"),
+}
+FILE_MODELS = {filename: model for filename, (model, _) in csv_to_func.items()}
+WORDS = (
+    "тёмный", "последний", "город", "ночь", "дорога", "море", "солнце",
+    "тайна", "война", "любовь", "время", "звезда", "песня", "остров",
+    "дом", "лес", "зима", "огонь", "тень", "сердце", "ветер", "путь",
+    "небо", "река", "король", "мастер", "сон", "голос", "память", "свет",
+)
+FIRST_DATE = datetime(2015, 1, 1, tzinfo=timezone.utc)
+DATE_SPAN = timedelta(days=3650).total_seconds()
+SCORE_MEAN = 7.2
+SCORE_SPREAD = 2.0
+MODERATOR_SHARE = 0.01
+ADMIN_SHARE = 0.001
+AUTHOR_DRAW_ROUNDS = 10
+COMMENTED_SHARE = 0.5
+COMMENTS_EXPONENT = 2.5
+
+
+class DatasetGenerator:
+    """
+    Строки CSV-файлов в формате, который понимает `import_csv`.
+
+    `start_ids` - первые id для моделей, чтобы дописывать данные в
+    непустую базу.
+    """
+
+    def __init__(self, titles=100000, users=10000, categories=10,
+                 genres=30, reviews_per_title=20, comments_per_review=0.5,
+                 zipf_exponent=1.1, activity_exponent=1.2, seed=0,
+                 start_ids=None):
+        self.titles = titles
+        self.users = users
+        self.categories = categories
+        self.genres = genres
+        self.reviews_per_title = reviews_per_title
+        self.comments_per_review = comments_per_review
+        self.zipf_exponent = zipf_exponent
+        self.activity_exponent = activity_exponent
+        self.seed = seed
+        self.start_ids = {model: 1 for model in FILE_MODELS.values()}
+        self.start_ids.update(start_ids or {})
+        activity = self.rng("activity")
+        self.author_weights = list(accumulate(
+            activity.paretovariate(activity_exponent)
+            for _ in range(users)
+        ))
+
+    def rng(self, name):
+        return random.Random(f"{self.seed}:{name}")
+
+    def first_id(self, model):
+        return self.start_ids[model]
+
+    def rows(self, filename):
+        return {
+            "category.csv": self.category_rows,
+            "genre.csv": self.genre_rows,
+            "users.csv": self.user_rows,
+            "titles.csv": self.title_rows,
+            "genre_title.csv": self.genre_title_rows,
+            "review.csv": self.review_rows,
+            "comments.csv": self.comment_rows,
+        }[filename]()
+
+    def category_rows(self):
+        first = self.first_id(Category)
+        for pk in range(first, first + self.categories):
+            yield [pk, f"Категория {pk}", f"category-{pk}"]
+
+    def genre_rows(self):
+        first = self.first_id(Genre)
+        for pk in range(first, first + self.genres):
+            yield [pk, f"Жанр {pk}", f"genre-{pk}"]
+
+    def user_rows(self):
+        rng = self.rng("users")
+        first = self.first_id(User)
+        for pk in range(first, first + self.users):
+            draw = rng.random()
+            if draw < ADMIN_SHARE:
+                role = User.ADMIN
+            elif draw < ADMIN_SHARE + MODERATOR_SHARE:
+                role = User.MODERATOR
+            else:
+                role = User.USER
+            yield [
+                pk, f"user{pk}", f"user{pk}@yamdb.fake", role, "", "", ""
+            ]
+
+    def title_rows(self):
+        rng = self.rng("titles")
+        first_category = self.first_id(Category)
+        category_weights = self.zipf_weights(self.categories)
+        last_year = datetime.now().year
+        first = self.first_id(Title)
+        for pk in range(first, first + self.titles):
+            name = " ".join(rng.sample(WORDS, rng.randint(1, 3))).capitalize()
+            year = max(1900, last_year - int(rng.expovariate(1 / 15)))
+            category = first_category + self.pick(rng, category_weights)
+            yield [pk, f"{name} {pk}", year, category]
+
+    def genre_title_rows(self):
+        rng = self.rng("genre_titles")
+        first_genre = self.first_id(Genre)
+        genre_weights = self.zipf_weights(self.genres)
+        pk = self.first_id(GenreTitle)
+        first = self.first_id(Title)
+        for title_id in range(first, first + self.titles):
+            genres = {
+                self.pick(rng, genre_weights)
+                for _ in range(rng.randint(1, 3))
+            }
+            for genre in sorted(genres):
+                yield [pk, title_id, first_genre + genre]
+                pk += 1
+
+    def review_counts(self):
+        """
+        Количество отзывов на каждое произведение по закону Ципфа.
+
+        Ранги популярности назначаются случайной перестановкой, чтобы
+        популярные произведения не шли подряд по id.
+        """
+        rng = self.rng("review_counts")
+        ranks = list(range(1, self.titles + 1))
+        rng.shuffle(ranks)
+        norm = sum(
+            rank ** -self.zipf_exponent for rank in range(1, self.titles + 1)
+        )
+        total = self.titles * self.reviews_per_title
+        for rank in ranks:
+            expected = total * rank ** -self.zipf_exponent / norm
+            count = int(expected) + (rng.random() < expected % 1)
+            yield min(count, self.users)
+
+    def review_rows(self):
+        rng = self.rng("reviews")
+        first_user = self.first_id(User)
+        pk = self.first_id(Review)
+        first = self.first_id(Title)
+        for title_id, count in zip(
+            range(first, first + self.titles), self.review_counts()
+        ):
+            quality = rng.gauss(SCORE_MEAN, 1.0)
+            for author in self.pick_authors(rng, count):
+                score = round(rng.gauss(quality, SCORE_SPREAD))
+                yield [
+                    pk, title_id, self.text(rng), first_user + author,
+                    min(10, max(1, score)), self.date(rng),
+                ]
+                pk += 1
+
+    def comment_rows(self):
+        """Комментарии: у большинства отзывов их нет, у немногих - много."""
+        rng = self.rng("comments")
+        first_user = self.first_id(User)
+        first_review = self.first_id(Review)
+        reviews = sum(self.review_counts())
+        # Среднее распределения Парето равно alpha / (alpha - 1).
+        scale = (
+            self.comments_per_review / COMMENTED_SHARE
+            * (COMMENTS_EXPONENT - 1) / COMMENTS_EXPONENT
+        )
+        pk = self.first_id(Comment)
+        for review_id in range(first_review, first_review + reviews):
+            if rng.random() >= COMMENTED_SHARE:
+                continue
+            expected = scale * rng.paretovariate(COMMENTS_EXPONENT)
+            count = int(expected) + (rng.random() < expected % 1)
+            for _ in range(count):
+                author = self.pick(rng, self.author_weights)
+                yield [
+                    pk, review_id, self.text(rng), first_user + author,
+                    self.date(rng),
+                ]
+                pk += 1
+
+    def pick_authors(self, rng, count):
+        """
+        Авторы отзывов произведения без повторов, с учётом активности.
+
+        Выборка без возвращения делается повторными взвешенными
+        розыгрышами; если активные пользователи исчерпаны, оставшиеся
+        авторы добираются равномерно.
+        """
+        if count * 2 >= self.users:
+            return rng.sample(range(self.users), count)
+        authors = set()
+        for _ in range(AUTHOR_DRAW_ROUNDS):
+            authors.update(rng.choices(
+                range(self.users), cum_weights=self.author_weights,
+                k=count - len(authors),
+            ))
+            if len(authors) == count:
+                return sorted(authors)
+        while len(authors) < count:
+            authors.add(rng.randrange(self.users))
+        return sorted(authors)
+
+    @staticmethod
+    def zipf_weights(count, exponent=1.0):
+        return list(accumulate(
+            rank ** -exponent for rank in range(1, count + 1)
+        ))
+
+    @staticmethod
+    def pick(rng, cum_weights):
+        return bisect(cum_weights, rng.random() * cum_weights[-1])
+
+    @staticmethod
+    def text(rng):
+        return " ".join(rng.choices(WORDS, k=rng.randint(3, 30))).capitalize()
+
+    @staticmethod
+    def date(rng):
+        moment = FIRST_DATE + timedelta(seconds=rng.random() * DATE_SPAN)
+        return moment.isoformat(timespec="milliseconds").replace(
+            "+00:00", "Z"
+        )
+
+    def write_database(self, chunk_size):
+        """
+        Вставляет данные в базу пачками в порядке зависимостей.
+
+        Как и в `import_csv`, `pub_date` с auto_now_add заполняется
+        временем вставки.
+        """
+        for filename in HEADERS:
+            _, build = csv_to_func[filename]
+            rows = self.rows(filename)
+            while True:
+                objs = [build(row) for row in islice(rows, chunk_size)]
+                if not objs:
+                    break
+                BulkLoader.insert(objs)
+        reconcile_ratings()
+
+    @classmethod
+    def appending(cls, **kwargs):
+        """Генератор, продолжающий id уже существующих в базе записей."""
+        start_ids = {}
+        for model in FILE_MODELS.values():
+            last = model.objects.order_by("-pk").values_list(
+                "pk", flat=True
+            ).first()
+            start_ids[model] = (last or 0) + 1
+        return cls(start_ids=start_ids, **kwargs)
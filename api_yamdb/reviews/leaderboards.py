@@ -0,0 +1,137 @@
+"""
+Рейтинги лучших произведений, поддерживаемые инкрементально.
+
+Для каждого произведения хранятся строки `LeaderboardEntry` во всех его
+разрезах: общем, по категории, по каждому жанру и по году. Изменение
+отзыва обновляет агрегаты во всех строках произведения одним UPDATE,
+изменение произведения пересоздаёт его строки. Лучшие произведения
+упорядочены по взвешенному рейтингу: одна высокая оценка не поднимает
+произведение выше произведений с множеством немного более низких.
+"""
+from collections import defaultdict
+
+from django.db.models import Case, F, FloatField, OuterRef, Subquery, When
+from django.db.models.functions import Cast
+
+from .models import GenreTitle, LeaderboardEntry, Title
+
+ALL_SCOPE = "all"
+TOP_LIMIT = 100
+
+
+def category_scope(category_id):
+    return f"category:{category_id}"
+
+
+def genre_scope(genre_id):
+    return f"genre:{genre_id}"
+
+
+def year_scope(year):
+    return f"year:{year}"
+
+
+def build_entries(title, genre_ids):
+    """Строки рейтинга произведения, заданного словарём полей."""
+    scopes = [ALL_SCOPE, year_scope(title["year"])]
+    if title["category_id"] is not None:
+        scopes.append(category_scope(title["category_id"]))
+    scopes.extend(genre_scope(genre_id) for genre_id in sorted(genre_ids))
+    review_count = title["review_count"]
+    rating = title["score_sum"] / review_count if review_count else None
+    return [
+        LeaderboardEntry(
+            scope=scope,
+            title_id=title["id"],
+            category_id=title["category_id"],
+            year=title["year"],
+            score_sum=title["score_sum"],
+            review_count=review_count,
+            rating=rating,
+            weighted_rating=title["weighted_rating"],
+        )
+        for scope in scopes
+    ]
+
+
+def rebuild_leaderboards(first_id, last_id):
+    """Пересоздаёт строки рейтинга произведений с id в диапазоне."""
+    LeaderboardEntry.objects.filter(
+        title_id__gte=first_id, title_id__lte=last_id
+    ).delete()
+    genres = defaultdict(set)
+    for title_id, genre_id in GenreTitle.objects.filter(
+        title_id__gte=first_id, title_id__lte=last_id,
+        genre_id__isnull=False,
+    ).values_list("title_id", "genre_id"):
+        genres[title_id].add(genre_id)
+    LeaderboardEntry.objects.bulk_create(
+        entry
+        for title in Title.objects.filter(
+            id__gte=first_id, id__lte=last_id
+        ).values(
+            "id", "category_id", "year", "score_sum", "review_count",
+            "weighted_rating",
+        )
+        for entry in build_entries(title, genres[title["id"]])
+    )
+
+
+def sync_title_leaderboards(title):
+    """Вызывается после сохранения произведения и его жанров."""
+    rebuild_leaderboards(title.id, title.id)
+
+
+def apply_leaderboard_change(title_id, score_delta, count_delta):
+    """
+    Применяет изменение агрегатов ко всем строкам произведения.
+
+    Вызывается после обновления агрегатов произведения: взвешенный
+    рейтинг копируется из него.
+    """
+    score_sum = F("score_sum") + score_delta
+    review_count = F("review_count") + count_delta
+    return LeaderboardEntry.objects.filter(title_id=title_id).update(
+        score_sum=score_sum,
+        review_count=review_count,
+        rating=Case(
+            When(
+                review_count__gt=-count_delta,
+                then=Cast(score_sum, FloatField()) / review_count,
+            ),
+            default=None,
+            output_field=FloatField(),
+        ),
+        weighted_rating=Subquery(
+            Title.objects.filter(id=OuterRef("title_id"))
+            .values("weighted_rating")
+        ),
+    )
+
+
+def top_titles(category_id=None, genre_id=None, year=None, min_reviews=1,
+               limit=TOP_LIMIT):
+    """
+    Лучшие произведения по взвешенному рейтингу.
+
+    Разрез выбирается по самому узкому из заданных фильтров, остальные
+    фильтры проверяются по полям строк, скопированным из произведения.
+    """
+    entries = LeaderboardEntry.objects.filter(
+        review_count__gte=max(min_reviews, 1)
+    )
+    if genre_id is not None:
+        entries = entries.filter(scope=genre_scope(genre_id))
+    elif category_id is not None:
+        entries = entries.filter(scope=category_scope(category_id))
+    elif year is not None:
+        entries = entries.filter(scope=year_scope(year))
+    else:
+        entries = entries.filter(scope=ALL_SCOPE)
+    if category_id is not None:
+        entries = entries.filter(category_id=category_id)
+    if year is not None:
+        entries = entries.filter(year=year)
+    return entries.order_by(
+        "-weighted_rating", "-review_count", "title"
+    )[:limit]
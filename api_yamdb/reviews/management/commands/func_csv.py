@@ -3,7 +3,7 @@ from users.models import User
 
 
 def category_create(row):
-    Category.objects.get_or_create(
+    return Category(
         id=row[0],
         name=row[1],
         slug=row[2],
@@ -11,7 +11,7 @@ def category_create(row):
 
 
 def genre_create(row):
-    Genre.objects.get_or_create(
+    return Genre(
         id=row[0],
         name=row[1],
         slug=row[2],
@@ -19,7 +19,7 @@ def genre_create(row):
 
 
 def titles_create(row):
-    Title.objects.get_or_create(
+    return Title(
         id=row[0],
         name=row[1],
         year=row[2],
@@ -28,7 +28,9 @@ def titles_create(row):
 
 
 def users_create(row):
-    User.objects.get_or_create(
+    # bulk_create не вызывает User.save(), поэтому is_staff
+    # выставляется здесь так же, как при сохранении модели.
+    return User(
         id=row[0],
         username=row[1],
         email=row[2],
@@ -36,14 +38,14 @@ def users_create(row):
         bio=row[4],
         first_name=row[5],
         last_name=row[6],
+        is_staff=row[3] == User.ADMIN,
     )
 
 
 def review_create(row):
-    title, _ = Title.objects.get_or_create(id=row[1])
-    Review.objects.get_or_create(
+    return Review(
         id=row[0],
-        title=title,
+        title_id=row[1],
         text=row[2],
         author_id=row[3],
         score=row[4],
@@ -52,10 +54,9 @@ def review_create(row):
 
 
 def comments_create(row):
-    review, _ = Review.objects.get_or_create(id=row[1])
-    Comment.objects.get_or_create(
+    return Comment(
         id=row[0],
-        review=review,
+        review_id=row[1],
         text=row[2],
         author_id=row[3],
         pub_date=row[4],
@@ -63,10 +64,8 @@ def comments_create(row):
 
 
 def genre_title_create(row):
-    title, _ = Title.objects.get_or_create(id=row[1])
-    genre, _ = Genre.objects.get_or_create(id=row[2])
-    GenreTitle.objects.get_or_create(
+    return GenreTitle(
         id=row[0],
-        title=title,
-        genre=genre,
+        title_id=row[1],
+        genre_id=row[2],
     )
@@ -0,0 +1,89 @@
+import csv
+import os
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.dataset import HEADERS, DatasetGenerator
+from reviews.management.commands.import_csv import CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Генерирует синтетический каталог: в базу данных или в CSV-файлы "
+        "для import_csv."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--titles", type=int, default=100000)
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--genres", type=int, default=30)
+        parser.add_argument(
+            "--reviews-per-title",
+            type=float,
+            default=20,
+            help="Среднее количество отзывов на произведение.",
+        )
+        parser.add_argument(
+            "--comments-per-review",
+            type=float,
+            default=0.5,
+            help="Среднее количество комментариев к отзыву.",
+        )
+        parser.add_argument(
+            "--zipf-exponent",
+            type=float,
+            default=1.1,
+            help="Показатель закона Ципфа для популярности произведений.",
+        )
+        parser.add_argument(
+            "--activity-exponent",
+            type=float,
+            default=1.2,
+            help="Показатель степенного закона активности пользователей.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--output",
+            help="Каталог для CSV-файлов; без него данные пишутся в базу.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Количество строк в одной транзакции.",
+        )
+
+    def handle(self, *args, **options):
+        params = {
+            name: options[name]
+            for name in (
+                "titles", "users", "categories", "genres",
+                "reviews_per_title", "comments_per_review",
+                "zipf_exponent", "activity_exponent", "seed",
+            )
+        }
+        started = time.monotonic()
+        if options["output"]:
+            self.write_csv(DatasetGenerator(**params), options["output"])
+        else:
+            DatasetGenerator.appending(**params).write_database(
+                options["chunk_size"]
+            )
+        self.stdout.write(
+            f"Данные сгенерированы за {time.monotonic() - started:.2f} с"
+        )
+
+    def write_csv(self, generator, directory):
+        os.makedirs(directory, exist_ok=True)
+        for filename, header in HEADERS.items():
+            path = os.path.join(directory, filename)
+            with open(path, "w", encoding="utf-8", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(header)
+                count = 0
+                for row in generator.rows(filename):
+                    writer.writerow(row)
+                    count += 1
+            self.stdout.write(f"{filename}: {count}")
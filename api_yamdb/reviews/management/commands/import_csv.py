@@ -1,31 +1,232 @@
 import csv
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, models, transaction
 
+from api_yamdb import db
 from reviews.management.commands import func_csv
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.ratings import reconcile_ratings
+from users.models import User
 
 BASE_DIR = settings.BASE_DIR
+CHUNK_SIZE = 5000
+WORKERS = 4
+LOCK_RETRIES = 10
+LOCK_RETRY_DELAY = 0.05
 
 csv_to_func = {
-    "category.csv": func_csv.category_create,
-    "genre.csv": func_csv.genre_create,
-    "titles.csv": func_csv.titles_create,
-    "users.csv": func_csv.users_create,
-    "review.csv": func_csv.review_create,
-    "comments.csv": func_csv.comments_create,
-    "genre_title.csv": func_csv.genre_title_create,
+    "category.csv": (Category, func_csv.category_create),
+    "genre.csv": (Genre, func_csv.genre_create),
+    "titles.csv": (Title, func_csv.titles_create),
+    "users.csv": (User, func_csv.users_create),
+    "review.csv": (Review, func_csv.review_create),
+    "comments.csv": (Comment, func_csv.comments_create),
+    "genre_title.csv": (GenreTitle, func_csv.genre_title_create),
 }
 
 
+def retry_locked(func, *args):
+    """
+    Повторяет операцию, пока SQLite занят записью другого потока.
+
+    Параллельные загрузчики пишут в одну базу, поэтому повторов больше,
+    чем у запросов API.
+    """
+    return db.retry_locked(
+        func, *args, retries=LOCK_RETRIES, delay=LOCK_RETRY_DELAY
+    )
+
+
+def build_dependencies(files):
+    """
+    Строит граф зависимостей файлов по внешним ключам их моделей.
+
+    Файл зависит от файлов, модели которых указаны во внешних ключах
+    его модели: отзывы - от произведений и пользователей и т.д.
+    """
+    file_by_model = {model: filename for filename, (model, _) in files.items()}
+    return {
+        filename: {
+            file_by_model[field.related_model]
+            for field in model._meta.concrete_fields
+            if isinstance(field, models.ForeignKey)
+            and field.related_model in file_by_model
+            and field.related_model is not model
+        }
+        for filename, (model, _) in files.items()
+    }
+
+
+class BulkLoader:
+    """
+    Потоковая загрузка CSV пачками через bulk_create.
+
+    Внешние ключи проверяются по множествам id родительских моделей в
+    памяти: множество загружается из базы при первом обращении и
+    пополняется по мере вставки. Строки с несуществующим родителем и
+    уже существующие строки пропускаются и учитываются как пропущенные.
+    """
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.known_ids = {}
+        self.lock = threading.Lock()
+
+    def get_ids(self, model):
+        with self.lock:
+            if model not in self.known_ids:
+                self.known_ids[model] = retry_locked(
+                    lambda: set(model.objects.values_list("pk", flat=True))
+                )
+            return self.known_ids[model]
+
+    def resolve(self, obj):
+        """Приводит внешние ключи к типу поля и проверяет родителей."""
+        for field in obj._meta.concrete_fields:
+            if not isinstance(field, models.ForeignKey):
+                continue
+            value = getattr(obj, field.attname)
+            if value in (None, ""):
+                if not field.null:
+                    return False
+                setattr(obj, field.attname, None)
+                continue
+            value = field.target_field.to_python(value)
+            setattr(obj, field.attname, value)
+            if value not in self.get_ids(field.related_model):
+                return False
+        return True
+
+    @staticmethod
+    def insert(objs):
+        """
+        Вставляет пачку и возвращает число действительно вставленных строк
+        и id строк пачки, которые есть в базе после вставки.
+
+        bulk_create(ignore_conflicts=True) молча пропускает дубликаты, в
+        том числе по другим уникальным полям, поэтому вставленные строки
+        считаются и перечитываются по диапазону id пачки до и после
+        вставки в одной транзакции.
+        """
+        model = type(objs[0])
+        pks = [obj.pk for obj in objs]
+        in_chunk = model.objects.filter(pk__gte=min(pks), pk__lte=max(pks))
+        with transaction.atomic():
+            existing = in_chunk.count()
+            model.objects.bulk_create(objs, ignore_conflicts=True)
+            stored = set(in_chunk.values_list("pk", flat=True))
+            return len(stored) - existing, stored.intersection(pks)
+
+    def load(self, path, build):
+        """Загружает файл и возвращает число вставленных и пропущенных."""
+        loaded = skipped = 0
+        with open(path, "r", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            next(reader)
+            while True:
+                rows = list(islice(reader, self.chunk_size))
+                if not rows:
+                    return loaded, skipped
+                objs = []
+                for row in rows:
+                    obj = build(row)
+                    if self.resolve(obj):
+                        obj.pk = obj._meta.pk.to_python(obj.pk)
+                        objs.append(obj)
+                    else:
+                        skipped += 1
+                if not objs:
+                    continue
+                inserted, stored = retry_locked(self.insert, objs)
+                model = type(objs[0])
+                with self.lock:
+                    if model in self.known_ids:
+                        self.known_ids[model].update(stored)
+                loaded += inserted
+                skipped += len(objs) - inserted
+
+
 class Command(BaseCommand):
+    help = "Загружает данные из CSV-файлов static/data."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Количество строк в одной транзакции.",
+        )
+        parser.add_argument(
+            "--path",
+            default=os.path.join(BASE_DIR, "static/data/"),
+            help="Каталог с CSV-файлами.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=WORKERS,
+            help="Количество файлов, загружаемых одновременно.",
+        )
+
+    def load_file(self, loader, path, build):
+        started = time.monotonic()
+        try:
+            loaded, skipped = loader.load(path, build)
+        finally:
+            connections.close_all()
+        return started, time.monotonic(), loaded, skipped
+
     def handle(self, *args, **options):
-        for filename, row in csv_to_func.items():
-            path = os.path.join(BASE_DIR, "static/data/") + filename
-            with open(path, "r", encoding="utf-8") as file:
-                reader = csv.reader(file)
-                next(reader)
-                for row in reader:
-                    csv_to_func[filename](row)
+        loader = BulkLoader(chunk_size=options["chunk_size"])
+        dependencies = build_dependencies(csv_to_func)
+        pending = dict(dependencies)
+        done = set()
+        timings = {}
+        running = {}
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            while pending or running:
+                ready = [
+                    filename for filename, parents in pending.items()
+                    if parents <= done
+                ]
+                for filename in ready:
+                    del pending[filename]
+                    _, build = csv_to_func[filename]
+                    path = os.path.join(options["path"], filename)
+                    future = pool.submit(self.load_file, loader, path, build)
+                    running[future] = filename
+                if not running:
+                    raise CommandError(
+                        "Циклическая зависимость файлов: "
+                        + ", ".join(sorted(pending))
+                    )
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    filename = running.pop(future)
+                    timings[filename] = future.result()
+                    done.add(filename)
+        reconcile_ratings()
+        self.report(timings, started, time.monotonic())
         self.stdout.write("Запись прошла успешно!")
+
+    def report(self, timings, started, finished):
+        self.stdout.write("Файл: начало, длительность, строк, строк/с")
+        for filename, (begin, end, loaded, skipped) in sorted(
+            timings.items(), key=lambda item: item[1][1] - item[1][0],
+            reverse=True,
+        ):
+            elapsed = end - begin
+            self.stdout.write(
+                f"{filename}: +{begin - started:.2f} с, {elapsed:.2f} с, "
+                f"{loaded} (пропущено {skipped}), "
+                f"{loaded / elapsed if elapsed else 0:.0f} строк/с"
+            )
+        self.stdout.write(f"Всего: {finished - started:.2f} с")
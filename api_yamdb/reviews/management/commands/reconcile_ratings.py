@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from reviews.ratings import RECONCILE_CHUNK_SIZE, reconcile_ratings
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает сумму оценок и количество отзывов произведений."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=RECONCILE_CHUNK_SIZE,
+            help="Количество произведений в одной транзакции.",
+        )
+
+    def handle(self, *args, **options):
+        fixed = reconcile_ratings(chunk_size=options["chunk_size"])
+        self.stdout.write(f"Исправлено произведений: {fixed}")
@@ -0,0 +1,47 @@
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    Review = apps.get_model("reviews", "Review")
+    totals = (
+        Review.objects.order_by()
+        .values("title_id")
+        .annotate(total=Sum("score"), count=Count("id"))
+    )
+    for row in totals:
+        Title.objects.filter(id=row["title_id"]).update(
+            score_sum=row["total"], review_count=row["count"]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0002_auto_20250612_1835"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="title",
+            name="review_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Поддерживается при изменении отзывов",
+                verbose_name="Количество отзывов",
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_sum",
+            field=models.PositiveIntegerField(
+                default=0,
+                help_text="Поддерживается при изменении отзывов",
+                verbose_name="Сумма оценок",
+            ),
+        ),
+        migrations.RunPython(
+            fill_rating_aggregates, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,113 @@
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_leaderboards(apps, schema_editor):
+    """Строки рейтингов во всех разрезах по агрегатам произведений."""
+    Title = apps.get_model("reviews", "Title")
+    GenreTitle = apps.get_model("reviews", "GenreTitle")
+    LeaderboardEntry = apps.get_model("reviews", "LeaderboardEntry")
+    genres = defaultdict(set)
+    for title_id, genre_id in GenreTitle.objects.filter(
+        genre_id__isnull=False
+    ).values_list("title_id", "genre_id"):
+        genres[title_id].add(genre_id)
+    entries = []
+    for title in Title.objects.values(
+        "id", "category_id", "year", "score_sum", "review_count"
+    ).iterator():
+        scopes = ["all", f"year:{title['year']}"]
+        if title["category_id"] is not None:
+            scopes.append(f"category:{title['category_id']}")
+        scopes.extend(
+            f"genre:{genre_id}" for genre_id in sorted(genres[title["id"]])
+        )
+        review_count = title["review_count"]
+        for scope in scopes:
+            entries.append(LeaderboardEntry(
+                scope=scope,
+                title_id=title["id"],
+                category_id=title["category_id"],
+                year=title["year"],
+                score_sum=title["score_sum"],
+                review_count=review_count,
+                rating=(
+                    title["score_sum"] / review_count
+                    if review_count else None
+                ),
+            ))
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0005_title_fts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LeaderboardEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(max_length=50, verbose_name="Разрез"),
+                ),
+                ("year", models.SmallIntegerField(verbose_name="Год")),
+                ("score_sum", models.PositiveIntegerField(default=0)),
+                ("review_count", models.PositiveIntegerField(default=0)),
+                (
+                    "rating",
+                    models.FloatField(null=True, verbose_name="Рейтинг"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="reviews.category",
+                        verbose_name="Категория",
+                    ),
+                ),
+                (
+                    "title",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="leaderboard_entries",
+                        to="reviews.title",
+                        verbose_name="Произведение",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Строка рейтинга",
+                "verbose_name_plural": "Строки рейтинга",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="leaderboardentry",
+            index=models.Index(
+                fields=["scope", "-rating", "-review_count", "title"],
+                name="leaderboard_scope_rating_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="leaderboardentry",
+            constraint=models.UniqueConstraint(
+                fields=("scope", "title"), name="unique_leaderboard_entry"
+            ),
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_score_histograms(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    Review = apps.get_model("reviews", "Review")
+    counts = (
+        Review.objects.order_by()
+        .values_list("title_id", "score")
+        .annotate(count=Count("id"))
+    )
+    for title_id, score, count in counts:
+        Title.objects.filter(id=title_id).update(
+            **{f"score_{score}": count}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0006_leaderboardentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="title",
+            name="score_1",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Оценок 1"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_2",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Оценок 2"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_3",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Оценок 3"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_4",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Оценок 4"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_5",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Оценок 5"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_6",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Оценок 6"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_7",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Оценок 7"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_8",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Оценок 8"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_9",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Оценок 9"
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="score_10",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="Оценок 10"
+            ),
+        ),
+        migrations.RunPython(
+            fill_score_histograms, migrations.RunPython.noop
+        ),
+    ]
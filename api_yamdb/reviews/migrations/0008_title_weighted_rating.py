@@ -0,0 +1,96 @@
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, Sum
+from django.db.models.functions import Cast, Coalesce
+
+PRIOR_ID = 1
+PRIOR_WEIGHT = 10
+DEFAULT_PRIOR_MEAN = 5.5
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    Review = apps.get_model("reviews", "Review")
+    RatingPrior = apps.get_model("reviews", "RatingPrior")
+    totals = Review.objects.aggregate(
+        score_sum=Coalesce(Sum("score"), 0), review_count=Count("id")
+    )
+    RatingPrior.objects.create(pk=PRIOR_ID, **totals)
+    prior_mean = DEFAULT_PRIOR_MEAN
+    if totals["review_count"]:
+        prior_mean = totals["score_sum"] / totals["review_count"]
+    score_sum = Cast("score_sum", FloatField())
+    Title.objects.filter(review_count__gt=0).update(
+        rating=score_sum / F("review_count"),
+        weighted_rating=(score_sum + PRIOR_WEIGHT * prior_mean)
+        / (F("review_count") + PRIOR_WEIGHT),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0007_title_score_histogram"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RatingPrior",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score_sum", models.PositiveBigIntegerField(default=0)),
+                ("review_count", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Средняя оценка по каталогу",
+                "verbose_name_plural": "Средняя оценка по каталогу",
+            },
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="rating",
+            field=models.FloatField(
+                help_text="Средняя оценка, поддерживается при изменении "
+                "отзывов",
+                null=True,
+                verbose_name="Рейтинг",
+            ),
+        ),
+        migrations.AddField(
+            model_name="title",
+            name="weighted_rating",
+            field=models.FloatField(
+                help_text="Средняя оценка, сдвинутая к средней по всем "
+                "отзывам, поддерживается при изменении отзывов",
+                null=True,
+                verbose_name="Взвешенный рейтинг",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="title",
+            index=models.Index(
+                fields=["year", "id"], name="title_year_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="title",
+            index=models.Index(
+                fields=["rating", "id"], name="title_rating_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="title",
+            index=models.Index(
+                fields=["weighted_rating", "id"],
+                name="title_weighted_rating_id_idx",
+            ),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
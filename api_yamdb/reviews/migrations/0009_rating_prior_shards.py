@@ -0,0 +1,48 @@
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import Mod
+
+PRIOR_SHARDS = 16
+
+
+def split_prior(apps, schema_editor):
+    Review = apps.get_model("reviews", "Review")
+    RatingPrior = apps.get_model("reviews", "RatingPrior")
+    shards = {
+        shard + 1: {"score_sum": score_sum, "review_count": count}
+        for shard, score_sum, count in Review.objects.order_by()
+        .annotate(shard=Mod("title_id", PRIOR_SHARDS))
+        .values_list("shard")
+        .annotate(Sum("score"), Count("id"))
+    }
+    for pk in range(1, PRIOR_SHARDS + 1):
+        RatingPrior.objects.update_or_create(
+            pk=pk,
+            defaults=shards.get(pk, {"score_sum": 0, "review_count": 0}),
+        )
+
+
+def merge_prior(apps, schema_editor):
+    RatingPrior = apps.get_model("reviews", "RatingPrior")
+    totals = RatingPrior.objects.aggregate(
+        score_sum=Sum("score_sum"), review_count=Sum("review_count")
+    )
+    RatingPrior.objects.exclude(pk=1).delete()
+    RatingPrior.objects.update_or_create(
+        pk=1,
+        defaults={
+            "score_sum": totals["score_sum"] or 0,
+            "review_count": totals["review_count"] or 0,
+        },
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0008_title_weighted_rating"),
+    ]
+
+    operations = [
+        migrations.RunPython(split_prior, merge_prior),
+    ]
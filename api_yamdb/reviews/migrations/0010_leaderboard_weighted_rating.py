@@ -0,0 +1,46 @@
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_weighted_ratings(apps, schema_editor):
+    Title = apps.get_model("reviews", "Title")
+    LeaderboardEntry = apps.get_model("reviews", "LeaderboardEntry")
+    LeaderboardEntry.objects.update(
+        weighted_rating=Subquery(
+            Title.objects.filter(id=OuterRef("title_id"))
+            .values("weighted_rating")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0009_rating_prior_shards"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="leaderboardentry",
+            name="weighted_rating",
+            field=models.FloatField(
+                null=True, verbose_name="Взвешенный рейтинг"
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="leaderboardentry",
+            name="leaderboard_scope_rating_idx",
+        ),
+        migrations.AddIndex(
+            model_name="leaderboardentry",
+            index=models.Index(
+                fields=(
+                    "scope", "-weighted_rating", "-review_count", "title"
+                ),
+                name="leaderboard_scope_weighted_idx",
+            ),
+        ),
+        migrations.RunPython(
+            fill_weighted_ratings, migrations.RunPython.noop
+        ),
+    ]
@@ -7,6 +7,14 @@ from .validators import validate_year
 
 User = get_user_model()
 
+SCORES = range(MIN_REVIEW_SCORE, MAX_REVIEW_SCORE + 1)
+SCORE_FIELDS = tuple(f"score_{score}" for score in SCORES)
+# Поля, которые поддерживаются при изменении отзывов и не входят
+# в представление произведения в API.
+AGGREGATE_FIELDS = (
+    "score_sum", "review_count", "weighted_rating"
+) + SCORE_FIELDS
+
 
 class GroupBaseModel(models.Model):
     name = models.CharField(
@@ -72,15 +80,68 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         null=True,
     )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Сумма оценок",
+        help_text="Поддерживается при изменении отзывов",
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество отзывов",
+        help_text="Поддерживается при изменении отзывов",
+    )
+    rating = models.FloatField(
+        null=True,
+        verbose_name="Рейтинг",
+        help_text="Средняя оценка, поддерживается при изменении отзывов",
+    )
+    weighted_rating = models.FloatField(
+        null=True,
+        verbose_name="Взвешенный рейтинг",
+        help_text=(
+            "Средняя оценка, сдвинутая к средней по всем отзывам, "
+            "поддерживается при изменении отзывов"
+        ),
+    )
+    score_1 = models.PositiveIntegerField(default=0, verbose_name="Оценок 1")
+    score_2 = models.PositiveIntegerField(default=0, verbose_name="Оценок 2")
+    score_3 = models.PositiveIntegerField(default=0, verbose_name="Оценок 3")
+    score_4 = models.PositiveIntegerField(default=0, verbose_name="Оценок 4")
+    score_5 = models.PositiveIntegerField(default=0, verbose_name="Оценок 5")
+    score_6 = models.PositiveIntegerField(default=0, verbose_name="Оценок 6")
+    score_7 = models.PositiveIntegerField(default=0, verbose_name="Оценок 7")
+    score_8 = models.PositiveIntegerField(default=0, verbose_name="Оценок 8")
+    score_9 = models.PositiveIntegerField(default=0, verbose_name="Оценок 9")
+    score_10 = models.PositiveIntegerField(
+        default=0, verbose_name="Оценок 10"
+    )
 
     class Meta:
         ordering = ("name",)
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
+        indexes = [
+            models.Index(fields=("name", "id"), name="title_name_id_idx"),
+            models.Index(fields=("year", "id"), name="title_year_id_idx"),
+            models.Index(
+                fields=("rating", "id"), name="title_rating_id_idx"
+            ),
+            models.Index(
+                fields=("weighted_rating", "id"),
+                name="title_weighted_rating_id_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def score_histogram(self):
+        return {
+            score: getattr(self, field)
+            for score, field in zip(SCORES, SCORE_FIELDS)
+        }
+
 
 class CreatedModel(models.Model):
     pub_date = models.DateTimeField("дата создания", auto_now_add=True)
@@ -148,6 +209,12 @@ class Review(models.Model):
                 fields=["title", "author"], name="unique_review"
             )
         ]
+        indexes = [
+            models.Index(
+                fields=("title", "pub_date", "id"),
+                name="review_title_pub_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Отзыв {self.author} на {self.title}"
@@ -175,6 +242,86 @@ class Comment(models.Model):
         ordering = ("-pub_date",)
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(
+                fields=("review", "pub_date", "id"),
+                name="comment_review_pub_date_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Комментарий {self.author} к отзыву {self.review}"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Строка рейтинга лучших произведений в разрезе `scope`.
+
+    Разрезы: `all`, `category:<id>`, `genre:<id>` и `year:<год>`.
+    Агрегаты оценок копируются из произведения и поддерживаются при
+    изменении отзывов, поэтому выборка лучших - просмотр индекса
+    по разрезу и взвешенному рейтингу.
+    """
+
+    scope = models.CharField(max_length=50, verbose_name="Разрез")
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name="leaderboard_entries",
+        verbose_name="Произведение",
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="+",
+        verbose_name="Категория",
+    )
+    year = models.SmallIntegerField(verbose_name="Год")
+    score_sum = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    rating = models.FloatField(null=True, verbose_name="Рейтинг")
+    weighted_rating = models.FloatField(
+        null=True, verbose_name="Взвешенный рейтинг"
+    )
+
+    class Meta:
+        verbose_name = "Строка рейтинга"
+        verbose_name_plural = "Строки рейтинга"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "title"], name="unique_leaderboard_entry"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=(
+                    "scope", "-weighted_rating", "-review_count", "title"
+                ),
+                name="leaderboard_scope_weighted_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}: {self.title_id}"
+
+
+class RatingPrior(models.Model):
+    """
+    Сумма и количество оценок части отзывов.
+
+    Отзывы распределены по `PRIOR_SHARDS` строкам по произведению, сумма
+    строк даёт среднюю оценку по каталогу - априорную для взвешенного
+    рейтинга произведений. Строки обновляются при изменении отзывов и
+    пересчитываются командой `reconcile_ratings`.
+    """
+
+    score_sum = models.PositiveBigIntegerField(default=0)
+    review_count = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Средняя оценка по каталогу"
+        verbose_name_plural = "Средняя оценка по каталогу"
+
+    def __str__(self):
+        return f"{self.score_sum} / {self.review_count}"
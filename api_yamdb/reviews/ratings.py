@@ -0,0 +1,282 @@
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from math import isclose
+
+from django.db import transaction
+from django.db.models import (Case, Count, F, FloatField, Subquery, Sum,
+                              Value, When)
+from django.db.models.functions import Cast, Coalesce, Mod, NullIf
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .constants import MAX_REVIEW_SCORE, MIN_REVIEW_SCORE
+from .leaderboards import apply_leaderboard_change, rebuild_leaderboards
+from .models import (AGGREGATE_FIELDS, SCORE_FIELDS, SCORES, RatingPrior,
+                     Review, Title)
+
+RECONCILE_CHUNK_SIZE = 1000
+RATING_FIELDS = AGGREGATE_FIELDS + ("rating",)
+# Сумма и количество оценок по каталогу хранятся в нескольких строках
+# `RatingPrior`: отзыв учитывается в строке `prior_shard` своего
+# произведения, поэтому записи отзывов к разным произведениям не
+# выстраиваются в очередь за одной строкой.
+PRIOR_SHARDS = 16
+# Сколько отзывов со средней по каталогу оценкой добавляется к отзывам
+# произведения: чем меньше у произведения отзывов, тем ближе его
+# взвешенный рейтинг к средней оценке по каталогу.
+PRIOR_WEIGHT = 10
+DEFAULT_PRIOR_MEAN = (MIN_REVIEW_SCORE + MAX_REVIEW_SCORE) / 2
+
+# Отзывы, уже вычтенные из агрегатов `forget_reviews` до их удаления.
+forgotten_reviews = ContextVar("forgotten_reviews", default=frozenset())
+
+
+def prior_shard(title_id):
+    """Первичный ключ строки `RatingPrior`, в которой учтено произведение."""
+    return int(title_id) % PRIOR_SHARDS + 1
+
+
+def prior_mean_expression():
+    """Средняя оценка по каталогу как подзапрос, суммирующий `RatingPrior`."""
+    return Coalesce(
+        Subquery(
+            RatingPrior.objects.order_by()
+            .annotate(group=Value(1))
+            .values("group")
+            .annotate(
+                mean=Cast(Sum("score_sum"), FloatField())
+                / NullIf(Sum("review_count"), 0)
+            )
+            .values("mean")
+        ),
+        Value(DEFAULT_PRIOR_MEAN),
+        output_field=FloatField(),
+    )
+
+
+def weighted(score_sum, review_count, prior_mean):
+    """Средняя оценка с `PRIOR_WEIGHT` отзывами со средней по каталогу."""
+    return (score_sum + PRIOR_WEIGHT * prior_mean) / (
+        review_count + PRIOR_WEIGHT
+    )
+
+
+def apply_prior_change(title_id, score_delta, count_delta):
+    """
+    Учитывает изменение отзыва в строке `RatingPrior` произведения.
+
+    Недостающая строка, например после очистки таблицы, создаётся
+    заново; точные значения восстанавливает `reconcile_ratings`.
+    """
+    pk = prior_shard(title_id)
+    if not RatingPrior.objects.filter(pk=pk).update(
+        score_sum=F("score_sum") + score_delta,
+        review_count=F("review_count") + count_delta,
+    ):
+        RatingPrior.objects.bulk_create(
+            [RatingPrior(
+                pk=pk,
+                score_sum=max(score_delta, 0),
+                review_count=max(count_delta, 0),
+            )],
+            ignore_conflicts=True,
+        )
+
+
+def apply_review_change(title_id, old_score=None, new_score=None):
+    """
+    Обновляет агрегаты рейтинга, гистограмму оценок произведения и
+    строку средней оценки по каталогу при изменении отзыва.
+
+    old_score=None означает создание отзыва, new_score=None - удаление.
+    Вызывается внутри транзакции, в которой сохраняется сам отзыв.
+    Возвращает количество обновлённых строк произведений.
+    """
+    changes = Counter()
+    for score, delta in ((old_score, -1), (new_score, 1)):
+        if score is not None:
+            changes[score] += delta
+    return apply_score_changes(title_id, changes)
+
+
+def apply_score_changes(title_id, changes):
+    """
+    Применяет к агрегатам произведения изменения количества оценок
+    {оценка: изменение} одним UPDATE.
+    """
+    score_delta = sum(score * delta for score, delta in changes.items())
+    count_delta = sum(changes.values())
+    histogram = {
+        f"score_{score}": F(f"score_{score}") + delta
+        for score, delta in changes.items()
+        if delta
+    }
+    score_sum = Cast(F("score_sum") + score_delta, FloatField())
+    review_count = F("review_count") + count_delta
+    has_reviews = {"review_count__gt": -count_delta}
+    if score_delta or count_delta:
+        apply_prior_change(title_id, score_delta, count_delta)
+    prior_mean = prior_mean_expression()
+    updated = Title.objects.filter(id=title_id).update(
+        score_sum=F("score_sum") + score_delta,
+        review_count=review_count,
+        rating=Case(
+            When(**has_reviews, then=score_sum / review_count),
+            default=None,
+            output_field=FloatField(),
+        ),
+        weighted_rating=Case(
+            When(
+                **has_reviews,
+                then=weighted(score_sum, review_count, prior_mean),
+            ),
+            default=None,
+            output_field=FloatField(),
+        ),
+        **histogram,
+    )
+    if updated:
+        apply_leaderboard_change(title_id, score_delta, count_delta)
+    return updated
+
+
+@receiver(pre_delete, sender=Review)
+def forget_deleted_review(sender, instance, **kwargs):
+    """
+    Вычитает удаляемый отзыв из агрегатов произведения.
+
+    Срабатывает при любом удалении, в том числе каскадном - вместе с
+    автором или произведением, - в транзакции удаления. Отзывы, уже
+    вычтенные `forget_reviews`, пропускаются.
+    """
+    if instance.pk in forgotten_reviews.get():
+        return
+    apply_review_change(instance.title_id, old_score=instance.score)
+
+
+@contextmanager
+def forget_reviews(reviews):
+    """
+    Вычитает отзывы `reviews` из агрегатов до их удаления внутри блока.
+
+    Для удалений множества отзывов сразу - пачкой или каскадно вместе с
+    произведением или автором: вместо двух UPDATE на каждый отзыв в
+    `forget_deleted_review` выполняется один UPDATE на произведение.
+    Вычитание и удаление выполняются в одной транзакции.
+    """
+    with transaction.atomic():
+        ids = set()
+        changes = defaultdict(Counter)
+        for review_id, title_id, score in reviews.values_list(
+            "id", "title_id", "score"
+        ):
+            ids.add(review_id)
+            changes[title_id][score] -= 1
+        for title_id, title_changes in changes.items():
+            apply_score_changes(title_id, title_changes)
+        token = forgotten_reviews.set(forgotten_reviews.get() | ids)
+        try:
+            yield
+        finally:
+            forgotten_reviews.reset(token)
+
+
+def reconcile_prior():
+    """
+    Пересчитывает строки `RatingPrior` по отзывам и возвращает среднюю
+    оценку по каталогу.
+    """
+    shards = {
+        shard + 1: {"score_sum": score_sum, "review_count": count}
+        for shard, score_sum, count in Review.objects.order_by()
+        .annotate(shard=Mod("title_id", PRIOR_SHARDS))
+        .values_list("shard")
+        .annotate(Sum("score"), Count("id"))
+    }
+    for shard in range(PRIOR_SHARDS):
+        RatingPrior.objects.update_or_create(
+            pk=shard + 1,
+            defaults=shards.get(
+                shard + 1, {"score_sum": 0, "review_count": 0}
+            ),
+        )
+    score_sum = sum(totals["score_sum"] for totals in shards.values())
+    review_count = sum(totals["review_count"] for totals in shards.values())
+    if not review_count:
+        return DEFAULT_PRIOR_MEAN
+    return score_sum / review_count
+
+
+def aggregates(histogram, prior_mean=DEFAULT_PRIOR_MEAN):
+    """Значения полей агрегатов по гистограмме {оценка: количество}."""
+    score_sum = sum(score * count for score, count in histogram.items())
+    review_count = sum(histogram.values())
+    values = {
+        "score_sum": score_sum,
+        "review_count": review_count,
+        "rating": score_sum / review_count if review_count else None,
+        "weighted_rating": (
+            weighted(score_sum, review_count, prior_mean)
+            if review_count else None
+        ),
+    }
+    for score, field in zip(SCORES, SCORE_FIELDS):
+        values[field] = histogram.get(score, 0)
+    return values
+
+
+def differs(old, new):
+    if isinstance(new, float) and old is not None:
+        return not isclose(old, new)
+    return old != new
+
+
+def reconcile_ratings(chunk_size=RECONCILE_CHUNK_SIZE):
+    """
+    Пересчитывает агрегаты рейтинга всех произведений по таблице отзывов.
+
+    Сначала пересчитывается средняя оценка по каталогу, по которой
+    обновляются взвешенные рейтинги всех произведений: при записи отзыва
+    взвешенный рейтинг считается по средней на тот момент. Произведения
+    обрабатываются пачками по первичному ключу, каждая пачка - в
+    отдельной транзакции, вместе с пересозданием их строк рейтингов
+    лучших. Возвращает количество исправленных произведений.
+    """
+    with transaction.atomic():
+        prior_mean = reconcile_prior()
+    fixed = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            titles = list(
+                Title.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", *RATING_FIELDS)[:chunk_size]
+            )
+            if not titles:
+                return fixed
+            last_id = titles[-1].id
+            histograms = defaultdict(dict)
+            for title_id, score, count in (
+                Review.objects.filter(
+                    title_id__gte=titles[0].id, title_id__lte=last_id
+                )
+                .order_by()
+                .values_list("title_id", "score")
+                .annotate(count=Count("id"))
+            ):
+                histograms[title_id][score] = count
+            changed = []
+            for title in titles:
+                actual = aggregates(histograms[title.id], prior_mean)
+                if any(
+                    differs(getattr(title, field), value)
+                    for field, value in actual.items()
+                ):
+                    for field, value in actual.items():
+                        setattr(title, field, value)
+                    changed.append(title)
+            Title.objects.bulk_update(changed, RATING_FIELDS)
+            rebuild_leaderboards(titles[0].id, last_id)
+            fixed += len(changed)
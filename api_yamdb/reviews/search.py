@@ -0,0 +1,100 @@
+"""
+Полнотекстовый поиск произведений на SQLite FTS5.
+
+Индекс `reviews_title_fts` - внешняя (external content) таблица FTS5 над
+`reviews_title`, синхронизируемая триггерами, поэтому в неё попадают и
+массовые операции. SQLite пересоздаёт таблицу при изменении её схемы и
+удаляет триггеры вместе со старой таблицей, поэтому после каждого
+`migrate` недостающие триггеры создаются заново, см.
+`ensure_title_fts_triggers`.
+"""
+import re
+
+from django.db import connections, transaction
+from django.db.models import Q
+
+FTS_TABLE = "reviews_title_fts"
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+TRIGGERS_SQL = (
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+    AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+    AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+)
+TRIGGER_NAMES = {f"{FTS_TABLE}_ai", f"{FTS_TABLE}_ad", f"{FTS_TABLE}_au"}
+REBUILD_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+
+def ensure_title_fts_triggers(sender, using, **kwargs):
+    """
+    Создаёт триггеры индекса, удалённые пересозданием `reviews_title`.
+
+    Обработчик `post_migrate`. Если триггеров не было, изменения
+    произведений могли пройти мимо индекса, поэтому он перестраивается.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name IN (%s, %s, %s, %s)",
+            [FTS_TABLE, *sorted(TRIGGER_NAMES)],
+        )
+        existing = {name for name, in cursor.fetchall()}
+        # Индекса нет до миграции 0005 и после её отката.
+        if FTS_TABLE not in existing or TRIGGER_NAMES <= existing:
+            return
+        with transaction.atomic(using=using):
+            for sql in TRIGGERS_SQL:
+                cursor.execute(sql)
+            cursor.execute(REBUILD_SQL)
+
+
+def build_match_expression(query):
+    """
+    Превращает пользовательский запрос в выражение MATCH.
+
+    Каждое слово берётся в кавычки, чтобы синтаксис FTS5 из запроса не
+    интерпретировался, и ищется по префиксу; слова объединяются по И.
+    """
+    words = re.findall(r"\w+", query)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_titles(queryset, query):
+    """Фильтрует произведения по запросу и сортирует их по bm25."""
+    expression = build_match_expression(query)
+    if not expression:
+        return queryset
+    if connections[queryset.db].vendor != "sqlite":
+        return queryset.filter(
+            Q(name__icontains=query) | Q(description__icontains=query)
+        )
+    return queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f"{FTS_TABLE}.rowid = reviews_title.id",
+            f"{FTS_TABLE} MATCH %s",
+        ],
+        params=[expression],
+        select={
+            "search_rank": (
+                f"bm25({FTS_TABLE}, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT})"
+            )
+        },
+    ).order_by("search_rank", "id")
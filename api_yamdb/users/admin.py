@@ -2,11 +2,15 @@ from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
+from reviews.admin import ForgetReviewsAdminMixin
+from users.models import EmailOutbox
+
 User = get_user_model()
 
 
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(ForgetReviewsAdminMixin, BaseUserAdmin):
+    reviews_lookup = 'author'
     list_display = ('username', 'email', 'role', 'is_active', 'is_staff')
     search_fields = ('username', 'email')
     list_filter = ('role', 'is_staff', 'is_superuser')
@@ -24,3 +28,11 @@ class UserAdmin(BaseUserAdmin):
             'fields': ('username', 'email', 'password1', 'password2'),
         }),
     )
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipient', 'created_at', 'attempts',
+                    'sent_at')
+    list_filter = ('sent_at',)
+    search_fields = ('recipient',)
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.outbox import BATCH_SIZE, MAX_ATTEMPTS, deliver_batch, outbox_stats
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди EmailOutbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество писем, отправляемых через одно соединение.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=MAX_ATTEMPTS,
+            help='Количество попыток, после которого письмо не отправляется.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить готовые письма и завершиться.',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Показать глубину очереди и задержку доставки.',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for name, value in outbox_stats(options['max_attempts']).items():
+                self.stdout.write(f'{name}: {value}')
+            return
+        while True:
+            sent, failed = deliver_batch(
+                options['batch_size'], options['max_attempts']
+            )
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено: {sent}, ошибок: {failed}'
+                )
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
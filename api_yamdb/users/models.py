@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 
 from users.constants import EMAIL_MAX_LENGTH, USERNAME_MAX_LENGTH
 from users.validators import validate_username
@@ -51,3 +52,37 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class EmailOutbox(models.Model):
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст письма')
+    from_email = models.EmailField(max_length=EMAIL_MAX_LENGTH)
+    recipient = models.EmailField(max_length=EMAIL_MAX_LENGTH)
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Дата постановки в очередь'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now, verbose_name='Следующая попытка'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Количество попыток'
+    )
+    sent_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Дата отправки'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = [
+            models.Index(
+                fields=('sent_at', 'next_attempt_at'),
+                name='outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {self.recipient}'
@@ -0,0 +1,146 @@
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from users.models import EmailOutbox
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+LEASE = timedelta(minutes=5)
+
+
+def enqueue_email(subject, body, from_email, recipient):
+    return EmailOutbox.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        recipient=recipient,
+    )
+
+
+def pending_emails(max_attempts=MAX_ATTEMPTS):
+    return EmailOutbox.objects.filter(
+        sent_at__isnull=True, attempts__lt=max_attempts
+    )
+
+
+def backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def claim_batch(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """
+    Захватывает пачку писем, готовых к отправке.
+
+    Захват сдвигает next_attempt_at на время аренды, поэтому письма не
+    отправит параллельно запущенный обработчик, а после падения
+    обработчика они вернутся в очередь.
+    """
+    now = timezone.now()
+    ids = list(
+        pending_emails(max_attempts)
+        .filter(next_attempt_at__lte=now)
+        .values_list('id', flat=True)[:batch_size]
+    )
+    lease_until = now + LEASE
+    EmailOutbox.objects.filter(
+        id__in=ids, sent_at__isnull=True, next_attempt_at__lte=now
+    ).update(next_attempt_at=lease_until)
+    return list(
+        EmailOutbox.objects.filter(id__in=ids, next_attempt_at=lease_until)
+    )
+
+
+def mark_failed(email, error):
+    email.next_attempt_at = timezone.now() + backoff(email.attempts)
+    email.last_error = repr(error)
+
+
+def deliver_batch(batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS):
+    """
+    Отправляет пачку писем через одно соединение с почтовым сервером.
+
+    Неудачная попытка откладывает письмо с экспоненциальной задержкой.
+    Возвращает количество отправленных и неотправленных писем.
+    """
+    emails = claim_batch(batch_size, max_attempts)
+    if not emails:
+        return 0, 0
+    sent = failed = 0
+    connection = get_connection()
+    for email in emails:
+        email.attempts += 1
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed(email, error)
+        failed = len(emails)
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    subject=email.subject,
+                    body=email.body,
+                    from_email=email.from_email,
+                    to=[email.recipient],
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    mark_failed(email, error)
+                    failed += 1
+                else:
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+                    sent += 1
+        finally:
+            connection.close()
+    EmailOutbox.objects.bulk_update(
+        emails, ('attempts', 'next_attempt_at', 'sent_at', 'last_error')
+    )
+    return sent, failed
+
+
+def outbox_stats(max_attempts=MAX_ATTEMPTS, sample_size=1000):
+    """
+    Глубина очереди и задержка доставки.
+
+    Задержка считается по последним `sample_size` отправленным письмам
+    как разница между постановкой в очередь и отправкой.
+    """
+    now = timezone.now()
+    pending = pending_emails(max_attempts)
+    oldest = pending.order_by('created_at').values_list(
+        'created_at', flat=True
+    ).first()
+    latencies = sorted(
+        (sent_at - created_at).total_seconds()
+        for created_at, sent_at in EmailOutbox.objects.filter(
+            sent_at__isnull=False
+        ).order_by('-sent_at').values_list(
+            'created_at', 'sent_at'
+        )[:sample_size]
+    )
+
+    def percentile(value):
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1,
+                             int(len(latencies) * value))]
+
+    return {
+        'pending': pending.count(),
+        'failed': EmailOutbox.objects.filter(
+            sent_at__isnull=True, attempts__gte=max_attempts
+        ).count(),
+        'oldest_pending_age': (
+            (now - oldest).total_seconds() if oldest else None
+        ),
+        'latency_p50': percentile(0.5),
+        'latency_p95': percentile(0.95),
+    }
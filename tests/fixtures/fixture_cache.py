@@ -0,0 +1,21 @@
+import pytest
+from django.core.cache import cache, caches
+
+from api.authentication import user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    caches['tokens'].clear()
+    user_cache.clear()
+    yield
+    cache.clear()
+    caches['tokens'].clear()
+    user_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    settings.METRICS_DIR = tmp_path / 'metrics'
+    return settings.METRICS_DIR
@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.fixture(scope='session')
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """Реплика `replica` для тестов: зеркало тестовой основной базы."""
+    from django.conf import settings
+    from django.db import connections
+
+    settings.DATABASES.setdefault('replica', {
+        **settings.DATABASES['default'],
+        'TEST': {'MIRROR': 'default'},
+    })
+    connections.configure_settings(settings.DATABASES)
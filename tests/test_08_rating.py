@@ -0,0 +1,198 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08RatingAPI:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              admin, user, user_client,
+                                              moderator, moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        create_single_review(moderator_client, title_id, 'Отлично', 8)
+        assert self.get_rating(client, title_id) == 6
+
+        response = admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            ),
+            data={'score': 10}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки отзыва.'
+        )
+
+        for review in reviews:
+            response = admin_client.delete(
+                self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                    title_id=title_id, review_id=review['id']
+                )
+            )
+            assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(client, title_id) == 8, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+        assert self.get_rating(client, titles[1]['id']) is None
+
+    def test_02_reconcile_ratings_command(self, client, admin_client, admin,
+                                          user, user_client):
+        from reviews.models import Title
+
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+        }
+        _, titles = create_reviews(admin_client, author_map)
+        Title.objects.update(score_sum=0, review_count=0)
+
+        call_command('reconcile_ratings', chunk_size=1)
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.review_count) == (10, 2), (
+            'Проверьте, что команда `reconcile_ratings` пересчитывает '
+            'агрегаты рейтинга по отзывам.'
+        )
+        assert self.get_rating(client, titles[0]['id']) == 5
+
+    def test_03_duplicate_review_is_rejected_by_constraint(self, client,
+                                                          admin_client,
+                                                          user, user_client):
+        from reviews.models import Review, Title
+
+        _, titles = create_reviews(admin_client, {user: user_client})
+        title_id = titles[1]['id']
+        # Отзыв, созданный в обход API, имитирует одновременный запрос,
+        # который успел вставить строку раньше.
+        Review.objects.create(
+            title_id=title_id, author=user, text='Текст', score=3
+        )
+        response = user_client.post(
+            f'/api/v1/titles/{title_id}/reviews/',
+            data={'text': 'Повтор', 'score': 9},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв автора на произведение '
+            'возвращает статус 400, а не 500.'
+        )
+        assert response.json() == {
+            'non_field_errors': ['Вы уже оставили отзыв на это произведение.']
+        }
+        title = Title.objects.get(pk=title_id)
+        assert title.review_count == 0, (
+            'Проверьте, что при отклонённом отзыве агрегаты рейтинга '
+            'не меняются.'
+        )
+
+        response = user_client.post(
+            '/api/v1/titles/0/reviews/', data={'text': 'Текст', 'score': 5}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_cascade_delete_updates_aggregates(self, client, admin_client,
+                                                  admin, user, user_client):
+        from reviews.models import Title
+
+        _, titles = create_reviews(admin_client, {user: user_client})
+        create_single_review(admin_client, titles[0]['id'], 'Отлично', 9)
+        title_id = titles[0]['id']
+        assert self.get_rating(client, title_id) == 7
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title = Title.objects.get(pk=title_id)
+        assert (title.score_sum, title.review_count, title.rating) == (
+            9, 1, 9
+        ), (
+            'Проверьте, что отзывы, удалённые вместе с автором, вычитаются '
+            'из агрегатов рейтинга произведения.'
+        )
+        assert self.get_rating(client, title_id) == 9
+
+    def test_05_aggregates_are_not_filters(self, client, admin_client,
+                                           user, user_client):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        response = client.get('/api/v1/titles/', {'score_sum': 5})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == len(titles), (
+            'Проверьте, что служебные поля агрегатов рейтинга не доступны '
+            'как фильтры списка произведений.'
+        )
+        response = client.get('/api/v1/titles/', {'year': 1984})
+        assert response.json()['count'] == 1
+
+    def test_06_cascade_delete_updates_each_title_once(
+            self, client, admin_client, admin, user, user_client,
+            moderator, moderator_client):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.db.models import Sum
+
+        from reviews.models import RatingPrior, Title
+
+        _, titles = create_reviews(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+        first_id, second_id = titles[0]['id'], titles[1]['id']
+        create_single_review(user_client, second_id, 'Отлично', 9)
+        create_single_review(moderator_client, second_id, 'Плохо', 3)
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=first_id)
+            )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title_updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "reviews_title"')
+        ]
+        assert len(title_updates) <= 1, (
+            'Проверьте, что при удалении произведения его отзывы вычитаются '
+            'из агрегатов одним UPDATE, а не по одному на каждый отзыв.'
+        )
+
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        title = Title.objects.get(pk=second_id)
+        assert (title.score_sum, title.review_count, title.score_9) == (
+            3, 1, 0
+        ), (
+            'Проверьте, что отзывы, удалённые вместе с автором, вычитаются '
+            'из агрегатов и гистограммы произведения.'
+        )
+        assert RatingPrior.objects.aggregate(
+            score_sum=Sum('score_sum'), review_count=Sum('review_count')
+        ) == {'score_sum': 3, 'review_count': 1}, (
+            'Проверьте, что удалённые отзывы вычитаются из средней оценки '
+            'по каталогу.'
+        )
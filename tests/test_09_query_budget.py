@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (
+    check_query_budget, create_comments, create_single_review, create_titles
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryBudget:
+
+    def create_many_titles(self, admin_client, count):
+        titles, categories, genres = create_titles(admin_client)
+        for idx in range(count):
+            response = admin_client.post('/api/v1/titles/', data={
+                'name': f'Произведение {idx}',
+                'year': 2000,
+                'genre': [genre['slug'] for genre in genres],
+                'category': categories[idx % 2]['slug'],
+            })
+            assert response.status_code == HTTPStatus.CREATED
+        return titles
+
+    def test_01_titles_budget_does_not_depend_on_page_size(self, client,
+                                                           admin_client):
+        titles = self.create_many_titles(admin_client, 12)
+
+        response = check_query_budget(client, '/api/v1/titles/')
+        assert len(response.json()['results']) == 10
+        check_query_budget(client, '/api/v1/titles/?page=2')
+        check_query_budget(client, f'/api/v1/titles/{titles[0]["id"]}/')
+        check_query_budget(
+            admin_client, '/api/v1/titles/', authenticated=True
+        )
+
+    def test_02_reviews_and_comments_budget(self, client, admin_client,
+                                            admin, user, user_client,
+                                            moderator, moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_id = titles[0]['id']
+        create_single_review(user_client, titles[1]['id'], 'Текст', 7)
+
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        check_query_budget(client, reviews_url)
+        check_query_budget(client, f'{reviews_url}{reviews[0]["id"]}/')
+
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        check_query_budget(client, comments_url)
+        check_query_budget(client, f'{comments_url}{comments[0]["id"]}/')
+
+        response = check_query_budget(
+            moderator_client, f'/api/v1/titles/{titles[1]["id"]}/reviews/',
+            method='post', authenticated=True,
+            data={'text': 'Текст', 'score': 5},
+        )
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_03_groups_and_users_budget(self, client, admin_client):
+        create_titles(admin_client)
+        check_query_budget(client, '/api/v1/categories/')
+        check_query_budget(client, '/api/v1/genres/')
+        check_query_budget(admin_client, '/api/v1/users/', authenticated=True)
+        check_query_budget(
+            admin_client, '/api/v1/users/me/', authenticated=True
+        )
@@ -0,0 +1,95 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def collect(self, client, url):
+        pages = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что в режиме курсора не выполняется подсчёт '
+                'общего количества объектов.'
+            )
+            pages.append(data)
+            url = data['next']
+        return pages
+
+    def test_01_titles_cursor_walk(self, client, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        for idx in range(23):
+            admin_client.post(self.TITLES_URL, data={
+                'name': f'Произведение {idx % 5}',
+                'year': 2000,
+                'genre': [genres[0]['slug']],
+                'category': categories[0]['slug'],
+            })
+
+        pages = self.collect(client, f'{self.TITLES_URL}?pagination=cursor')
+        ids = [title['id'] for page in pages for title in page['results']]
+        assert len(pages) == 3
+        assert len(ids) == len(set(ids)) == 25, (
+            'Проверьте, что при обходе курсором произведения не '
+            'повторяются и не пропускаются.'
+        )
+        names = [
+            (title['name'], title['id'])
+            for page in pages for title in page['results']
+        ]
+        assert names == sorted(names), (
+            'Проверьте, что в режиме курсора произведения упорядочены по '
+            '`name` и `id`.'
+        )
+
+        previous = client.get(pages[2]['previous']).json()
+        assert previous['results'] == pages[1]['results'], (
+            'Проверьте, что ссылка `previous` в режиме курсора ведёт на '
+            'предыдущую страницу.'
+        )
+
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_cursor_stable_under_inserts(self, client, admin_client,
+                                            admin, user, user_client,
+                                            moderator, moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        _, reviews, titles = create_comments(admin_client, author_map)
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            'comments/'
+        )
+        for idx in range(10):
+            user_client.post(url, data={'text': f'Ещё комментарий {idx}'})
+
+        first = client.get(f'{url}?pagination=cursor').json()
+        assert len(first['results']) == 10
+        for idx in range(5):
+            user_client.post(url, data={'text': f'Новый комментарий {idx}'})
+        second = client.get(first['next']).json()
+
+        seen = [comment['id'] for comment in first['results']]
+        seen += [comment['id'] for comment in second['results']]
+        assert len(seen) == len(set(seen)) == 13, (
+            'Проверьте, что новые комментарии не сдвигают страницы, '
+            'уже выданные в режиме курсора.'
+        )
+
+        response = client.get(url)
+        assert response.json()['count'] == 18, (
+            'Проверьте, что без параметра курсора сохраняется пагинация '
+            'по номеру страницы.'
+        )
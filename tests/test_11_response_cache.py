@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ResponseCache:
+
+    def get(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return response.json(), len(context.captured_queries)
+
+    def test_01_anonymous_reads_are_cached(self, client, admin_client):
+        create_titles(admin_client)
+        for url in ('/api/v1/titles/', '/api/v1/categories/',
+                    '/api/v1/genres/'):
+            first, _ = self.get(client, url)
+            second, queries = self.get(client, url)
+            assert second == first
+            assert queries == 0, (
+                f'Проверьте, что повторный GET-запрос анонима к `{url}` '
+                'обслуживается из кеша без обращения к базе данных.'
+            )
+        _, queries = self.get(client, '/api/v1/titles/?year=1984')
+        assert queries > 0, (
+            'Проверьте, что ключ кеша учитывает строку запроса.'
+        )
+
+    def test_02_writes_invalidate_cache(self, client, admin_client,
+                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        self.get(client, '/api/v1/categories/')
+        self.get(client, title_url)
+
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Музыка', 'slug': 'music'}
+        )
+        data, _ = self.get(client, '/api/v1/categories/')
+        assert data['count'] == 3, (
+            'Проверьте, что создание категории сбрасывает кеш списка '
+            'категорий.'
+        )
+
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 8)
+        data, _ = self.get(client, title_url)
+        assert data['rating'] == 8, (
+            'Проверьте, что создание отзыва сбрасывает кеш произведений.'
+        )
+
+        admin_client.delete('/api/v1/categories/music/')
+        admin_client.patch(title_url, data={'name': 'Новое название'})
+        data, _ = self.get(client, title_url)
+        assert data['name'] == 'Новое название'
+
+    def test_03_authenticated_reads_bypass_cache(self, client, admin_client):
+        create_titles(admin_client)
+        self.get(client, '/api/v1/genres/')
+        _, queries = self.get(admin_client, '/api/v1/genres/')
+        assert queries > 0
+
+    def test_04_every_bump_writes_new_version(self, monkeypatch):
+        import api.cache
+
+        cache = api.cache.cache
+
+        class WriteOnlyCache:
+            """Кеш, из которого нельзя прочитать текущую версию."""
+
+            def set_many(self, *args, **kwargs):
+                return cache.set_many(*args, **kwargs)
+
+        seen = {api.cache.get_versions(['title'])[0]}
+        for _ in range(5):
+            monkeypatch.setattr(api.cache, 'cache', WriteOnlyCache())
+            api.cache.bump_versions(['title'])
+            monkeypatch.undo()
+            seen.add(api.cache.get_versions(['title'])[0])
+        assert len(seen) == 6, (
+            'Проверьте, что каждое изменение записывает новую уникальную '
+            'версию без чтения предыдущей: параллельные изменения не '
+            'должны получать одну и ту же версию.'
+        )
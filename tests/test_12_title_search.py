@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'search': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_by_prefix_and_description(self, client,
+                                                 admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Орешки',
+            'year': 2001,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+            'description': 'Про терминатора',
+        })
+
+        assert self.search(client, 'терм') == ['Терминатор', 'Орешки'], (
+            'Проверьте, что поиск по `search` находит произведения по '
+            'префиксу слова и выше ранжирует совпадения в названии.'
+        )
+        assert self.search(client, 'yippie') == ['Крепкий орешек']
+        assert self.search(client, 'крепкий терм') == []
+        assert self.search(client, '"*') != [], (
+            'Проверьте, что спецсимволы в запросе не ломают поиск.'
+        )
+
+    def test_02_index_follows_title_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        admin_client.patch(url, data={'name': 'Чужой'})
+        assert self.search(client, 'терминатор') == []
+        assert self.search(client, 'чуж') == ['Чужой']
+
+        admin_client.delete(url)
+        assert self.search(client, 'чуж') == [], (
+            'Проверьте, что поисковый индекс обновляется при удалении '
+            'произведения.'
+        )
+
+    def test_03_triggers_restored_after_migrate(self, client, admin_client):
+        from django.core.management import call_command
+        from django.db import connection
+
+        from reviews.models import Title
+        from reviews.search import TRIGGER_NAMES
+
+        def triggers():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+                )
+                return {name for name, in cursor.fetchall()}
+
+        titles, _, _ = create_titles(admin_client)
+        # Так SQLite выполняет AlterField: таблица создаётся заново.
+        with connection.schema_editor() as schema_editor:
+            schema_editor._remake_table(Title)
+        assert not TRIGGER_NAMES & triggers()
+        Title.objects.filter(id=titles[0]['id']).update(name='Бегущий')
+
+        call_command('migrate', verbosity=0)
+        assert TRIGGER_NAMES <= triggers(), (
+            'Проверьте, что после `migrate` триггеры поискового индекса '
+            'создаются заново.'
+        )
+        assert self.search(client, 'бегущ') == ['Бегущий'], (
+            'Проверьте, что индекс перестраивается, если триггеров не было.'
+        )
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[1]["id"]}/', data={'name': 'Чужой'}
+        )
+        assert self.search(client, 'чуж') == ['Чужой']
@@ -0,0 +1,122 @@
+import csv
+import io
+import os
+
+import pytest
+from django.core.management import call_command
+
+from tests.conftest import MANAGE_PATH
+
+DATA_DIR = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def count_rows(filename):
+    with open(os.path.join(DATA_DIR, filename), encoding='utf-8') as file:
+        return sum(1 for _ in csv.reader(file)) - 1
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ImportCsv:
+
+    def test_01_import_loads_all_files(self, django_user_model):
+        from reviews.models import Comment, GenreTitle, Review, Title
+
+        call_command('import_csv', chunk_size=10)
+
+        expected = {
+            Title: 'titles.csv',
+            Review: 'review.csv',
+            Comment: 'comments.csv',
+            GenreTitle: 'genre_title.csv',
+            django_user_model: 'users.csv',
+        }
+        for model, filename in expected.items():
+            assert model.objects.count() == count_rows(filename), (
+                f'Проверьте, что команда `import_csv` загружает все строки '
+                f'файла `{filename}`.'
+            )
+        title = Title.objects.get(pk=1)
+        assert title.review_count == Review.objects.filter(
+            title=title
+        ).count(), (
+            'Проверьте, что после загрузки отзывов пересчитываются '
+            'агрегаты рейтинга произведений.'
+        )
+        assert django_user_model.objects.get(role='admin').is_staff
+
+        output = io.StringIO()
+        call_command('import_csv', stdout=output)
+        assert Review.objects.count() == count_rows('review.csv'), (
+            'Проверьте, что повторный запуск `import_csv` не создаёт '
+            'дубликаты.'
+        )
+        report = next(
+            line for line in output.getvalue().splitlines()
+            if line.startswith('review.csv: ')
+        )
+        assert f' 0 (пропущено {count_rows("review.csv")}), ' in report, (
+            'Проверьте, что строки, которые уже есть в базе, не считаются '
+            'загруженными.'
+        )
+
+    def test_02_rows_with_missing_parents_are_skipped(self, tmp_path):
+        from reviews.models import Review
+
+        for filename in os.listdir(DATA_DIR):
+            with open(os.path.join(DATA_DIR, filename),
+                      encoding='utf-8') as source:
+                content = source.read()
+            if filename == 'titles.csv':
+                content = '\n'.join(content.splitlines()[:2]) + '\n'
+            (tmp_path / filename).write_text(content, encoding='utf-8')
+
+        call_command('import_csv', path=str(tmp_path), workers=1)
+        assert set(Review.objects.values_list('title_id', flat=True)) == {1}
+
+    def test_03_files_are_scheduled_after_their_parents(self):
+        from reviews.management.commands.import_csv import (
+            build_dependencies, csv_to_func
+        )
+
+        dependencies = build_dependencies(csv_to_func)
+        assert dependencies['titles.csv'] == {'category.csv'}
+        assert dependencies['review.csv'] == {'titles.csv', 'users.csv'}
+        assert dependencies['comments.csv'] == {'review.csv', 'users.csv'}
+        assert dependencies['genre_title.csv'] == {
+            'titles.csv', 'genre.csv'
+        }
+        for filename in ('category.csv', 'genre.csv', 'users.csv'):
+            assert dependencies[filename] == set(), (
+                f'Проверьте, что `{filename}` не зависит от других файлов '
+                'и загружается параллельно с ними.'
+            )
+
+    def test_04_dropped_rows_are_not_known_parents(self, tmp_path):
+        from reviews.management.commands.import_csv import (
+            BulkLoader, csv_to_func
+        )
+        from reviews.models import Review
+
+        call_command('import_csv', path=DATA_DIR, workers=1)
+        first = Review.objects.order_by('id').first()
+        missing_id = Review.objects.order_by('-id').first().id + 1
+        path = tmp_path / 'review.csv'
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(
+                ['id', 'title_id', 'text', 'author', 'score', 'pub_date']
+            )
+            writer.writerow([
+                missing_id, first.title_id, 'Повтор', first.author_id, 5,
+                '2019-09-24T21:08:21.567Z',
+            ])
+
+        loader = BulkLoader()
+        assert missing_id not in loader.get_ids(Review)
+        _, build = csv_to_func['review.csv']
+        assert loader.load(path, build) == (0, 1)
+        assert missing_id not in loader.get_ids(Review), (
+            'Проверьте, что строки, пропущенные при вставке из-за '
+            'конфликта уникальности, не считаются существующими '
+            'родителями.'
+        )
@@ -0,0 +1,69 @@
+from datetime import timedelta
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+URL_SIGNUP = '/api/v1/auth/signup/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14EmailOutbox:
+
+    def signup(self, client, username):
+        response = client.post(URL_SIGNUP, data={
+            'username': username,
+            'email': f'{username}@yamdb.fake',
+        })
+        assert response.status_code == HTTPStatus.OK
+
+    def test_01_signup_enqueues_instead_of_sending(self, client):
+        from users.models import EmailOutbox
+        from users.outbox import outbox_stats
+
+        outbox_before_count = len(mail.outbox)
+        for idx in range(3):
+            self.signup(client, f'user{idx}')
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что при регистрации письмо не отправляется '
+            'в рамках запроса, а ставится в очередь.'
+        )
+        assert EmailOutbox.objects.count() == 3
+        assert outbox_stats()['pending'] == 3
+
+        call_command('send_outbox', once=True, batch_size=2)
+
+        assert len(mail.outbox) == outbox_before_count + 3
+        assert mail.outbox[-1].to == ['user2@yamdb.fake']
+        stats = outbox_stats()
+        assert stats['pending'] == 0
+        assert stats['latency_p50'] is not None
+
+    def test_02_failed_delivery_is_retried_with_backoff(self, client):
+        from users.models import EmailOutbox
+        from users.outbox import BACKOFF_BASE, deliver_batch
+
+        self.signup(client, 'unlucky')
+        with mock.patch(
+            'django.core.mail.EmailMessage.send',
+            side_effect=ConnectionError('smtp down'),
+        ):
+            assert deliver_batch() == (0, 1)
+
+        email = EmailOutbox.objects.get()
+        assert email.attempts == 1
+        assert email.sent_at is None
+        assert 'smtp down' in email.last_error
+        assert email.next_attempt_at >= email.created_at + BACKOFF_BASE, (
+            'Проверьте, что неудачная отправка откладывается.'
+        )
+        assert deliver_batch() == (0, 0)
+
+        EmailOutbox.objects.update(
+            next_attempt_at=email.next_attempt_at - timedelta(hours=1)
+        )
+        assert deliver_batch() == (1, 0)
+        email.refresh_from_db()
+        assert email.attempts == 2 and email.sent_at is not None
@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15AuthUserCache:
+
+    USERS_URL = '/api/v1/users/'
+    ME_URL = '/api/v1/users/me/'
+
+    def test_01_user_is_loaded_once(self, user_client, user):
+        user_client.get(self.ME_URL)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(self.ME_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert len(context.captured_queries) == 0, (
+            'Проверьте, что пользователь из JWT-токена берётся из кеша и '
+            'не загружается из базы данных при каждом запросе.'
+        )
+
+    def test_02_role_change_invalidates_cache(self, admin_client, user,
+                                              user_client):
+        assert user_client.get(self.USERS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = admin_client.patch(
+            f'{self.USERS_URL}{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(self.USERS_URL).status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение роли пользователя сбрасывает его '
+            'запись в кеше аутентификации.'
+        )
+
+        user.is_active = False
+        user.save()
+        assert user_client.get(self.ME_URL).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+
+    def test_03_review_write_without_auth_query(self, admin_client, admin,
+                                                user, user_client):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        user_client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Ок', 'score': 6})
+        assert response.status_code == HTTPStatus.CREATED
+        assert not any(
+            'FROM "users_user"' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что при создании отзыва автор не загружается из '
+            'базы данных повторно.'
+        )
+
+    def test_04_requests_do_not_share_cached_user(self, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from api.authentication import CachedJWTAuthentication, user_cache
+
+        user_cache.clear()
+        token = AccessToken.for_user(user)
+        authentication = CachedJWTAuthentication()
+        loaded = authentication.get_user(token)
+        loaded.first_name = 'Изменено в запросе'
+        cached = authentication.get_user(token)
+        assert cached is not loaded
+        assert cached.first_name != 'Изменено в запросе', (
+            'Проверьте, что запрос, загрузивший пользователя в кеш, не '
+            'получает общий экземпляр из кеша.'
+        )
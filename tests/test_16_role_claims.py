@@ -0,0 +1,124 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+def claims_client(user):
+    from api.tokens import RoleAccessToken
+
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {RoleAccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16RoleClaims:
+
+    def test_01_token_carries_role_claims(self, client, user):
+        from django.contrib.auth.tokens import default_token_generator
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['token'])
+        assert token['role'] == 'user'
+        assert token['is_active'] is True
+        assert token['is_staff'] is False
+        assert token['is_superuser'] is False
+
+    def test_02_permission_checks_do_not_load_user(self, admin):
+        caches['tokens'].clear()
+        admin_client = claims_client(admin)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(
+                '/api/v1/genres/', data={'name': 'Драма', 'slug': 'drama'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert not any(
+            'users_user' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что права администратора проверяются по claims '
+            'токена без загрузки пользователя из базы данных.'
+        )
+
+    def test_03_role_change_forces_revalidation(self, admin, user):
+        caches['tokens'].clear()
+        user_client = claims_client(user)
+        users_url = '/api/v1/users/'
+        assert user_client.get(users_url).status_code == HTTPStatus.FORBIDDEN
+
+        response = claims_client(admin).patch(
+            f'{users_url}{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert user_client.get(users_url).status_code == HTTPStatus.OK, (
+            'Проверьте, что после смены роли через `/api/v1/users/` токены, '
+            'выпущенные ранее, проверяются по базе данных.'
+        )
+
+        response = claims_client(admin).patch(
+            f'{users_url}{user.username}/', data={'role': 'user'}
+        )
+        assert user_client.get(users_url).status_code == HTTPStatus.FORBIDDEN
+
+    def test_04_author_can_edit_own_review(self, admin_client, user):
+        from tests.utils import create_titles
+
+        caches['tokens'].clear()
+        titles, _, _ = create_titles(admin_client)
+        user_client = claims_client(user)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = user_client.post(url, data={'text': 'Текст', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+        response = user_client.patch(
+            f'{url}{response.json()["id"]}/', data={'score': 6}
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    def test_05_revalidation_survives_response_cache_eviction(self, admin,
+                                                              user):
+        caches['tokens'].clear()
+        user_client = claims_client(user)
+        users_url = '/api/v1/users/'
+        response = claims_client(admin).patch(
+            f'{users_url}{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        admin_token_client = claims_client(user)
+        assert admin_token_client.get(users_url).status_code == HTTPStatus.OK
+
+        response = claims_client(admin).patch(
+            f'{users_url}{user.username}/', data={'role': 'user'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        cache.clear()
+        assert admin_token_client.get(users_url).status_code == (
+            HTTPStatus.FORBIDDEN
+        ), (
+            'Проверьте, что отметка о смене роли не хранится в общем кеше: '
+            'после его очистки токен со старой ролью не должен проходить '
+            'проверку по claims.'
+        )
+        assert user_client.get(users_url).status_code == HTTPStatus.FORBIDDEN
+
+    def test_06_deactivated_user_is_rejected(self, user):
+        user_client = claims_client(user)
+        user.is_active = False
+        user.save()
+        cache.clear()
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен, выпущенный до блокировки пользователя, '
+            'перестаёт действовать.'
+        )
@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tests.conftest import MANAGE_PATH
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Benchmark:
+
+    def test_01_workload_reports_percentiles_per_route(self):
+        from api.benchmark import (
+            Workload, run_requests, seed_dataset, summarize
+        )
+        from reviews.models import Review, Title
+
+        seed_dataset(titles=20, users=10, reviews_per_title=3, seed=1)
+        assert Title.objects.count() == 20
+        assert Review.objects.exists()
+
+        first = Workload(seed=1).plan(60)
+        second = Workload(seed=1).plan(60)
+        # Токены различаются jti, сравниваются остальные части запросов.
+        assert [item[:4] for item in first] == [
+            item[:4] for item in second
+        ], (
+            'Проверьте, что последовательность запросов бенчмарка '
+            'воспроизводится при одинаковом seed.'
+        )
+
+        results, duration = run_requests(first, concurrency=1)
+        assert len(results) == 60
+        summary = summarize(results, duration)
+        assert summary['total']['requests'] == 60
+        assert summary['total']['errors'] == 0, (
+            'Проверьте, что запросы бенчмарка выполняются без ошибок 5xx.'
+        )
+        assert 'GET title-list' in summary
+        for stats in summary.values():
+            assert stats['p50'] <= stats['p95'] <= stats['p99']
+            assert stats['rps'] > 0
+
+    def test_02_compare_flags_p95_regressions(self):
+        from api.benchmark import compare
+
+        baseline = {
+            'GET title-list': {'p95': 10.0, 'rps': 100.0},
+            'GET genre-list': {'p95': 10.0, 'rps': 100.0},
+        }
+        summary = {
+            'GET title-list': {'p95': 20.0, 'rps': 50.0},
+            'GET genre-list': {'p95': 10.5, 'rps': 100.0},
+            'GET title-detail': {'p95': 1.0, 'rps': 1.0},
+        }
+        lines, regressions = compare(summary, baseline, max_regression=10)
+        assert regressions == ['GET title-list']
+        assert lines[0] == 'GET title-list: p95 +100.0%, rps -50.0%'
+        assert len(lines) == 2
+
+    def test_03_command_runs_without_errors(self, tmp_path):
+        # Команда сама создаёт тестовую базу и окружение, поэтому
+        # запускается в отдельном процессе.
+        output = tmp_path / 'summary.json'
+        script = (
+            'import django\n'
+            'django.setup()\n'
+            'from django.core.management import call_command\n'
+            'call_command("benchmark", titles=20, users=10, requests=80, '
+            f'concurrency=4, output={str(output)!r})\n'
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='api_yamdb.settings')
+        subprocess.run(
+            [sys.executable, '-c', script],
+            check=True, env=env, cwd=MANAGE_PATH, stdout=subprocess.DEVNULL,
+        )
+        summary = json.loads(output.read_text(encoding='utf-8'))
+        assert summary['total']['requests'] == 80
+        assert summary['total']['errors'] == 0, (
+            'Проверьте, что `manage.py benchmark` заменяет все кеши из '
+            '`settings.CACHES` и запросы прогона выполняются без ошибок.'
+        )
@@ -0,0 +1,84 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+
+OPTIONS = {
+    'titles': 200,
+    'users': 100,
+    'categories': 3,
+    'genres': 5,
+    'reviews_per_title': 5,
+    'comments_per_review': 1,
+}
+
+
+def read_files(directory):
+    return {
+        path.name: path.read_bytes() for path in sorted(directory.iterdir())
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18GenerateDataset:
+
+    def test_01_csv_output_is_reproducible(self, tmp_path):
+        call_command(
+            'generate_dataset', output=str(tmp_path / 'a'), seed=7, **OPTIONS
+        )
+        call_command(
+            'generate_dataset', output=str(tmp_path / 'b'), seed=7, **OPTIONS
+        )
+        call_command(
+            'generate_dataset', output=str(tmp_path / 'c'), seed=8, **OPTIONS
+        )
+        first = read_files(tmp_path / 'a')
+        assert first == read_files(tmp_path / 'b'), (
+            'Проверьте, что `generate_dataset` с одинаковым seed создаёт '
+            'одинаковые файлы.'
+        )
+        assert first['review.csv'] != read_files(tmp_path / 'c')['review.csv']
+
+    def test_02_csv_output_is_importable(self, tmp_path):
+        from reviews.models import Comment, Review, Title
+
+        call_command('generate_dataset', output=str(tmp_path), **OPTIONS)
+        call_command('import_csv', path=str(tmp_path), workers=1)
+
+        for model, filename in (
+            (Title, 'titles.csv'),
+            (Review, 'review.csv'),
+            (Comment, 'comments.csv'),
+        ):
+            rows = len((tmp_path / filename).read_text(
+                encoding='utf-8'
+            ).splitlines()) - 1
+            assert model.objects.count() == rows, (
+                f'Проверьте, что `import_csv` загружает все строки '
+                f'сгенерированного файла `{filename}`.'
+            )
+
+    def test_03_database_output_is_skewed_and_appends(self):
+        from reviews.models import Review, Title
+
+        call_command('generate_dataset', **OPTIONS)
+        assert Title.objects.count() == OPTIONS['titles']
+        reviews = Review.objects.count()
+        counts = sorted(
+            Title.objects.annotate(
+                total=Count('reviews')
+            ).values_list('total', flat=True),
+            reverse=True,
+        )
+        assert counts[0] >= 5 * reviews / OPTIONS['titles'], (
+            'Проверьте, что количество отзывов на произведение '
+            'распределено неравномерно.'
+        )
+        assert sum(counts[:OPTIONS['titles'] // 10]) > reviews / 3
+        title = Title.objects.order_by('-review_count').first()
+        assert title.review_count == counts[0]
+
+        call_command('generate_dataset', **OPTIONS)
+        assert Title.objects.count() == 2 * OPTIONS['titles'], (
+            'Проверьте, что повторный запуск `generate_dataset` дописывает '
+            'данные в базу.'
+        )
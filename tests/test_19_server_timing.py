@@ -0,0 +1,70 @@
+import logging
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for part in header.split(','):
+        name, *params = part.strip().split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ServerTiming:
+
+    @override_settings(SERVER_TIMING_ENABLED=True)
+    def test_01_header_reports_queries_and_stages(self, admin_client,
+                                                  caplog):
+        create_titles(admin_client)
+        admin_client.get('/api/v1/titles/')
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.get('/api/v1/titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert 'Server-Timing' in response, (
+            'Проверьте, что ответ содержит заголовок `Server-Timing`.'
+        )
+        metrics = parse_server_timing(response['Server-Timing'])
+        assert set(metrics) == {'db', 'view', 'render', 'total'}
+        queries = int(re.match(r'"(\d+) queries"', metrics['db']['desc'])[1])
+        assert queries == len(context.captured_queries), (
+            'Проверьте, что `Server-Timing` содержит число SQL-запросов, '
+            'выполненных при обработке запроса.'
+        )
+        durations = {name: float(metric['dur'])
+                     for name, metric in metrics.items()}
+        assert durations['render'] > 0
+        assert durations['db'] <= durations['view'] <= durations['total']
+
+        record = caplog.records[-1]
+        assert 'route=title-list' in record.getMessage()
+        assert 'status=200' in record.getMessage()
+        assert record.timing['queries'] == queries
+
+    @override_settings(SERVER_TIMING_ENABLED=True)
+    def test_02_header_is_sent_only_to_staff(self, admin_client, user_client):
+        create_titles(admin_client)
+        for client in (Client(), user_client):
+            response = client.get('/api/v1/titles/')
+            assert response.status_code == HTTPStatus.OK
+            assert 'Server-Timing' not in response, (
+                'Проверьте, что заголовок `Server-Timing` с числом запросов '
+                'и временем работы с базой получают только сотрудники.'
+            )
+
+    @override_settings(SERVER_TIMING_ENABLED=False)
+    def test_03_middleware_can_be_disabled(self):
+        response = Client().get('/api/v1/genres/')
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что заголовок `Server-Timing` не добавляется при '
+            '`SERVER_TIMING_ENABLED = False`.'
+        )
@@ -0,0 +1,183 @@
+import os
+import subprocess
+import sys
+from http import HTTPStatus
+
+import pytest
+
+from tests.conftest import MANAGE_PATH
+from tests.utils import create_titles
+
+
+def parse_metrics(text):
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        name, value = line.rsplit(' ', 1)
+        samples[name] = float(value)
+    return samples
+
+
+def sample(name, **labels):
+    return name + '{' + ','.join(
+        f'{key}="{value}"' for key, value in labels.items()
+    ) + '}'
+
+
+def run_finished_processes(metrics_dir):
+    """Два завершившихся процесса увеличивают счётчик на 2."""
+    script = (
+        'import django\n'
+        'django.setup()\n'
+        'from django.conf import settings\n'
+        f'settings.METRICS_DIR = {str(metrics_dir)!r}\n'
+        'from api.metrics import requests_total\n'
+        'requests_total.inc(2, route="title-list", method="GET", '
+        'status=200)\n'
+    )
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='api_yamdb.settings')
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, '-c', script],
+            check=True, env=env, cwd=MANAGE_PATH,
+        )
+
+
+@pytest.fixture(autouse=True)
+def allow_local_scrape(settings):
+    settings.METRICS_ALLOWED_IPS = ('127.0.0.1',)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Metrics:
+
+    def test_01_requests_are_counted_per_route(self, client, admin_client):
+        create_titles(admin_client)
+        for _ in range(3):
+            assert client.get('/api/v1/titles/').status_code == HTTPStatus.OK
+        client.get('/api/v1/titles/0/')
+
+        response = client.get('/metrics')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/plain')
+        text = response.content.decode()
+        assert '# TYPE yamdb_http_request_duration_seconds histogram' in text
+        samples = parse_metrics(text)
+
+        labels = {'route': 'title-list', 'method': 'GET', 'status': '200'}
+        assert samples[sample('yamdb_http_requests_total', **labels)] == 3, (
+            'Проверьте, что `/metrics` считает запросы по маршруту, методу '
+            'и статусу ответа.'
+        )
+        assert samples[sample(
+            'yamdb_http_request_duration_seconds_bucket', **labels, le='+Inf'
+        )] == 3
+        assert samples[sample(
+            'yamdb_http_request_duration_seconds_count', **labels
+        )] == 3
+        assert samples[sample(
+            'yamdb_http_db_queries_sum', **labels
+        )] > 0
+        assert samples[sample(
+            'yamdb_http_response_size_bytes_sum', **labels
+        )] > 0
+        assert sample(
+            'yamdb_http_requests_total',
+            route='title-detail', method='GET', status='404'
+        ) in samples
+
+        buckets = [
+            value for name, value in samples.items()
+            if name.startswith('yamdb_http_request_duration_seconds_bucket{'
+                               'route="title-list",method="GET"')
+        ]
+        assert buckets == sorted(buckets), (
+            'Проверьте, что бакеты гистограммы накопительные.'
+        )
+
+    def test_02_auth_outcomes_are_counted(self, client):
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'metrics', 'email': 'metrics@yamdb.fake'
+        })
+        client.post('/api/v1/auth/signup/', data={})
+        client.post('/api/v1/auth/token/', data={
+            'username': 'nobody', 'confirmation_code': '0'
+        })
+        client.post('/api/v1/auth/token/', data={
+            'username': 'metrics', 'confirmation_code': '0'
+        })
+        samples = parse_metrics(client.get('/metrics').content.decode())
+        for action, outcome in (
+            ('signup', 'success'),
+            ('signup', 'invalid'),
+            ('token', 'unknown_user'),
+            ('token', 'invalid'),
+        ):
+            assert samples.get(sample(
+                'yamdb_auth_events_total', action=action, outcome=outcome
+            )) == 1, (
+                f'Проверьте, что результат `{action}` учитывается в '
+                f'метрике `yamdb_auth_events_total` как `{outcome}`.'
+            )
+
+    def test_03_values_are_aggregated_across_processes(self, client,
+                                                      metrics_dir):
+        run_finished_processes(metrics_dir)
+        assert client.get('/api/v1/titles/').status_code == HTTPStatus.OK
+
+        assert len([
+            name for name in os.listdir(metrics_dir) if name.endswith('.db')
+        ]) == 3
+        name = sample(
+            'yamdb_http_requests_total',
+            route='title-list', method='GET', status='200'
+        )
+        samples = parse_metrics(client.get('/metrics').content.decode())
+        assert samples[name] == 5, (
+            'Проверьте, что `/metrics` суммирует значения всех процессов.'
+        )
+
+    def test_04_dead_process_files_are_merged(self, client, metrics_dir):
+        run_finished_processes(metrics_dir)
+        assert client.get('/api/v1/titles/').status_code == HTTPStatus.OK
+        client.get('/metrics')
+        assert sorted(
+            name for name in os.listdir(metrics_dir) if name.endswith('.db')
+        ) == sorted([f'{os.getpid()}.db', 'merged.db']), (
+            'Проверьте, что файлы завершившихся процессов удаляются из '
+            '`METRICS_DIR` после переноса значений в `merged.db`.'
+        )
+        name = sample(
+            'yamdb_http_requests_total',
+            route='title-list', method='GET', status='200'
+        )
+        for _ in range(2):
+            samples = parse_metrics(client.get('/metrics').content.decode())
+            assert samples[name] == 5, (
+                'Проверьте, что значения завершившихся процессов '
+                'сохраняются и не учитываются повторно.'
+            )
+
+    def test_05_access_is_restricted(self, client, settings):
+        settings.METRICS_ALLOWED_IPS = ()
+        settings.METRICS_TOKEN = 'secret'
+        assert client.get('/metrics').status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что `/metrics` недоступен без токена с адресов, '
+            'которых нет в `METRICS_ALLOWED_IPS`.'
+        )
+        response = client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer wrong'
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        response = client.get(
+            '/metrics', HTTP_AUTHORIZATION='Bearer secret'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `/metrics` доступен по токену `METRICS_TOKEN`.'
+        )
+        settings.METRICS_TOKEN = ''
+        response = client.get('/metrics', HTTP_AUTHORIZATION='Bearer ')
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        settings.METRICS_ALLOWED_IPS = ('127.0.0.1',)
+        assert client.get('/metrics').status_code == HTTPStatus.OK
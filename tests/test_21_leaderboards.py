@@ -0,0 +1,182 @@
+from http import HTTPStatus
+from importlib import import_module
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import (
+    check_query_budget, create_single_review, create_titles
+)
+
+TOP_URL = '/api/v1/titles/top/'
+
+
+def top_names(client, query=''):
+    response = client.get(f'{TOP_URL}{query}')
+    assert response.status_code == HTTPStatus.OK
+    return [title['name'] for title in response.json()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Leaderboards:
+
+    def create_rated_titles(self, admin_client, user_client,
+                            moderator_client):
+        titles, categories, genres = create_titles(admin_client)
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Чужой',
+            'year': 1984,
+            'genre': [genres[1]['slug']],
+            'category': categories[0]['slug'],
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        titles.append(response.json())
+        create_single_review(user_client, titles[0]['id'], 'Текст', 6)
+        create_single_review(moderator_client, titles[0]['id'], 'Текст', 8)
+        create_single_review(user_client, titles[1]['id'], 'Текст', 9)
+        create_single_review(user_client, titles[2]['id'], 'Текст', 10)
+        return titles, categories, genres
+
+    def test_01_top_is_ordered_and_filtered(self, client, admin_client,
+                                            user_client, moderator_client):
+        titles, categories, genres = self.create_rated_titles(
+            admin_client, user_client, moderator_client
+        )
+        assert top_names(client) == ['Чужой', 'Крепкий орешек', 'Терминатор'], (
+            'Проверьте, что `/api/v1/titles/top/` возвращает произведения '
+            'по убыванию рейтинга.'
+        )
+        response = client.get(TOP_URL)
+        assert response.json()[0]['rating'] == 10
+        assert set(response.json()[0]) == {
+            'id', 'name', 'year', 'description', 'genre', 'category',
+            'rating'
+        }
+        assert top_names(client, '?limit=1') == ['Чужой']
+        assert top_names(client, '?min_reviews=2') == ['Терминатор']
+        assert top_names(client, '?year=1984') == ['Чужой', 'Терминатор']
+        assert top_names(
+            client, f'?category={categories[0]["slug"]}'
+        ) == ['Чужой', 'Терминатор']
+        assert top_names(
+            client, f'?genre={genres[0]["slug"]}'
+        ) == ['Терминатор']
+        assert top_names(
+            client, f'?genre={genres[1]["slug"]}&year=1984&min_reviews=2'
+        ) == ['Терминатор']
+        assert top_names(client, '?category=unknown') == []
+
+        for query in ('?limit=101', '?limit=0', '?min_reviews=0',
+                      '?year=abc', '?year=99999999999999999999',
+                      '?min_reviews=99999999999999999999'):
+            response = client.get(f'{TOP_URL}{query}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что запрос `{TOP_URL}{query}` возвращает '
+                'статус 400.'
+            )
+
+        check_query_budget(
+            client,
+            f'{TOP_URL}?genre={genres[1]["slug"]}'
+            f'&category={categories[0]["slug"]}',
+        )
+
+    def test_02_leaderboards_follow_changes(self, client, admin_client,
+                                            user_client, moderator_client):
+        from django.apps import apps
+
+        from reviews.models import LeaderboardEntry
+
+        titles, categories, genres = self.create_rated_titles(
+            admin_client, user_client, moderator_client
+        )
+        review = user_client.get(
+            f'/api/v1/titles/{titles[2]["id"]}/reviews/'
+        ).json()['results'][0]
+        response = user_client.patch(
+            f'/api/v1/titles/{titles[2]["id"]}/reviews/{review["id"]}/',
+            data={'score': 1},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert top_names(client) == ['Крепкий орешек', 'Терминатор', 'Чужой'], (
+            'Проверьте, что рейтинги лучших обновляются при изменении '
+            'оценки отзыва.'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/',
+            data={'year': 1984, 'genre': [genres[0]['slug']]},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert top_names(client, '?year=1984')[0] == 'Крепкий орешек'
+        assert top_names(
+            client, f'?genre={genres[0]["slug"]}'
+        ) == ['Крепкий орешек', 'Терминатор'], (
+            'Проверьте, что рейтинги лучших обновляются при изменении '
+            'жанров произведения.'
+        )
+
+        expected = set(LeaderboardEntry.objects.values_list(
+            'scope', 'title_id', 'review_count', 'rating'
+        ))
+        LeaderboardEntry.objects.all().delete()
+        call_command('reconcile_ratings')
+        assert set(LeaderboardEntry.objects.values_list(
+            'scope', 'title_id', 'review_count', 'rating'
+        )) == expected, (
+            'Проверьте, что `reconcile_ratings` пересоздаёт рейтинги лучших '
+            'в том же виде, в каком они поддерживаются инкрементально.'
+        )
+
+        migration = import_module(
+            'reviews.migrations.0006_leaderboardentry'
+        )
+        LeaderboardEntry.objects.all().delete()
+        migration.fill_leaderboards(apps, None)
+        assert set(LeaderboardEntry.objects.values_list(
+            'scope', 'title_id', 'review_count', 'rating'
+        )) == expected, (
+            'Проверьте, что миграция 0006 заполняет рейтинги лучших так же, '
+            'как `reconcile_ratings`.'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        assert 'Крепкий орешек' not in top_names(client)
+
+    def test_03_single_top_score_ranks_below_many_high_scores(
+            self, client, admin_client, django_user_model):
+        from rest_framework.test import APIClient
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        titles, categories, genres = create_titles(admin_client)
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genres[1]['slug']],
+            'category': categories[0]['slug'],
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        clients = []
+        for number in range(5):
+            author = django_user_model.objects.create_user(
+                username=f'critic{number}', email=f'critic{number}@yamdb.fake'
+            )
+            author_client = APIClient()
+            author_client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(author)}'
+            )
+            clients.append(author_client)
+        for author_client in clients:
+            create_single_review(
+                author_client, response.json()['id'], 'Текст', 2
+            )
+            create_single_review(author_client, titles[0]['id'], 'Текст', 9)
+        create_single_review(clients[0], titles[1]['id'], 'Текст', 10)
+
+        assert top_names(client)[:2] == ['Терминатор', 'Крепкий орешек'], (
+            'Проверьте, что `/api/v1/titles/top/` упорядочен по взвешенному '
+            'рейтингу: произведение с одной оценкой 10 должно быть ниже '
+            'произведения с множеством оценок 9.'
+        )
+        call_command('reconcile_ratings')
+        assert top_names(client)[:2] == ['Терминатор', 'Крепкий орешек']
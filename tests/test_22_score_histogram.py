@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import (
+    check_query_budget, create_single_review, create_titles
+)
+
+HISTOGRAMS_URL = '/api/v1/titles/histograms/'
+
+
+def empty_histogram(**counts):
+    histogram = {str(score): 0 for score in range(1, 11)}
+    histogram.update(counts)
+    return histogram
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ScoreHistogram:
+
+    def test_01_histogram_follows_reviews(self, client, admin_client,
+                                          user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(title_url)
+        assert 'score_histogram' not in response.json(), (
+            'Проверьте, что гистограмма оценок не отдаётся без параметра '
+            '`histogram`.'
+        )
+        assert not {'score_1', 'score_10'} & set(response.json())
+
+        review_id = create_single_review(
+            user_client, titles[0]['id'], 'Текст', 7
+        ).json()['id']
+        create_single_review(moderator_client, titles[0]['id'], 'Текст', 7)
+        response = client.get(f'{title_url}?histogram=true')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['score_histogram'] == empty_histogram(
+            **{'7': 2}
+        ), (
+            'Проверьте, что `?histogram=true` добавляет к произведению '
+            'распределение оценок от 1 до 10.'
+        )
+
+        user_client.patch(
+            f'{title_url}reviews/{review_id}/', data={'score': 3}
+        )
+        response = client.get(f'{title_url}?histogram=1')
+        assert response.json()['score_histogram'] == empty_histogram(
+            **{'3': 1, '7': 1}
+        ), 'Проверьте, что гистограмма обновляется при изменении оценки.'
+
+        user_client.delete(f'{title_url}reviews/{review_id}/')
+        response = client.get(f'{title_url}?histogram=true')
+        assert response.json()['score_histogram'] == empty_histogram(
+            **{'7': 1}
+        ), 'Проверьте, что гистограмма обновляется при удалении отзыва.'
+        check_query_budget(client, f'{title_url}?histogram=true')
+
+    def test_02_batch_histograms(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Текст', 10)
+        create_single_review(user_client, titles[1]['id'], 'Текст', 1)
+        ids = f'{titles[1]["id"]},{titles[0]["id"]},{titles[1]["id"]},999'
+        response = check_query_budget(client, f'{HISTOGRAMS_URL}?ids={ids}')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [
+            {
+                'id': titles[0]['id'],
+                'score_histogram': empty_histogram(**{'10': 1}),
+            },
+            {
+                'id': titles[1]['id'],
+                'score_histogram': empty_histogram(**{'1': 1}),
+            },
+        ], (
+            'Проверьте, что `/api/v1/titles/histograms/?ids=...` возвращает '
+            'гистограммы существующих произведений по возрастанию id.'
+        )
+
+        too_many = ','.join(str(index) for index in range(1, 102))
+        for query in ('', '?ids=', '?ids=1,a', '?ids=0', '?ids=1,-2',
+                      '?ids=99999999999999999999', f'?ids={too_many}'):
+            response = client.get(f'{HISTOGRAMS_URL}{query}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что запрос `{HISTOGRAMS_URL}{query}` '
+                'возвращает статус 400.'
+            )
+
+    def test_03_reconcile_restores_histogram(self, admin_client,
+                                             user_client, moderator_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Текст', 5)
+        create_single_review(moderator_client, titles[0]['id'], 'Текст', 9)
+        Title.objects.filter(id=titles[0]['id']).update(score_5=0, score_1=4)
+        call_command('reconcile_ratings')
+        title = Title.objects.get(id=titles[0]['id'])
+        assert title.score_histogram == {
+            score: int(score in (5, 9)) for score in range(1, 11)
+        }, (
+            'Проверьте, что `reconcile_ratings` пересчитывает гистограмму '
+            'оценок по таблице отзывов.'
+        )
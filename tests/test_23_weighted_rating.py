@@ -0,0 +1,183 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import (
+    check_query_budget, create_single_review, create_titles
+)
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def names(client, query):
+    response = client.get(f'{TITLES_URL}{query}')
+    assert response.status_code == HTTPStatus.OK
+    return [title['name'] for title in response.json()['results']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23WeightedRating:
+
+    def test_01_weighted_rating_shrinks_to_prior(self, client, admin_client,
+                                                 user_client,
+                                                 moderator_client):
+        titles, categories, genres = create_titles(admin_client)
+        response = admin_client.post(TITLES_URL, data={
+            'name': 'Чужой',
+            'year': 1979,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        })
+        titles.append(response.json())
+        for author_client in (admin_client, user_client, moderator_client):
+            create_single_review(
+                author_client, titles[2]['id'], 'Текст', 1
+            )
+            create_single_review(
+                author_client, titles[1]['id'], 'Текст', 9
+            )
+        create_single_review(user_client, titles[0]['id'], 'Текст', 10)
+        # Взвешенные рейтинги считаются по средней на момент изменения
+        # отзыва; на маленьком каталоге она ещё заметно меняется.
+        call_command('reconcile_ratings')
+
+        assert names(client, '?ordering=-rating') == [
+            'Терминатор', 'Крепкий орешек', 'Чужой'
+        ]
+        assert names(client, '?ordering=-weighted_rating') == [
+            'Крепкий орешек', 'Терминатор', 'Чужой'
+        ], (
+            'Проверьте, что взвешенный рейтинг ставит произведение с тремя '
+            'оценками 9 выше произведения с одной оценкой 10.'
+        )
+        assert names(client, '?ordering=-name') == [
+            'Чужой', 'Терминатор', 'Крепкий орешек'
+        ]
+        assert names(client, '?ordering=year') == [
+            'Чужой', 'Терминатор', 'Крепкий орешек'
+        ]
+        assert client.get(
+            f'{TITLES_URL}{titles[1]["id"]}/'
+        ).json()['rating'] == 9
+
+        for query in ('?ordering=description', '?ordering=--name',
+                      '?ordering=-'):
+            response = client.get(f'{TITLES_URL}{query}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что запрос `{TITLES_URL}{query}` возвращает '
+                'статус 400.'
+            )
+        check_query_budget(client, f'{TITLES_URL}?ordering=-weighted_rating')
+
+    def test_02_cursor_walk_keeps_unrated_titles_last(self, client,
+                                                      admin_client,
+                                                      user_client):
+        from reviews.models import Title
+
+        _, categories, genres = create_titles(admin_client)
+        for index in range(23):
+            response = admin_client.post(TITLES_URL, data={
+                'name': f'Произведение {index}',
+                'year': 2000,
+                'genre': [genres[0]['slug']],
+                'category': categories[0]['slug'],
+            })
+            if index % 3:
+                create_single_review(
+                    user_client, response.json()['id'], 'Текст',
+                    index % 4 + 1
+                )
+
+        for ordering in ('-rating', 'rating'):
+            rated = sorted(
+                Title.objects.filter(rating__isnull=False),
+                key=lambda title: (title.rating, title.id),
+                reverse=ordering.startswith('-'),
+            )
+            unrated = sorted(
+                Title.objects.filter(rating__isnull=True),
+                key=lambda title: title.id,
+                reverse=ordering.startswith('-'),
+            )
+            expected = [title.id for title in rated + unrated]
+
+            pages = []
+            url = f'{TITLES_URL}?pagination=cursor&ordering={ordering}'
+            while url:
+                pages.append(client.get(url).json())
+                url = pages[-1]['next']
+            ids = [title['id'] for page in pages for title in page['results']]
+            assert ids == expected, (
+                'Проверьте, что в режиме курсора с `ordering` произведения '
+                'идут в заданном порядке, а произведения без отзывов - '
+                'в конце.'
+            )
+            assert names(client, f'?ordering={ordering}')[-1] == (
+                Title.objects.get(id=expected[9]).name
+            )
+            previous = client.get(pages[-1]['previous']).json()
+            assert previous['results'] == pages[-2]['results'], (
+                'Проверьте, что ссылка `previous` ведёт на предыдущую '
+                'страницу и при значениях NULL в поле порядка.'
+            )
+
+    def test_03_prior_follows_reviews_in_shards(self, admin_client,
+                                                user_client,
+                                                moderator_client):
+        from django.db.models import Sum
+
+        from reviews.models import RatingPrior, Title
+        from reviews.ratings import PRIOR_WEIGHT
+
+        def prior_totals():
+            totals = RatingPrior.objects.aggregate(
+                Sum('score_sum'), Sum('review_count')
+            )
+            return totals['score_sum__sum'], totals['review_count__sum']
+
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Текст', 2)
+        create_single_review(moderator_client, titles[0]['id'], 'Текст', 4)
+        create_single_review(user_client, titles[1]['id'], 'Текст', 9)
+        assert prior_totals() == (15, 3), (
+            'Проверьте, что создание отзыва сразу учитывается в сумме и '
+            'количестве оценок по каталогу.'
+        )
+        assert RatingPrior.objects.count() == 2, (
+            'Проверьте, что отзывы к разным произведениям учитываются в '
+            'разных строках `RatingPrior`.'
+        )
+        title = Title.objects.get(id=titles[1]['id'])
+        assert title.weighted_rating == pytest.approx(
+            (9 + PRIOR_WEIGHT * 5) / (1 + PRIOR_WEIGHT)
+        ), (
+            'Проверьте, что взвешенный рейтинг считается по средней оценке '
+            'по каталогу с учётом нового отзыва.'
+        )
+
+        review_id = create_single_review(
+            moderator_client, titles[1]['id'], 'Текст', 7
+        ).json()['id']
+        assert prior_totals() == (22, 4)
+        response = moderator_client.delete(
+            f'{TITLES_URL}{titles[1]["id"]}/reviews/{review_id}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert prior_totals() == (15, 3), (
+            'Проверьте, что удаление отзыва вычитается из суммы и '
+            'количества оценок по каталогу.'
+        )
+
+        RatingPrior.objects.all().delete()
+        Title.objects.update(weighted_rating=None)
+        call_command('reconcile_ratings')
+        assert prior_totals() == (15, 3), (
+            'Проверьте, что `reconcile_ratings` пересчитывает сумму и '
+            'количество оценок по каталогу.'
+        )
+        title = Title.objects.get(id=titles[0]['id'])
+        assert title.rating == 3
+        assert title.weighted_rating == pytest.approx(
+            (6 + PRIOR_WEIGHT * 5) / (2 + PRIOR_WEIGHT)
+        )
@@ -0,0 +1,109 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import check_query_budget, create_titles
+
+TITLES_URL = '/api/v1/titles/'
+BATCH_URL = '/api/v1/titles/batch/'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24TitleBatch:
+
+    def test_01_batch_create(self, client, admin_client, user_client):
+        from reviews.models import LeaderboardEntry
+
+        titles, categories, genres = create_titles(admin_client)
+        items = [
+            {
+                'name': f'Произведение {index}',
+                'year': 1970 + index,
+                'category': categories[index % 2]['slug'],
+                'genre': [genres[0]['slug'], genres[index % 3]['slug']],
+            }
+            for index in range(30)
+        ]
+        items[3]['category'] = 'unknown'
+        items[7]['year'] = 3000
+        items[9]['genre'] = []
+
+        response = user_client.post(
+            BATCH_URL, data={'titles': items}, format='json'
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = check_query_budget(
+            admin_client, BATCH_URL, method='post', authenticated=True,
+            data={'titles': items}, format='json',
+        )
+        assert response.status_code == HTTPStatus.MULTI_STATUS, (
+            'Проверьте, что пакетное создание с ошибками в части '
+            'произведений возвращает статус 207.'
+        )
+        results = response.json()
+        assert len(results) == len(items)
+        assert [
+            index for index, result in enumerate(results)
+            if result['status'] == HTTPStatus.BAD_REQUEST
+        ] == [3, 7, 9], (
+            'Проверьте, что результат пакетного создания содержит ошибки '
+            'для каждого некорректного произведения.'
+        )
+        assert 'category' in results[3]['errors']
+        assert 'year' in results[7]['errors']
+        assert 'genre' in results[9]['errors']
+
+        created = results[10]
+        assert created['status'] == HTTPStatus.CREATED
+        response = client.get(f'{TITLES_URL}{created["id"]}/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['name'] == 'Произведение 10'
+        assert response.json()['category']['slug'] == categories[0]['slug']
+        assert {genre['slug'] for genre in response.json()['genre']} == {
+            genres[0]['slug'], genres[1]['slug']
+        }
+        ids = {result['id'] for result in results if 'id' in result}
+        assert len(ids) == 27
+        assert client.get(TITLES_URL).json()['count'] == 29
+
+        assert LeaderboardEntry.objects.filter(
+            title_id=created['id']
+        ).count() == 5, (
+            'Проверьте, что для созданных пакетом произведений создаются '
+            'строки рейтингов лучших.'
+        )
+
+    def test_02_batch_validation(self, admin_client):
+        for data in ({}, {'titles': []}, {'titles': 'title'},
+                     {'titles': [{'name': 'Без года'}] * 5001}):
+            response = admin_client.post(
+                BATCH_URL, data=data, format='json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что пустой, некорректный или слишком большой '
+                'пакет отклоняется со статусом 400.'
+            )
+
+        create_titles(admin_client)
+        response = admin_client.post(
+            BATCH_URL, data={'titles': [{'name': 'Без года'}]},
+            format='json',
+        )
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        assert response.json()[0]['status'] == HTTPStatus.BAD_REQUEST
+
+    def test_03_multi_get(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = check_query_budget(
+            client, f'{TITLES_URL}?ids={titles[0]["id"]},999'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[0]['id']
+        ], (
+            'Проверьте, что `/api/v1/titles/?ids=...` возвращает '
+            'произведения с указанными id.'
+        )
+        response = client.get(f'{TITLES_URL}?ids=1,a')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
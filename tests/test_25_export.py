@@ -0,0 +1,177 @@
+import asyncio
+import csv
+import gzip
+import io
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+EXPORT_URL = '/api/v1/export/'
+
+
+def sorted_genres(record):
+    return {
+        **record,
+        'genre': sorted(record['genre'], key=lambda genre: genre['slug']),
+    }
+
+
+def content(response):
+    assert response.streaming, (
+        'Проверьте, что выгрузка отдаётся через `StreamingHttpResponse`.'
+    )
+    return b''.join(response.streaming_content)
+
+
+def asgi_get(path, token):
+    """
+    GET-запрос через ASGI-приложение проекта: статус, тело ответа и
+    число шагов другой задачи цикла событий, пока отправлялось тело.
+    """
+    from api_yamdb.asgi import application
+
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': b'',
+        'headers': [(b'authorization', f'Bearer {token}'.encode())],
+    }
+    messages = []
+    steps = 0
+    marks = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+        if not message.get('more_body'):
+            marks.append(steps)
+
+    async def heartbeat():
+        nonlocal steps
+        while True:
+            steps += 1
+            await asyncio.sleep(0)
+
+    async def run():
+        task = asyncio.create_task(heartbeat())
+        try:
+            await application(scope, receive, send)
+        finally:
+            task.cancel()
+
+    asyncio.run(run())
+    return messages[0]['status'], b''.join(
+        message.get('body', b'') for message in messages[1:]
+    ), marks[-1] - marks[0]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Export:
+
+    def test_01_titles_ndjson_matches_api(self, client, admin_client, admin,
+                                          user, user_client):
+        from api.export import title_records
+
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        for name in ('titles', 'reviews'):
+            for api_client in (client, user_client):
+                response = api_client.get(f'{EXPORT_URL}{name}/')
+                assert response.status_code in (
+                    HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+                ), 'Проверьте, что выгрузка доступна только администратору.'
+
+        response = admin_client.get(f'{EXPORT_URL}titles/')
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'] == 'application/x-ndjson'
+        records = [
+            json.loads(line) for line in content(response).splitlines()
+        ]
+        expected = [
+            admin_client.get(f'/api/v1/titles/{title["id"]}/').json()
+            for title in sorted(titles, key=lambda title: title['id'])
+        ]
+        assert [sorted_genres(record) for record in records] == [
+            sorted_genres(record) for record in expected
+        ], (
+            'Проверьте, что выгрузка произведений в NDJSON содержит '
+            'все произведения в том же виде, что и `/api/v1/titles/{id}/`.'
+        )
+        assert list(title_records(chunk_size=1)) == records, (
+            'Проверьте, что выгрузка читает произведения пачками по id '
+            'без пропусков и повторов.'
+        )
+
+        response = admin_client.get(f'{EXPORT_URL}reviews/?as=ndjson')
+        records = [
+            json.loads(line) for line in content(response).splitlines()
+        ]
+        assert [record['id'] for record in records] == sorted(
+            review['id'] for review in reviews
+        )
+        review = records[0]
+        detail = admin_client.get(
+            f'/api/v1/titles/{review["title"]}/reviews/{review["id"]}/'
+        ).json()
+        assert {**detail, 'title': review['title']} == review
+
+    def test_02_csv_and_gzip(self, admin_client, admin, user, user_client):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = admin_client.get(
+            f'{EXPORT_URL}titles/?as=csv', HTTP_ACCEPT_ENCODING='gzip'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Encoding'] == 'gzip', (
+            'Проверьте, что при `Accept-Encoding: gzip` выгрузка сжимается.'
+        )
+        assert 'Accept-Encoding' in response['Vary']
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.DictReader(io.StringIO(
+            gzip.decompress(content(response)).decode()
+        )))
+        assert [int(row['id']) for row in rows] == sorted(
+            title['id'] for title in titles
+        )
+        first = min(titles, key=lambda title: title['id'])
+        assert rows[0]['name'] == first['name']
+        assert rows[0]['category'] == first['category']
+        assert sorted(rows[0]['genre'].split(',')) == sorted(first['genre'])
+
+        response = admin_client.get(f'{EXPORT_URL}reviews/?as=csv')
+        assert 'Content-Encoding' not in response
+        header = content(response).decode().splitlines()[0]
+        assert header == 'id,title,author,score,pub_date,text'
+
+        response = admin_client.get(f'{EXPORT_URL}titles/?as=xml')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_asgi(self, admin_client, admin, token_admin, user,
+                     user_client):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        for name, expected in (('titles', titles), ('reviews', reviews)):
+            status, body, ticks = asgi_get(
+                f'{EXPORT_URL}{name}/', token_admin['access']
+            )
+            assert status == HTTPStatus.OK, (
+                'Проверьте, что выгрузка работает при запуске через ASGI: '
+                'пачки читаются из базы вне цикла событий.'
+            )
+            assert ticks > 0, (
+                'Проверьте, что чтение пачек выгрузки под ASGI не блокирует '
+                'цикл событий.'
+            )
+            assert body == content(
+                admin_client.get(f'{EXPORT_URL}{name}/')
+            )
+            assert len(body.splitlines()) == len(expected)
@@ -0,0 +1,103 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_titles
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def get_with_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    return response.json(), [query['sql'] for query in context]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26SparseFieldsets:
+
+    def test_01_titles_fields_narrow_response_and_sql(self, client,
+                                                      admin_client):
+        titles, _, _ = create_titles(admin_client)
+        data, queries = get_with_queries(
+            client, f'{TITLES_URL}?fields=id,name,rating'
+        )
+        assert [set(title) for title in data['results']] == [
+            {'id', 'name', 'rating'}
+        ] * 2, (
+            'Проверьте, что параметр `fields` оставляет в ответе только '
+            'перечисленные поля.'
+        )
+        assert len(queries) == 2, (
+            'Проверьте, что без поля `genre` жанры не предвыбираются '
+            'отдельным запросом.'
+        )
+        assert 'description' not in queries[-1]
+        assert 'reviews_category' not in queries[-1]
+
+        data, queries = get_with_queries(
+            client, f'{TITLES_URL}?exclude=description,genre'
+        )
+        assert set(data['results'][0]) == {
+            'id', 'name', 'year', 'category', 'rating'
+        }
+        assert len(queries) == 2
+        assert 'reviews_category' in queries[-1]
+
+        data, _ = get_with_queries(
+            client, f'{TITLES_URL}{titles[0]["id"]}/?fields=genre'
+        )
+        assert set(data) == {'genre'}
+        assert len(data['genre']) == 2
+
+        data, _ = get_with_queries(
+            client,
+            f'{TITLES_URL}?pagination=cursor&ordering=-year&fields=name',
+        )
+        assert [title['name'] for title in data['results']] == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+
+        response = client.get(f'{TITLES_URL}?fields=id,secret')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что неизвестное поле в `fields` возвращает '
+            'статус 400.'
+        )
+
+    def test_02_other_endpoints(self, client, admin_client, admin,
+                                user, user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        reviews_url = f'{TITLES_URL}{titles[0]["id"]}/reviews/'
+        data, queries = get_with_queries(
+            client, f'{reviews_url}?fields=id,score'
+        )
+        assert set(data['results'][0]) == {'id', 'score'}
+        assert 'users_user' not in queries[-1], (
+            'Проверьте, что без поля `author` автор отзыва не '
+            'присоединяется к запросу.'
+        )
+        data, _ = get_with_queries(
+            client, f'{reviews_url}{reviews[0]["id"]}/?exclude=text'
+        )
+        assert set(data) == {'id', 'author', 'score', 'pub_date'}
+
+        data, _ = get_with_queries(client, '/api/v1/genres/?fields=slug')
+        assert set(data['results'][0]) == {'slug'}
+        data, _ = get_with_queries(
+            admin_client, '/api/v1/users/?fields=username'
+        )
+        assert set(data['results'][0]) == {'username'}
+
+        response = user_client.patch(
+            f'{reviews_url}{reviews[1]["id"]}/?fields=id',
+            data={'score': 9},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['score'] == 9, (
+            'Проверьте, что `fields` не влияет на изменяющие запросы.'
+        )
@@ -0,0 +1,93 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from tests.utils import (check_query_budget, create_comments,
+                         create_single_review)
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def compare_content(client, url):
+    with override_settings(FAST_LIST_ENABLED=False):
+        expected = client.get(url)
+    with override_settings(FAST_LIST_ENABLED=True):
+        response = client.get(url)
+    assert expected.status_code == HTTPStatus.OK
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == expected.content, (
+        f'Проверьте, что быстрый список `{url}` побайтно совпадает с '
+        'ответом сериализатора.'
+    )
+    assert response['Content-Type'] == expected['Content-Type']
+    return response.json()
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(settings):
+    settings.RESPONSE_CACHE_ENABLED = False
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27FastReadPath:
+
+    def test_01_lists_match_serializers(self, client, admin_client, admin,
+                                        user, user_client):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        create_single_review(
+            user_client, titles[1]['id'], 'Неплохо', 7
+        )
+        items = [
+            {
+                'name': f'Произведение {index}',
+                'year': 1970 + index,
+                'category': 'films' if index % 2 else 'books',
+                'genre': ['drama', 'horror'][:index % 2 + 1],
+                'description': f'Описание {index}',
+            }
+            for index in range(12)
+        ]
+        response = admin_client.post(
+            f'{TITLES_URL}batch/', data={'titles': items}, format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        for url in (
+            TITLES_URL,
+            f'{TITLES_URL}?page=2',
+            f'{TITLES_URL}?ordering=-rating',
+            f'{TITLES_URL}?ordering=weighted_rating&pagination=cursor',
+            f'{TITLES_URL}?search=Терминатор',
+            f'{TITLES_URL}?genre=comedy',
+        ):
+            compare_content(client, url)
+
+        data = compare_content(client, f'{TITLES_URL}?pagination=cursor')
+        compare_content(client, data['next'])
+
+        reviews_url = f'{TITLES_URL}{titles[0]["id"]}/reviews/'
+        data = compare_content(client, reviews_url)
+        assert len(data['results']) == len(reviews)
+        compare_content(client, f'{reviews_url}?pagination=cursor')
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        data = compare_content(client, comments_url)
+        assert data['results']
+        compare_content(client, f'{comments_url}?pagination=cursor')
+
+        response = client.get(f'{TITLES_URL}?fields=name')
+        assert set(response.json()['results'][0]) == {'name'}
+
+    def test_02_query_budget(self, client, admin_client, admin, user,
+                             user_client):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        reviews_url = f'{TITLES_URL}{titles[0]["id"]}/reviews/'
+        for url in (
+            TITLES_URL,
+            reviews_url,
+            f'{reviews_url}{reviews[0]["id"]}/comments/',
+        ):
+            check_query_budget(client, url)
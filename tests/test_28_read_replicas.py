@@ -0,0 +1,106 @@
+import sqlite3
+
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews
+
+TITLES_URL = '/api/v1/titles/'
+
+
+def count_queries(client, url, **kwargs):
+    with CaptureQueriesContext(connections['default']) as primary, \
+            CaptureQueriesContext(connections['replica']) as replica:
+        response = client.get(url, **kwargs)
+    assert response.status_code == 200
+    return len(primary), len(replica)
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.REPLICA_DATABASES = ('replica',)
+    settings.RESPONSE_CACHE_ENABLED = False
+    return settings
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+class Test28ReadReplicas:
+
+    def test_01_reads_go_to_replica(self, client, admin_client, admin,
+                                    user, user_client, replicas):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client}
+        )
+        reviews_url = f'{TITLES_URL}{titles[0]["id"]}/reviews/'
+        for url in (
+            TITLES_URL,
+            f'{TITLES_URL}{titles[0]["id"]}/',
+            reviews_url,
+            f'{reviews_url}{reviews[0]["id"]}/comments/',
+            '/api/v1/genres/',
+            '/api/v1/categories/',
+        ):
+            primary, replica = count_queries(client, url)
+            assert (primary, replica > 0) == (0, True), (
+                f'Проверьте, что GET-запрос к `{url}` читает из реплики.'
+            )
+            # Пользователь для аутентификации читается из основной базы.
+            primary, replica = count_queries(user_client, url)
+            assert primary <= 1 and replica > 0
+
+        with CaptureQueriesContext(connections['replica']) as replica:
+            response = user_client.post(
+                reviews_url, data={'text': 'Отзыв', 'score': 8}
+            )
+        assert response.status_code == 201
+        assert len(replica) == 0, (
+            'Проверьте, что изменяющие запросы работают с основной базой.'
+        )
+
+        primary, replica = count_queries(user_client, reviews_url)
+        assert primary > 0 and replica == 0, (
+            'Проверьте, что после изменения пользователь читает из '
+            'основной базы и видит свои изменения.'
+        )
+        primary, replica = count_queries(client, reviews_url)
+        assert primary == 0 and replica > 0, (
+            'Проверьте, что изменения одного пользователя не переводят '
+            'на основную базу остальных.'
+        )
+
+        replicas.REPLICA_STICKY_SECONDS = 0
+        user_client.post(
+            f'{TITLES_URL}{titles[1]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 6},
+        )
+        _, replica = count_queries(user_client, reviews_url)
+        assert replica > 0, (
+            'Проверьте, что чтение из основной базы ограничено '
+            '`REPLICA_STICKY_SECONDS`.'
+        )
+
+    def test_02_cached_responses_read_primary(self, client, admin_client,
+                                              replicas):
+        create_reviews(admin_client, {})
+        replicas.RESPONSE_CACHE_ENABLED = True
+        primary, replica = count_queries(client, TITLES_URL)
+        assert primary > 0 and replica == 0, (
+            'Проверьте, что ответ, который попадёт в кеш, читается из '
+            'основной базы: реплика может отставать от версии кеша.'
+        )
+
+    def test_03_sync_replica(self, admin_client, tmp_path):
+        from api.management.commands.sync_replica import copy_database
+
+        _, titles = create_reviews(admin_client, {})
+        name = str(tmp_path / 'replica.sqlite3')
+        copy_database(name)
+        with sqlite3.connect(name) as replica:
+            count, = replica.execute(
+                'SELECT COUNT(*) FROM reviews_title'
+            ).fetchone()
+        assert count == len(titles), (
+            'Проверьте, что `sync_replica` копирует основную базу в файл '
+            'реплики.'
+        )
@@ -0,0 +1,113 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import OperationalError, connections, transaction
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29SqliteProfile:
+
+    def test_01_pragmas_on_new_connections(self, tmp_path):
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+
+        wrapper = DatabaseWrapper(
+            {
+                **connections['default'].settings_dict,
+                'NAME': str(tmp_path / 'profile.sqlite3'),
+            },
+            'profile',
+        )
+        try:
+            with wrapper.cursor() as cursor:
+                values = {}
+                for name in ('journal_mode', 'synchronous', 'busy_timeout',
+                             'cache_size', 'mmap_size'):
+                    cursor.execute(f'PRAGMA {name}')
+                    values[name] = cursor.fetchone()[0]
+        finally:
+            wrapper.close()
+        assert values == {
+            'journal_mode': 'wal',
+            'synchronous': 1,
+            'busy_timeout': 5000,
+            'cache_size': -64 * 1024,
+            'mmap_size': 256 * 1024 * 1024,
+        }, (
+            'Проверьте, что новое соединение SQLite получает PRAGMA из '
+            '`SQLITE_PRAGMAS`.'
+        )
+
+    def test_02_retry_locked(self, settings):
+        from api_yamdb.db import retry_locked
+
+        settings.SQLITE_LOCK_RETRY_DELAY = 0
+        calls = []
+
+        def locked_twice():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError('database is locked')
+            return 'ok'
+
+        assert retry_locked(locked_twice) == 'ok'
+        assert len(calls) == 3, (
+            'Проверьте, что операция повторяется при блокировке SQLite.'
+        )
+
+        calls.clear()
+        with pytest.raises(OperationalError):
+            retry_locked(locked_twice, retries=1)
+        assert len(calls) == 2
+
+        calls.clear()
+        with pytest.raises(OperationalError):
+            with transaction.atomic():
+                retry_locked(locked_twice)
+        assert len(calls) == 1, (
+            'Проверьте, что внутри открытой транзакции операция не '
+            'повторяется.'
+        )
+
+        def broken():
+            calls.append(1)
+            raise OperationalError('no such table: reviews_title')
+
+        calls.clear()
+        with pytest.raises(OperationalError):
+            retry_locked(broken)
+        assert len(calls) == 1
+
+    def test_03_write_retried_after_lock(self, admin_client, user_client,
+                                         monkeypatch, settings):
+        import api.views
+        from reviews.models import Review, Title
+
+        settings.SQLITE_LOCK_RETRY_DELAY = 0
+        titles, _, _ = create_titles(admin_client)
+        apply_review_change = api.views.apply_review_change
+        calls = []
+
+        def locked_once(*args, **kwargs):
+            calls.append(1)
+            result = apply_review_change(*args, **kwargs)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return result
+
+        monkeypatch.setattr(api.views, 'apply_review_change', locked_once)
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Отзыв', 'score': 7},
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что запись повторяется, если SQLite ответил '
+            '"database is locked".'
+        )
+        assert len(calls) == 2
+        title = Title.objects.get(id=titles[0]['id'])
+        assert (title.review_count, title.score_sum) == (1, 7), (
+            'Проверьте, что неудачная попытка откатывается целиком.'
+        )
+        assert Review.objects.count() == 1
@@ -0,0 +1,112 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+from django.test import AsyncClient
+from django.urls import resolve
+
+from tests.utils import create_comments
+
+TITLES_URL = '/api/v1/titles/'
+
+
+@pytest.fixture
+def async_reads(settings):
+    from api.management.commands.benchmark import async_read_views
+
+    settings.RESPONSE_CACHE_ENABLED = False
+    settings.SERVER_TIMING_ENABLED = True
+    with async_read_views(True):
+        yield
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30AsyncReads:
+
+    def test_01_same_responses_as_sync_views(self, admin_client, admin,
+                                             token_admin, user, user_client,
+                                             async_reads):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        reviews_url = f'{TITLES_URL}{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        urls = (
+            TITLES_URL,
+            f'{TITLES_URL}?ordering=-year&fields=id,name',
+            f'{TITLES_URL}{titles[0]["id"]}/',
+            reviews_url,
+            f'{reviews_url}{reviews[0]["id"]}/',
+            comments_url,
+        )
+        assert asyncio.iscoroutinefunction(resolve(TITLES_URL).func), (
+            'Проверьте, что при `ASYNC_READ_VIEWS` список произведений '
+            'обслуживает асинхронная вьюха.'
+        )
+        assert not asyncio.iscoroutinefunction(
+            resolve('/api/v1/users/').func
+        )
+
+        # Заголовок `Server-Timing` отдаётся только сотрудникам.
+        admin_token = {'authorization': f'Bearer {token_admin["access"]}'}
+
+        async def get_all():
+            async_client = AsyncClient()
+            return [await async_client.get(url, **admin_token) for url in urls]
+
+        for url, response in zip(urls, run(get_all())):
+            expected = admin_client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            assert response.content == expected.content, (
+                f'Проверьте, что асинхронный ответ `{url}` совпадает с '
+                'синхронным.'
+            )
+            assert 'queries' in response['Server-Timing']
+            assert '"0 queries"' not in response['Server-Timing'], (
+                'Проверьте, что запросы к базе из пула потоков учитываются '
+                'в `Server-Timing`.'
+            )
+
+    def test_02_permissions(self, admin_client, admin, token_user,
+                            async_reads):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        reviews_url = f'{TITLES_URL}{titles[0]["id"]}/reviews/'
+        # AsyncClient в Django 3.2 принимает заголовки по их именам
+        # и надёжно передаёт только JSON-тело.
+        user = {'authorization': f'Bearer {token_user["access"]}'}
+        data = {
+            'data': json.dumps({'text': 'Отзыв', 'score': 5}),
+            'content_type': 'application/json',
+        }
+
+        async def requests():
+            async_client = AsyncClient()
+            return (
+                await async_client.post(reviews_url, **data),
+                await async_client.get(
+                    reviews_url, authorization='Bearer broken'
+                ),
+                await async_client.post(reviews_url, **data, **user),
+                await async_client.get(reviews_url, **user),
+                await async_client.delete(
+                    f'{reviews_url}{reviews[0]["id"]}/', **user
+                ),
+            )
+
+        anonymous, broken, created, listed, forbidden = run(requests())
+        assert anonymous.status_code == HTTPStatus.UNAUTHORIZED
+        assert broken.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что асинхронное чтение с неверным токеном '
+            'возвращает 401, как и синхронное.'
+        )
+        assert created.status_code == HTTPStatus.CREATED
+        assert listed.status_code == HTTPStatus.OK
+        assert listed.json()['count'] == 2
+        assert forbidden.status_code == HTTPStatus.FORBIDDEN
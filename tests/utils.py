@@ -1,4 +1,9 @@
 from http import HTTPStatus
+from urllib.parse import urlparse
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
 
 
 check_name_and_slug_patterns = (
@@ -305,3 +310,31 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def check_query_budget(client, url, method='get', authenticated=False,
+                       **kwargs):
+    """Выполняет запрос и проверяет, что вьюсет уложился в `query_budget`.
+
+    Бюджет задаётся атрибутом `query_budget` вьюсета из `api.views` для
+    каждого действия и не учитывает запрос аутентификации пользователя.
+    """
+    match = resolve(urlparse(url).path)
+    view_class = match.func.cls
+    action = match.func.actions[method]
+    budget = getattr(view_class, 'query_budget', {}).get(action)
+    assert budget is not None, (
+        f'Для действия `{action}` вьюсета `{view_class.__name__}` не задан '
+        'бюджет запросов `query_budget`.'
+    )
+    if authenticated:
+        budget += 1
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(client, method)(url, **kwargs)
+    executed = len(context.captured_queries)
+    assert executed <= budget, (
+        f'{method.upper()}-запрос к `{url}` выполнил {executed} SQL-запросов '
+        f'при бюджете {budget} для `{view_class.__name__}.{action}`:\n'
+        + '\n'.join(query['sql'] for query in context.captured_queries)
+    )
+    return response